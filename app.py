@@ -6,20 +6,35 @@ This is the main module for the Battleship Bot app.  It contains all the
 prompts and loops to run through a game in the command line.  It depends
 on the opponent and gameconversions modules and their dependencies.
 
+With --script, the answers to every prompt are read from a file (or '-'
+for stdin), one line per prompt in the order a player would type them,
+and lines starting with '#' are skipped.  Scripted games don't wait or
+clear the screen, the game's text goes to stderr, and a transcript of
+every guess is written to stdout as JSON lines, so recorded games can
+be replayed through the real game loop in moments.  Every game's seed
+is written to the transcript, and --seed plays the game with that seed,
+so the computer's fleet, guesses and the starting player are the same
+as when the game was recorded.
+--record adds every turn of the game to a game log (see gamelog.py).
+
+Usage: python app.py [--script FILE] [--transcript FILE] [--seed N]
+                     [--record FILE]
+
 Author: Eric Nerby
 Written: October 2020
 Updated: November 2020
 """
 
-import os
-import random
+import argparse
+import contextlib
+import json
 import re
 import sys
 import time
-from string import ascii_uppercase as ALPHABET
 
 from gameconversions import convert_from_index, convert_to_index
 from opponent import Opponent
+from renderer import Renderer, board_lines
 
 WAIT_TIME = 3
 
@@ -73,14 +88,76 @@ class Player:
         return self.name
 
 
+renderer = Renderer()
+# file of answers to the prompts, or None when the game is interactive
+script = None
+# file the transcript is written to, or None for no transcript
+transcript = None
+# GameLog every turn is added to, or None, and the game's number in it
+game_log = None
+game_number = None
+seed = None
+
+
 def clear():
     """Clear screen in terminal."""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if script is None:
+        renderer.clear()
+
+
+def refresh_screen():
+    """Show both sides' guesses above a cleared prompt area."""
+    if script is None:
+        renderer.refresh([("Your guesses", opponent.field_board),
+                          ("My guesses", opponent.radar_board)])
 
 
 def sleeper():
     """Pause code execution for seconds stored in WAIT_TIME."""
-    time.sleep(WAIT_TIME)
+    if script is None:
+        time.sleep(WAIT_TIME)
+
+
+def ask(prompt):
+    """
+    Return the player's answer to a prompt.
+
+    The answer comes from the script if there is one, where it's shown
+    after the prompt like it had been typed.
+    """
+    if script is None:
+        return input(prompt)
+    for line in script:
+        if not line.startswith('#'):
+            answer = line.rstrip('\r\n')
+            print(prompt + answer)
+            return answer
+    raise EOFError("The script ended before the game did.")
+
+
+def record(event, **fields):
+    """Write an event to the transcript as one line of JSON."""
+    if transcript is not None:
+        transcript.write(json.dumps({'event': event, **fields}) + '\n')
+        transcript.flush()
+
+
+def log_shot(side, row, column, hit, ship=None):
+    """Add a shot, and the ship it sunk if any, to the game log."""
+    if game_log is not None:
+        game_log.shot(game_number, side, row, column, hit)
+        if ship is not None:
+            fleet = (opponent.radar_fleet if side == 'computer'
+                     else opponent.field_fleet)
+            game_log.sunk(game_number, side, fleet.index(ship))
+        game_log.flush()
+
+
+def log_end(winner=None):
+    """Add the end of the game to the game log."""
+    if game_log is not None and game_number is not None:
+        game_log.end(game_number, winner)
+        game_log.flush()
 
 
 def check_help_and_quit(user_input):
@@ -96,10 +173,14 @@ def check_help_and_quit(user_input):
     boolean - indicates whether the help menu was called and displayed.
     """
     if re.match(r'-q', user_input):
+        record('quit')
+        log_end()
         sys.exit()
     elif re.match(r'-h', user_input):
         print(HELP_STRING)
-        _ = input("Hit Enter to return to game.")
+        _ = ask("Hit Enter to return to game.")
+        # the help text may have scrolled the boards off the screen
+        renderer.invalidate()
         return True
     return False
 
@@ -107,16 +188,11 @@ def check_help_and_quit(user_input):
 def display_field():
     """Display the computer's field_board at the end of the game."""
     print("Here's my board:")
-    field_string = "    1  2  3  4  5  6  7  8  9  10\n"
-    for letter, row in zip(ALPHABET, opponent.field_board):
-        field_string += " {} |".format(letter)
-        for column in row:
-            if column.segment:
-                field_string += "{}|".format(column.segment)
-            else:
-                field_string += "  |"
-        field_string += "\n"
-    print(field_string)
+
+    def segment_text(board, row, column):
+        segment = board.segment_at(row, column)
+        return str(segment) if segment else "  "
+    print('\n'.join(board_lines(opponent.field_board, segment_text)) + '\n')
 
 
 # --------- Game Play Functions --------- #
@@ -143,10 +219,10 @@ def check_for_sunken_ship():
         print("Did I sink one of your ships?")
         for index, ship in enumerate(possible_sunk_list, 1):
             print("{}. {}".format(index, ship))
-        player_response = input(
+        player_response = ask(
             "Please enter ship index or 0 for none (default 0): ")
         if check_help_and_quit(player_response):
-            clear()
+            refresh_screen()
         else:
             ship_index = re.match(r'\d+', player_response)
             if not ship_index:
@@ -156,7 +232,8 @@ def check_for_sunken_ship():
             if ship_index == 0:
                 return None
             if ship_index > len(possible_sunk_list):
-                print("{} is not in the above list. Please try again.")
+                print("{} is not in the above list. Please try again.".format(
+                    ship_index))
                 sleeper()
                 return check_for_sunken_ship()
             possible_sunk_list[ship_index - 1].sunk = True
@@ -166,29 +243,29 @@ def check_for_sunken_ship():
 
 def player_turn():
     """Take player's guess, mark it, and provide feedback."""
-    clear()
-    player_input = input("Please enter your guess in the format 'A1': ")
+    refresh_screen()
+    player_input = ask("Please enter your guess in the format 'A1': ")
     if check_help_and_quit(player_input):
         # if the help menu is called, the player's turn starts
         #     over after the help menu closes.
         player_turn()
         return
-    player_guess = re.match(r'([a-zA-Z])(\d+)', player_input)
+    player_guess = re.match(r'([a-zA-Z]+)(\d+)', player_input)
     # check input for correct format
     if player_guess:
         row_guess, column_guess = player_guess.group(1, 2)
         row_guess, column_guess = convert_to_index(row_guess, column_guess)
         # check that input is inside range of board
-        if (row_guess >= len(opponent.field_board)
-                or column_guess >= len(opponent.field_board[0])
+        if (row_guess >= opponent.field_board.height
+                or column_guess >= opponent.field_board.width
                 or row_guess < 0 or column_guess < 0):
             print("Your guess was outside of the range of the board.")
             sleeper()
             player_turn()
             return
         # check if space was already guessed by player previously
-        if opponent.field_board[row_guess][column_guess].guessed:
-            if opponent.field_board[row_guess][column_guess].segment:
+        if opponent.field_board.guessed_at(row_guess, column_guess):
+            if opponent.field_board.segment_at(row_guess, column_guess):
                 prev_guess_status = 'hit'
             else:
                 prev_guess_status = 'miss'
@@ -198,15 +275,23 @@ def player_turn():
             player_turn()
             return
         # check space for hit or miss
-        segment = opponent.field_board[row_guess][column_guess].take_guess()
+        segment = opponent.field_board.take_guess(row_guess, column_guess)
+        location = (convert_from_index(row_guess, 'upper')
+                    + convert_from_index(column_guess, 'one'))
+        sunk = None
         if segment:
             print("'{}' is a hit!".format(player_input))
             segment.hit = True
             ship = segment.ship
             if ship.sunk:
                 print("You sunk my {}!".format(ship))
+                sunk = ship
         else:
             print("'{}' is a miss!".format(player_input))
+        record('guess', by='player', location=location,
+               result='hit' if segment else 'miss',
+               sunk=str(sunk) if sunk else None)
+        log_shot('player', row_guess, column_guess, bool(segment), sunk)
         sleeper()
     else:
         print(
@@ -226,25 +311,32 @@ def opponent_turn(existing_row=None, existing_column=None):
             these two parameters allow existing guess to be entered
             instead of a new guess for the purpose of recursion
     """
-    clear()
+    refresh_screen()
     if existing_row is None and existing_column is None:
         row_guess, column_guess = opponent.make_guess()
     else:
         row_guess = existing_row
         column_guess = existing_column
-    print("I'm going to guess... {}{}.".format(
-        convert_from_index(row_guess, 'upper'),
-        convert_from_index(column_guess, 'one')))
-    player_input = input("'h' for hit, 'm' for miss. [M/h] ")
+    location = (convert_from_index(row_guess, 'upper')
+                + convert_from_index(column_guess, 'one'))
+    print("I'm going to guess... {}.".format(location))
+    player_input = ask("'h' for hit, 'm' for miss. [M/h] ")
     if check_help_and_quit(player_input):
         # If the help menu is called, the opponent's turn starts over
         #     but with the existing guess loaded.
         opponent_turn(row_guess, column_guess)
+        return
     if re.match(r'h', player_input, re.I):
         opponent.take_guess_answer(row_guess, column_guess, True)
-        check_for_sunken_ship()
+        sunk = check_for_sunken_ship()
+        record('guess', by='computer', location=location, result='hit',
+               sunk=str(sunk) if sunk else None)
+        log_shot('computer', row_guess, column_guess, True, sunk)
     else:
         opponent.take_guess_answer(row_guess, column_guess, False)
+        record('guess', by='computer', location=location, result='miss',
+               sunk=None)
+        log_shot('computer', row_guess, column_guess, False)
 
 
 def game_loop(starting_player):
@@ -263,7 +355,7 @@ def game_loop(starting_player):
     """
     next_player = starting_player
     while True:
-        clear()
+        refresh_screen()
         if next_player == player:
             player_turn()
             next_player = opponent
@@ -272,6 +364,9 @@ def game_loop(starting_player):
             next_player = player
         winner = check_for_win()
         if winner:
+            record('end', winner='computer' if winner is opponent
+                   else 'player')
+            log_end('computer' if winner is opponent else 'player')
             print("The winner is... {}!".format(winner))
             display_field()
             break
@@ -281,7 +376,7 @@ def game_loop(starting_player):
 def main():
     """Randomly choose a starting player and start the game loop."""
     clear()
-    if random.randint(0, 1):
+    if opponent.rng.randint(0, 1):
         starting_player = opponent
         print(
             "Thank you, {}!\n".format(player)
@@ -291,19 +386,25 @@ def main():
         print(
             "Thank you, {}!\n".format(player)
             + "You have been randomly selected to go first.")
-    user_input = input("Hit Enter to begin.")
+    record('start', player=str(player),
+           first='computer' if starting_player is opponent else 'player')
+    user_input = ask("Hit Enter to begin.")
     check_help_and_quit(user_input)
     game_loop(starting_player)
 
 
-if __name__ == '__main__':
-    # If app is the main module, create Player and run main().
-    opponent = Opponent()
+def start():
+    """Create the Opponent and Player and run main()."""
+    global opponent, player, game_number
+    opponent = Opponent(seed=seed)
+    record('seed', seed=opponent.seed)
+    if game_log is not None:
+        game_number = game_log.start(opponent)
     clear()
     print(WELCOME_SCREEN)
     user_name = None
     while not user_name:
-        user_name = input(
+        user_name = ask(
             "Before we get started, could you please tell me your name? ")
         if check_help_and_quit(user_name):
             user_name = None
@@ -312,3 +413,49 @@ if __name__ == '__main__':
                 user_name = None
     player = Player(user_name)
     main()
+
+
+def run(argv=None):
+    """Parse command line arguments and play a game, scripted or not."""
+    global script, transcript, game_log, seed
+    parser = argparse.ArgumentParser(description="Play Battleship Bot.")
+    parser.add_argument('--script',
+                        help="read the answers to every prompt from FILE, "
+                        "or '-' for stdin")
+    parser.add_argument('--transcript',
+                        help="write the transcript to FILE (scripted games "
+                        "write it to stdout by default)")
+    parser.add_argument('--seed', type=int, default=None,
+                        help="seed for the computer's random draws")
+    parser.add_argument('--record',
+                        help="add every turn of the game to game log FILE")
+    args = parser.parse_args(argv)
+    seed = args.seed
+    with contextlib.ExitStack() as stack:
+        if args.record:
+            from gamelog import GameLog
+            game_log = stack.enter_context(GameLog(args.record))
+        if args.transcript:
+            transcript = stack.enter_context(open(args.transcript, 'w'))
+        elif args.script:
+            transcript = sys.stdout
+        if args.script:
+            if args.script == '-':
+                script = sys.stdin
+            else:
+                script = stack.enter_context(open(args.script))
+            # keep stdout for the transcript
+            stack.enter_context(contextlib.redirect_stdout(sys.stderr))
+        try:
+            start()
+        except (EOFError, RuntimeError) as error:
+            # the script ran out, or its answers can't all be true
+            record('abort', reason=str(error))
+            log_end()
+            print(error)
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(run())
@@ -0,0 +1,194 @@
+"""
+An exact hit-attribution solver for the computer opponent.
+
+Hits from ships lying side by side are hard to follow one starting
+point at a time.  This solver instead finds every way the hits on the
+radar board could be shared out among the ships: every placement of
+each ship answered sunk, and every set of placements of ships still
+afloat that covers the rest of the hits.  The rules are the same as the
+sampler module's:
+
+- ships stay off misses and don't overlap
+- a ship answered sunk lies on hits only, including the space it was
+  sunk on, all guessed no later than the turn it was sunk on
+- a ship still afloat has at least one unhit space
+
+Ships afloat that don't touch a hit aren't part of an attribution, so
+the number of attributions stays small.  Each one is found exactly once
+by always covering the lowest unexplained hit next, and the search
+memoizes every sub-board it reaches, keyed by the spaces taken so far
+and the ships left to place, so shared sub-boards are only solved once.
+Whole results are cached by radar state too.
+
+For each unguessed space, the solver counts the attributions that put a
+ship there, and guesses the space in the most of them, since that's the
+surest hit.  A guess on a space in k of n attributions leaves k of them
+if it hits and n - k if it misses, so among equally sure spaces, the one
+that leaves the fewest attributions on average is chosen, resolving the
+most ambiguity.
+
+Functions
+---------
+solve
+    Return the number of attributions and how many cover each space.
+attribution_guess
+    Return the row and column that best narrows down the attributions.
+
+Classes
+-------
+SolverTargeting
+    The 'solver' targeting strategy
+"""
+
+import random
+from collections import Counter
+from functools import lru_cache
+
+from sampler import covering, radar_masks
+from strategies import TargetingStrategy
+
+# Attribution counts kept by radar state
+CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def solve(width, height, hits, misses, sunk, ship_lengths):
+    """
+    Return the number of attributions and how many cover each space.
+
+    Parameters
+    ----------
+    width : int
+        the number of columns on the radar board
+    height : int
+        the number of rows on the radar board
+    hits : int
+        bitmask of every hit
+    misses : int
+        bitmask of every miss
+    sunk : tuple of tuple of int
+        (length, space, allowed mask) of every ship answered sunk, see
+        sampler.radar_masks
+    ship_lengths : tuple of int
+        the lengths of the ships still afloat, in sorted order
+
+    Returns
+    -------
+    tuple of int and Counter - the number of attributions, and the
+        number of attributions putting a ship on each unguessed space,
+        indexed by row * width + column
+    """
+    guessed = hits | misses
+    sunk_options = [
+        tuple(mask for mask in covering(width, height, length)[space]
+              if not mask & ~allowed)
+        for length, space, allowed in sunk]
+    memo = {}
+
+    def explain(sunk_index, occupied, lengths):
+        key = (sunk_index, occupied, lengths)
+        if key in memo:
+            return memo[key]
+        total = 0
+        spaces = Counter()
+        if sunk_index < len(sunk_options):
+            for mask in sunk_options[sunk_index]:
+                if not mask & occupied:
+                    count, sub_spaces = explain(sunk_index + 1,
+                                                occupied | mask, lengths)
+                    total += count
+                    spaces.update(sub_spaces)
+        else:
+            uncovered = hits & ~occupied
+            if not uncovered:
+                total = 1
+            else:
+                space = (uncovered & -uncovered).bit_length() - 1
+                blocked = occupied | misses
+                # ships of the same length are interchangeable
+                for length in sorted(set(lengths)):
+                    index = lengths.index(length)
+                    rest = lengths[:index] + lengths[index + 1:]
+                    for mask in covering(width, height, length)[space]:
+                        if mask & blocked or not mask & ~hits:
+                            continue
+                        count, sub_spaces = explain(
+                            sunk_index, occupied | mask, rest)
+                        if not count:
+                            continue
+                        total += count
+                        spaces.update(sub_spaces)
+                        new_spaces = mask & ~guessed
+                        while new_spaces:
+                            low = new_spaces & -new_spaces
+                            spaces[low.bit_length() - 1] += count
+                            new_spaces ^= low
+        memo[key] = total, spaces
+        return total, spaces
+
+    return explain(0, 0, tuple(ship_lengths))
+
+
+def attribution_guess(radar_board, guess_list, ship_lengths, rng=random):
+    """
+    Return the row and column that best narrows down the attributions.
+
+    Parameters
+    ----------
+    radar_board : Board or BitBoard object
+        the board tracking the opponent's guesses
+    guess_list : list of Turn objects
+        every answered guess, in the order they were made
+    ship_lengths : iterable of int
+        the length of every ship still afloat
+    rng : random.Random or module, optional | default: random
+        source of random draws for breaking ties
+
+    Returns
+    -------
+    two-tuple of int or None - row and column guess coordinates, or None
+        when every hit is explained by the sunk ships or the answers
+        can't be explained at all
+    """
+    width = radar_board.width
+    hits, misses, sunk = radar_masks(width, guess_list)
+    total, spaces = solve(width, radar_board.height, hits, misses,
+                          tuple(sunk), tuple(sorted(ship_lengths)))
+    if not spaces:
+        return None
+    # (chance of a miss, expected attributions left after the guess)
+    scores = {space: (total - count,
+                      (count * count + (total - count) ** 2) / total)
+              for space, count in spaces.items()}
+    best_score = min(scores.values())
+    best = [space for space, score in scores.items()
+            if score == best_score]
+    return divmod(rng.choice(sorted(best)), width)
+
+
+class SolverTargeting(TargetingStrategy):
+    """The 'solver' targeting strategy."""
+    def guess(self):
+        """
+        Return tuple of row and column coordinates from hit attribution.
+
+        Every way the hits not tied to a sunken ship could belong to the
+        ships still afloat is found, and the space that best narrows
+        them down is returned.  With no hits left to explain, the
+        Opponent's lattice is sought from like 'legacy' targeting.
+
+        Returns
+        -------
+        two-tuple of int - row and column guess coordinates
+        """
+        opponent = self.opponent
+        guess = None
+        if opponent.spare_hits:
+            ship_lengths = [len(ship)
+                            for ship in opponent.radar_fleet.ships_remaining]
+            guess = attribution_guess(opponent.radar_board,
+                                      opponent._guess_list, ship_lengths,
+                                      opponent.rng)
+        if guess is None:
+            guess = opponent._seek_ships()
+        return guess
@@ -0,0 +1,213 @@
+"""
+Batched 'density' targeting for many games at once.
+
+An Opponent makes one guess at a time in Python, which is the bottleneck
+when an evaluation farm plays thousands of games.  OpponentBatch keeps
+the radar boards of N games as one (N, height, width) array and makes
+the next guess in every game still going with a single NumPy pass of
+the density module's placement counting.  That pass covers both seeking
+and destroying: placements over hits not tied to a sunken ship are
+weighted far above the rest, exactly as in 'density' targeting, so a
+game with open hits finishes off the damaged ship while the others seek.
+Answers for the whole batch are applied at once too.
+
+The lattice search's shuffled seek lists and hit lists are followed one
+step at a time per game, so they aren't batched; simulator.play_batch
+plays 'density' targeting games with this class.
+
+Classes
+-------
+OpponentBatch
+    The radar boards of many games, guessed on together
+"""
+
+from collections import Counter
+
+import numpy as np
+
+from density import weighted_placements
+from fleet import Fleet
+
+UNGUESSED, MISS, HIT = 0, 1, 2
+# Tie-breaking draws made for each game at a time, rounded to whole turns
+NOISE_BLOCK = 2048
+
+
+class OpponentBatch:
+    """
+    The radar boards of many games, guessed on together.
+
+    Attributes
+    ----------
+    radar : numpy.ndarray
+        (games, height, width) int8 array of each game's radar board,
+        0 for unguessed, 1 for a miss and 2 for a hit like hit_at
+    sunk_spaces : numpy.ndarray
+        (games, height, width) bool array of spaces judged to hold a
+        sunken ship
+    lengths : numpy.ndarray
+        each distinct ship length in the fleet, in ascending order
+    remaining : numpy.ndarray
+        (games, len(lengths)) int array counting the ships of each length
+        still afloat in each game
+    shots : numpy.ndarray
+        the number of guesses answered in each game
+    active : numpy.ndarray
+        bool array of the games still going
+    """
+    def __init__(self, games, *, width=10, height=10, seed=None):
+        """
+        Build an OpponentBatch of games that haven't started.
+
+        Parameters
+        ----------
+        games : int
+            the number of games in the batch
+        width : int, optional, keyword-only | default: 10
+            the number of columns on every board
+        height : int, optional, keyword-only | default: 10
+            the number of rows on every board
+        seed : int, sequence of int or None, optional, keyword-only
+            | default: None
+            seeds for the generators breaking ties between spaces, one
+            per game, so each game's guesses don't depend on the rest of
+            the batch; a single int or None seeds them all together
+        """
+        if games < 1:
+            raise ValueError("'games' must be at least 1.")
+        if seed is None or isinstance(seed, int):
+            seed = np.random.SeedSequence(seed).spawn(games)
+        elif len(seed) != games:
+            raise ValueError("'seed' must have one seed per game.")
+        self.width = width
+        self.height = height
+        self.radar = np.zeros((games, height, width), dtype=np.int8)
+        self.sunk_spaces = np.zeros((games, height, width), dtype=bool)
+        # the turn each space was guessed on, to find sunken ships by
+        self._turns = np.full((games, height, width), -1, dtype=np.int32)
+        counts = sorted(Counter(len(ship) for ship in Fleet()).items())
+        self.lengths = np.array([length for length, _ in counts])
+        self.remaining = np.tile([count for _, count in counts],
+                                 (games, 1))
+        self.shots = np.zeros(games, dtype=np.int32)
+        self.active = np.ones(games, dtype=bool)
+        self._rngs = [np.random.default_rng(game_seed) for game_seed in seed]
+        # each game's tie-breaking draws for a block of turns, one row a
+        #   turn, drawn from its generator in a single call per block
+        turns = max(1, NOISE_BLOCK // (width * height))
+        self._noise = np.empty((games, turns, width * height))
+        # the block of turns held in _noise for each game, -1 for none
+        self._noise_blocks = np.full(games, -1, dtype=np.int32)
+
+    # ------------Helper Methods------------ #
+    def _draw_noise(self, games):
+        """Return a row of tie-breaking draws for each game's turn."""
+        turns_per_block = self._noise.shape[1]
+        blocks, turns = np.divmod(self.shots[games], turns_per_block)
+        stale = self._noise_blocks[games] != blocks
+        # a block is drawn for every game at once, as they start together
+        for game in games[stale]:
+            self._rngs[game].random(out=self._noise[game])
+        self._noise_blocks[games] = blocks
+        return self._noise[games, turns]
+
+    def _mark_sunk_spaces(self, game, row, column, length):
+        """
+        Record the spaces most likely held by a ship sunk on a guess.
+
+        Follows the same rule as Opponent._mark_sunk_spaces: the ship
+        lies in a straight run of hits ending at the guess that isn't
+        tied to another sunken ship, the most recently guessed run
+        winning.
+        """
+        radar = self.radar[game]
+        sunk = self.sunk_spaces[game]
+        turns = self._turns[game]
+        # each straight run of 'length' spaces ending at the guess that
+        #   fits on the board, as a row or column slice
+        runs = []
+        if column + length <= self.width:
+            runs.append((row, slice(column, column + length)))
+        if column >= length - 1:
+            runs.append((row, slice(column - length + 1, column + 1)))
+        if row + length <= self.height:
+            runs.append((slice(row, row + length), column))
+        if row >= length - 1:
+            runs.append((slice(row - length + 1, row + 1), column))
+        best_run = None
+        best_turn = -1
+        for run in runs:
+            if (radar[run] == HIT).all() and not sunk[run].any():
+                first_turn = turns[run].min()
+                if first_turn > best_turn:
+                    best_run, best_turn = run, first_turn
+        if best_run is not None:
+            sunk[best_run] = True
+
+    # ------------Interface Methods------------ #
+    def make_guesses(self):
+        """
+        Make the next guess in every game still going.
+
+        Returns
+        -------
+        tuple of three numpy.ndarray - the game numbers, rows and
+            columns of the guesses
+        """
+        games = np.flatnonzero(self.active)
+        radar = self.radar[games]
+        sunk = self.sunk_spaces[games]
+        blocked = ((radar == MISS) | sunk).view(np.int8)
+        hits = ((radar == HIT) & ~sunk).view(np.int8)
+        remaining = self.remaining[games]
+        density = weighted_placements(
+            blocked, hits,
+            ((length, remaining[:, index, None, None])
+             for index, length in enumerate(self.lengths)))
+        # never guess a space twice
+        density[radar != UNGUESSED] = -1
+        density = density.reshape(len(games), -1)
+        # break ties at random by drawing a key for every best space
+        best = density == density.max(axis=1, keepdims=True)
+        keys = np.where(best, self._draw_noise(games), -1)
+        rows, columns = np.divmod(keys.argmax(axis=1), self.width)
+        return games, rows, columns
+
+    def apply_answers(self, games, rows, columns, hits, sunk_lengths):
+        """
+        Mark the answers to a batch of guesses on the radar boards.
+
+        A game ends when every ship in it has been answered sunk.
+
+        Parameters
+        ----------
+        games : numpy.ndarray
+            the game numbers of the guesses, each at most once
+        rows : numpy.ndarray
+            the rows of the guesses
+        columns : numpy.ndarray
+            the columns of the guesses
+        hits : numpy.ndarray
+            bool array of whether each guess hit
+        sunk_lengths : numpy.ndarray
+            the length of the ship each guess sunk, or 0 for none
+        """
+        if (self.radar[games, rows, columns] != UNGUESSED).any():
+            raise TypeError("A guess has already been made on one of those "
+                            "spaces.")
+        self.radar[games, rows, columns] = np.where(hits, HIT, MISS)
+        self._turns[games, rows, columns] = self.shots[games]
+        self.shots[games] += 1
+        for index in np.flatnonzero(sunk_lengths):
+            game, length = games[index], sunk_lengths[index]
+            length_index = np.searchsorted(self.lengths, length)
+            if (length_index == len(self.lengths)
+                    or self.lengths[length_index] != length
+                    or not self.remaining[game, length_index]):
+                raise ValueError("No ship of length {} is afloat in game "
+                                 "{}.".format(length, game))
+            self.remaining[game, length_index] -= 1
+            self._mark_sunk_spaces(game, rows[index], columns[index],
+                                   length)
+            if not self.remaining[game].any():
+                self.active[game] = False
@@ -0,0 +1,6 @@
+"""
+Benchmarks for the Battleship Bot modules.
+
+Each module in this package can be run from the root of the project,
+for example: python -m benchmarks.boards
+"""
@@ -0,0 +1,54 @@
+"""
+Compare batched 'density' targeting games against playing them one by one.
+
+The same seeded games are played twice: by simulator.play_game, one
+after another on the BitBoard engine, and by simulator.play_batch, all
+of them guessed on together by an OpponentBatch.  Both build the same
+target fleets, so the difference is the guessing.  Each is timed a few
+times and the best run is kept, then games per second and the speedup
+of the batch are printed.
+
+Usage: python -m benchmarks.batched [--games N] [--seed N] [--repeat N]
+"""
+
+import argparse
+import sys
+import time
+
+from simulator import play_batch, play_game
+
+
+def best_time(function, repeat):
+    """Return the best time in seconds of repeat calls to function."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def play_one_by_one(seeds):
+    """Play seeded 'density' targeting games one after another."""
+    return [play_game(seed, targeting='density', engine='bitboard')
+            for seed in seeds]
+
+
+def main(argv=None):
+    """Time both ways of playing the games and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=2020)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args(argv)
+    seeds = range(args.seed, args.seed + args.games)
+    one_by_one = best_time(lambda: play_one_by_one(seeds), args.repeat)
+    batched = best_time(lambda: play_batch(seeds), args.repeat)
+    for name, elapsed in (('one by one', one_by_one), ('batched', batched)):
+        print("{:>10}: {:.3f}s for {} games ({:.0f} games/s)".format(
+            name, elapsed, args.games, args.games / elapsed))
+    print("   speedup: {:.2f}x".format(one_by_one / batched))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Compare the Board object grid against the BitBoard bitmask engine.
+
+Many games are played side by side, one turn from each game at a time,
+with the computer opponent guessing against a randomly placed fleet.
+Both engines play the same seeded games, and the time taken by each is
+reported along with the speedup of BitBoard over Board.  Finding the
+longest run of hits, which Board does by walking its spaces and
+BitBoard with shifts and masks, is also timed on its own halfway
+through a game, and so is rebuilding a HitRunIndex from those hits.
+
+Usage: python -m benchmarks.boards [--games N] [--seed N]
+"""
+
+import argparse
+import sys
+import time
+
+from bitboard import BitBoard
+from opponent import HitRunIndex, Opponent
+from seeding import spawn_seeds
+from simulator import ENGINES, answer_guess
+
+
+def play_games(board_class, games, seed):
+    """
+    Play games side by side until each is won or stalls.
+
+    Returns
+    -------
+    tuple of float and int - elapsed seconds and number of stalled games
+    """
+    seeds = spawn_seeds(seed, 2 * games)
+    start = time.perf_counter()
+    live = [(Opponent(board_class=board_class, seed=seeds[2 * game]),
+             Opponent(board_class=board_class, seed=seeds[2 * game + 1]))
+            for game in range(games)]
+    stalled = 0
+    while live:
+        still_live = []
+        for opponent, target in live:
+            try:
+                row, column = opponent.make_guess()
+            except RuntimeError:
+                stalled += 1
+                continue
+            if not answer_guess(opponent, target.field_board,
+                                target.field_fleet, row, column):
+                still_live.append((opponent, target))
+        live = still_live
+    return time.perf_counter() - start, stalled
+
+
+def half_played(board_class, seed):
+    """Return an Opponent halfway through a seeded game."""
+    opponent_seed, target_seed = spawn_seeds(seed, 2)
+    opponent = Opponent(board_class=board_class, seed=opponent_seed)
+    target = Opponent(board_class=board_class, seed=target_seed)
+    for _ in range(50):
+        row, column = opponent.make_guess()
+        if answer_guess(opponent, target.field_board, target.field_fleet,
+                        row, column):
+            break
+    return opponent
+
+
+def time_longest_hit_run(board_class, seed, repeat=2000):
+    """
+    Time longest_hit_run on a radar board halfway through a game.
+
+    Returns
+    -------
+    float - average seconds per call
+    """
+    radar_board = half_played(board_class, seed).radar_board
+    start = time.perf_counter()
+    for _ in range(repeat):
+        radar_board.longest_hit_run()
+    return (time.perf_counter() - start) / repeat
+
+
+def time_hit_run_index(seed, repeat=2000):
+    """
+    Time rebuilding a HitRunIndex from the hits halfway through a game.
+
+    Returns
+    -------
+    float - average seconds per call
+    """
+    radar_board = half_played(BitBoard, seed).radar_board
+    start = time.perf_counter()
+    for _ in range(repeat):
+        HitRunIndex.from_mask(radar_board.hit_mask, radar_board.width,
+                              radar_board.height)
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    """Run the benchmark for each engine and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=2020)
+    args = parser.parse_args(argv)
+    results = {}
+    for name, board_class in ENGINES.items():
+        elapsed, stalled = play_games(board_class, args.games, args.seed)
+        results[name] = elapsed
+        print("{:>9}: {:.3f}s for {} games ({:.0f} games/s, {} stalled)"
+              .format(name, elapsed, args.games,
+                      args.games / elapsed, stalled))
+    print("  speedup: {:.2f}x".format(results['board']
+                                      / results['bitboard']))
+    for name, board_class in ENGINES.items():
+        per_call = time_longest_hit_run(board_class, args.seed)
+        results[name] = per_call
+        print("{:>9}: longest_hit_run {:.1f}us per call".format(
+            name, per_call * 1e6))
+    print("  speedup: {:.2f}x".format(results['board']
+                                      / results['bitboard']))
+    print("HitRunIndex.from_mask: {:.1f}us per call".format(
+        time_hit_run_index(args.seed) * 1e6))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
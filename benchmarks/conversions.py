@@ -0,0 +1,92 @@
+"""
+Compare location conversion through the lookup table and the functions.
+
+Every location on a board is parsed from a str like 'J10' and formatted
+back, first the way callers did it with convert_to_index and
+convert_from_index, then one at a time through the board size's
+LocationTable, then all at once with parse_locations and
+format_locations.  Times are printed in nanoseconds per location.
+
+Usage: python -m benchmarks.conversions [--width N] [--height N]
+"""
+
+import argparse
+import sys
+import timeit
+
+from gameconversions import (convert_from_index, convert_to_index,
+                             format_locations, location_table,
+                             parse_locations)
+
+
+def parse_with_functions(labels):
+    """Parse locations by splitting them and using convert_to_index."""
+    spaces = []
+    for label in labels:
+        letters = label.rstrip('0123456789')
+        spaces.append(convert_to_index(letters, label[len(letters):]))
+    return spaces
+
+
+def format_with_functions(spaces):
+    """Format locations by joining two convert_from_index results."""
+    return [convert_from_index(row, 'upper') + convert_from_index(column,
+                                                                  'one')
+            for row, column in spaces]
+
+
+def time_per_location(function, argument, count, repeat=5):
+    """Return the best time in nanoseconds per location of function."""
+    timer = timeit.Timer(lambda: function(argument))
+    number, _ = timer.autorange()
+    return (min(timer.repeat(number=number, repeat=repeat)) / number / count
+            * 1e9)
+
+
+def main(argv=None):
+    """Time every way of converting and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--height', type=int, default=10)
+    args = parser.parse_args(argv)
+    table = location_table(args.width, args.height)
+    spaces = [(row, column) for row in range(args.height)
+              for column in range(args.width)]
+    labels = format_with_functions(spaces)
+    log = ' '.join(labels)
+    assert parse_with_functions(labels) == parse_locations(
+        log, width=args.width, height=args.height)
+    assert format_locations(spaces, width=args.width,
+                            height=args.height) == labels
+
+    def table_parse(labels):
+        return [table.parse(label) for label in labels]
+
+    def table_format(spaces):
+        return [table.format(row, column) for row, column in spaces]
+
+    def bulk_parse(log):
+        return parse_locations(log, width=args.width, height=args.height)
+
+    def bulk_format(spaces):
+        return format_locations(spaces, width=args.width,
+                                height=args.height)
+
+    results = [
+        ('parse', 'functions', parse_with_functions, labels),
+        ('parse', 'table', table_parse, labels),
+        ('parse', 'bulk log', bulk_parse, log),
+        ('format', 'functions', format_with_functions, spaces),
+        ('format', 'table', table_format, spaces),
+        ('format', 'bulk', bulk_format, spaces),
+    ]
+    baseline = {}
+    for action, method, function, argument in results:
+        nanoseconds = time_per_location(function, argument, len(spaces))
+        baseline.setdefault(action, nanoseconds)
+        print("{:>7} {:<10} {:8.0f}ns  {:5.1f}x".format(
+            action, method, nanoseconds, baseline[action] / nanoseconds))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
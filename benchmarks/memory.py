@@ -0,0 +1,84 @@
+"""
+Measure the memory footprint of a game of Battleship Bot.
+
+Many seeded games are held in memory at once, the way a server hosting
+concurrent games would hold them, and tracemalloc reports how much
+memory each one takes.  Games are measured both freshly set up and
+after the opponent has played them to the end.
+
+Usage: python -m benchmarks.memory [--games N] [--seed N]
+"""
+
+import argparse
+import sys
+import tracemalloc
+
+from opponent import Opponent
+from seeding import spawn_seeds
+from simulator import ENGINES, answer_guess
+
+
+def play_out(opponent, target):
+    """Play the opponent's guesses until the target fleet is defeated."""
+    while True:
+        try:
+            row, column = opponent.make_guess()
+        except RuntimeError:
+            return
+        if answer_guess(opponent, target.field_board, target.field_fleet,
+                        row, column):
+            return
+
+
+def footprint(board_class, games, seed, finished):
+    """
+    Return the average bytes held per game.
+
+    Each game holds an Opponent and the target whose fleet it guesses
+    against, just like a game against a player holds an Opponent.
+
+    Parameters
+    ----------
+    board_class : class
+        Board or BitBoard
+    games : int
+        the number of games held in memory at once
+    seed : int
+        seed the seeds of every opponent and target are spawned from
+    finished : boolean
+        indicates whether games are played to the end before measuring
+    """
+    seeds = spawn_seeds(seed, 2 * games)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    held = []
+    for game in range(games):
+        opponent = Opponent(board_class=board_class, seed=seeds[2 * game])
+        target = Opponent(board_class=board_class,
+                          seed=seeds[2 * game + 1])
+        if finished:
+            play_out(opponent, target)
+        # only the opponent is counted, the target stands in for a player
+        held.append(opponent)
+        del target
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    return sum(stat.size_diff for stat in stats) / games
+
+
+def main(argv=None):
+    """Measure each engine and print the bytes held per game."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=2020)
+    args = parser.parse_args(argv)
+    for name, board_class in ENGINES.items():
+        for finished in (False, True):
+            size = footprint(board_class, args.games, args.seed, finished)
+            print("{:>9} {:>8} game: {:8.0f} bytes".format(
+                name, 'finished' if finished else 'new', size))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
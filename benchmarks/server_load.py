@@ -0,0 +1,183 @@
+"""
+Load generator for the asyncio game server.
+
+Starts the server in a separate process (or uses one already running
+with --port), then plays many sessions at once over a pool of
+connections.  Each session alternates between firing at the computer's
+fleet and answering the computer's guesses against its own randomly
+placed fleet until one side wins.  The round trip time of every move is
+recorded and the p50 and p99 latencies are reported per operation.
+Every session gets a seed of its own from seeding.spawn_seeds, which
+seeds the server's opponent, the player's fleet and the player's shots,
+so a run only depends on --seed.
+
+Usage: python -m benchmarks.server_load [--sessions N] [--connections N]
+                                        [--port PORT] [--seed N]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import socket
+import sys
+import time
+from collections import defaultdict
+
+from opponent import Opponent
+from seeding import spawn_seeds
+
+
+class Client:
+    """A connection that can carry many requests at once."""
+    def __init__(self, reader, writer):
+        """Build a Client from an open stream reader and writer."""
+        self._reader = reader
+        self._writer = writer
+        self._pending = {}
+        self._ids = itertools.count()
+        self._listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self):
+        """Hand each response line to the request waiting for it."""
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            self._pending.pop(response['id']).set_result(response)
+
+    async def request(self, **request):
+        """Send a request and return the response."""
+        request['id'] = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request['id']] = future
+        self._writer.write(json.dumps(request).encode() + b'\n')
+        await self._writer.drain()
+        response = await future
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response
+
+    async def close(self):
+        """Close the connection."""
+        self._listener.cancel()
+        self._writer.close()
+
+
+async def play_session(client, latencies, seed):
+    """Play one seeded session to the end, timing each move."""
+    async def timed(op, **request):
+        start = time.perf_counter()
+        response = await client.request(op=op, **request)
+        latencies[op].append(time.perf_counter() - start)
+        return response
+
+    server_seed, player_seed, shots_seed = spawn_seeds(seed, 3)
+    session = (await timed('new', seed=server_seed))['session']
+    # the player's fleet, placed by the same rules as the computer's
+    player = Opponent(seed=player_seed)
+    rng = random.Random(shots_seed)
+    fleet_spaces = [(row, column) for row in range(10) for column in range(10)]
+    rng.shuffle(fleet_spaces)
+    while True:
+        row, column = fleet_spaces.pop()
+        if (await timed('fire', session=session, row=row,
+                        column=column))['winner']:
+            break
+        guess = await timed('guess', session=session)
+        segment = player.field_board.take_guess(guess['row'],
+                                                guess['column'])
+        await timed('answer', session=session, row=guess['row'],
+                    column=guess['column'], hit=bool(segment))
+        if segment:
+            segment.hit = True
+            sunk = str(segment.ship) if segment.ship.sunk else None
+            if (await timed('sunk', session=session, ship=sunk))['winner']:
+                break
+    await timed('close', session=session)
+
+
+def percentile(values, fraction):
+    """Return the value at a fraction of the way through sorted values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def run_load(port, sessions, connections, seed):
+    """Play every session at once and return latencies by operation."""
+    clients = []
+    for _ in range(connections):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        clients.append(Client(reader, writer))
+    latencies = defaultdict(list)
+    await asyncio.gather(*(
+        play_session(clients[index % connections], latencies, session_seed)
+        for index, session_seed in enumerate(spawn_seeds(seed, sessions))))
+    for client in clients:
+        await client.close()
+    return latencies
+
+
+async def start_server():
+    """Start the server in a new process and return it and its port."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, '-m', 'server', '--port', str(port),
+        stdout=asyncio.subprocess.PIPE)
+    # the server prints a line once it is about to listen
+    await process.stdout.readline()
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            await asyncio.sleep(0.05)
+        else:
+            writer.close()
+            break
+    return process, port
+
+
+async def run(args):
+    """Run the load generator with parsed command line arguments."""
+    process = None
+    port = args.port
+    if port is None:
+        process, port = await start_server()
+    try:
+        start = time.perf_counter()
+        latencies = await run_load(port, args.sessions, args.connections,
+                                   args.seed)
+        elapsed = time.perf_counter() - start
+    finally:
+        if process:
+            process.terminate()
+            await process.wait()
+    moves = sum(len(values) for values in latencies.values())
+    print("{} sessions over {} connections: {} moves in {:.2f}s "
+          "({:.0f} moves/s)".format(args.sessions, args.connections, moves,
+                                    elapsed, moves / elapsed))
+    every_move = [value for values in latencies.values() for value in values]
+    for op, values in sorted(latencies.items()) + [('all', every_move)]:
+        print("{:>7}: p50 {:8.2f}ms   p99 {:8.2f}ms".format(
+            op, percentile(values, 0.5) * 1e3,
+            percentile(values, 0.99) * 1e3))
+
+
+def main(argv=None):
+    """Parse arguments and run the load generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=1000)
+    parser.add_argument('--connections', type=int, default=100)
+    parser.add_argument('--port', type=int, default=None,
+                        help="use a server already running on PORT")
+    parser.add_argument('--seed', type=int, default=2020)
+    args = parser.parse_args(argv)
+    asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
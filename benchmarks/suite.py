@@ -0,0 +1,215 @@
+"""
+Micro and macro benchmarks for the computer opponent's hot paths.
+
+Each micro benchmark times one method on a fixed, seeded game state:
+building an Opponent (which places its ships), make_guess in seek and
+destroy modes, possible_sunk, _build_hit_list, Fleet.ships_remaining and
+Board._set_up_spaces.  The macro benchmark times whole headless games.
+
+Results are written as JSON in seconds per call and compared against a
+stored baseline.  Any benchmark slower than its baseline by more than
+the threshold is timed a second time, and if it is still too slow, the
+run exits with status 1.  Baselines depend on
+the machine, so refresh them with --update-baseline when moving to a
+new one.
+
+With --decisions, the benchmarks aren't timed.  Instead the macro
+benchmark's games are played once with decision statistics collected
+(see the instrumentation module), and the totals are printed as JSON or
+Prometheus text.
+
+Usage: python -m benchmarks.suite [--output FILE] [--baseline FILE]
+                                  [--threshold RATIO] [--update-baseline]
+                                  [--decisions {json,prometheus}]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+from board import Board
+from instrumentation import DecisionStats
+from opponent import Opponent
+from seeding import spawn_seeds
+from simulator import answer_guess, play_game
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SEED = 2020
+THRESHOLD = 0.5
+THROUGHPUT_GAMES = 200
+
+
+def game_state(seed, stop_when):
+    """
+    Play a seeded game until stop_when(opponent) is True.
+
+    If a game ends before reaching the state, the next seed is tried.
+
+    Returns
+    -------
+    Opponent object - the opponent with the game state at that point
+    """
+    while True:
+        opponent_seed, target_seed = spawn_seeds(seed, 2)
+        opponent = Opponent(seed=opponent_seed)
+        target = Opponent(seed=target_seed)
+        while not stop_when(opponent):
+            row, column = opponent.make_guess()
+            if answer_guess(opponent, target.field_board,
+                            target.field_fleet, row, column):
+                break
+        else:
+            return opponent
+        seed += 1
+
+
+def seeking(opponent):
+    """Return whether the opponent is seeking after a few misses."""
+    return (len(opponent._guess_list) >= 20 and not opponent.spare_hits
+            and not opponent.last_guess.hit)
+
+
+def destroying(opponent):
+    """Return whether the opponent is destroying a ship after a hit."""
+    return (len(opponent._guess_list) >= 20 and opponent.last_guess.hit
+            and not opponent.last_guess.sunk)
+
+
+def time_call(function, setup=None, repeat=7):
+    """Return the best time in seconds per call of function."""
+    def run():
+        if setup:
+            setup()
+        function()
+    timer = timeit.Timer(run)
+    # pick a number of calls that takes at least 0.2 seconds
+    number, _ = timer.autorange()
+    return min(timer.repeat(number=number, repeat=repeat)) / number
+
+
+def run_benchmarks(names=None):
+    """
+    Run benchmarks on fixed seeded states.
+
+    Parameters
+    ----------
+    names : iterable of str or None, optional | default: None
+        names of the benchmarks to run, None runs all of them
+
+    Returns
+    -------
+    dict - benchmark name mapped to seconds per call
+    """
+    seek_state = game_state(SEED, seeking)
+    destroy_state = game_state(SEED, destroying)
+    board = Board('field')
+
+    def clear_hit_list():
+        destroy_state._hit_list.clear()
+
+    def play_games():
+        # whole games, played one after another in this process
+        for seed in range(THROUGHPUT_GAMES):
+            play_game(seed)
+
+    # name: (function, setup, calls made by function)
+    benchmarks = {
+        'opponent_init': (lambda: Opponent(seed=SEED), None, 1),
+        'make_guess_seek': (seek_state.make_guess, None, 1),
+        'make_guess_destroy': (destroy_state.make_guess, clear_hit_list, 1),
+        'possible_sunk': (destroy_state.possible_sunk, None, 1),
+        'build_hit_list': (destroy_state._build_hit_list, clear_hit_list, 1),
+        'ships_remaining': (
+            lambda: destroy_state.radar_fleet.ships_remaining, None, 1),
+        'set_up_spaces': (board._set_up_spaces, board.clear, 1),
+        'full_game': (play_games, None, THROUGHPUT_GAMES),
+    }
+    if names is None:
+        names = benchmarks
+    results = {}
+    for name in names:
+        function, setup, calls = benchmarks[name]
+        results[name] = time_call(function, setup) / calls
+    return results
+
+
+def decision_stats():
+    """Return the decision statistics of the macro benchmark's games."""
+    stats = DecisionStats()
+    for seed in range(THROUGHPUT_GAMES):
+        play_game(seed, stats=stats)
+    return stats
+
+
+def compare(results, baseline, threshold):
+    """
+    Compare results to a baseline.
+
+    Returns
+    -------
+    dict - name of every benchmark over the threshold mapped to how much
+        slower it ran, eg. 0.6 for 60% slower
+    """
+    return {name: seconds / baseline[name] - 1
+            for name, seconds in results.items()
+            if name in baseline and seconds / baseline[name] > 1 + threshold}
+
+
+def main(argv=None):
+    """Run the suite, write results and check them against baseline."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--output', help="write results as JSON to FILE")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help="allowed slowdown ratio (default: %(default)s)")
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--decisions', choices=('json', 'prometheus'),
+                        help="print decision statistics instead of timing")
+    args = parser.parse_args(argv)
+    if args.decisions == 'json':
+        print(decision_stats().to_json(indent=2))
+        return 0
+    if args.decisions == 'prometheus':
+        print(decision_stats().to_prometheus(), end='')
+        return 0
+
+    results = run_benchmarks()
+    report = {
+        'python': platform.python_version(),
+        'seconds_per_call': results,
+        'games_per_second': 1 / results['full_game'],
+    }
+    for name, seconds in results.items():
+        print("{:>20}: {:10.2f}us".format(name, seconds * 1e6))
+    print("{:>20}: {:10.1f}".format('games_per_second',
+                                    report['games_per_second']))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+    if args.update_baseline:
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(report, baseline_file, indent=2)
+        return 0
+    try:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)['seconds_per_call']
+    except FileNotFoundError:
+        print("No baseline found at {}.".format(args.baseline))
+        return 0
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        # time anything over the threshold again to rule out a noisy run
+        for name, seconds in run_benchmarks(regressions).items():
+            results[name] = min(results[name], seconds)
+        regressions = compare(results, baseline, args.threshold)
+    for name, slowdown in regressions.items():
+        print("REGRESSION: {} is {:.0%} slower than baseline".format(
+            name, slowdown))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,332 @@
+"""
+Contains the BitBoard class, an integer bitmask alternative to Board.
+
+A BitBoard keeps the same zero-indexed row and column layout as a
+Board, but instead of holding a Space object for every grid location,
+it stores the state of the whole grid in a few Python ints with one bit
+per space.  Bit number row * width + column represents a space, so
+space A10 on a 10 x 10 board is bit 9 and space B1 is bit 10.
+
+Reading a space is a single bit test, and free room for a ship is
+checked with one AND of the ship's mask against the occupied mask,
+instead of walking the grid one Space at a time.  Rows of hits are
+found by shifting a mask by one bit, and columns of hits by shifting it
+by a full row, so runs of hits are found with a handful of AND
+operations too.  The run functions work on any mask, so HitRunIndex
+uses them to rebuild its runs from a mask of hits.
+
+Functions
+---------
+set_bits
+    Yield the number of every set bit of a mask, lowest first.
+longest_run
+    Return the length of the longest run of set bits in a row or column.
+hit_runs
+    Return every horizontal and vertical run of set bits in a mask.
+
+Classes
+-------
+BitBoard
+    A board that tracks guesses, hits and ship segments as bitmasks
+"""
+
+from functools import lru_cache
+
+from gameconversions import location_table
+
+
+@lru_cache(maxsize=None)
+def _edge_masks(width, height):
+    """
+    Return the masks that keep runs from wrapping between rows.
+
+    Returns
+    -------
+    tuple of int - every space, every space but the first column and
+        every space but the last column
+    """
+    first_column = 0
+    for row in range(height):
+        first_column |= 1 << (row * width)
+    full = (1 << (width * height)) - 1
+    return (full, full & ~first_column,
+            full & ~(first_column << (width - 1)))
+
+
+def set_bits(mask):
+    """Yield the number of every set bit of a mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def longest_run(mask, width, height):
+    """
+    Return the length of the longest run of set bits in a row or column.
+
+    Each pass keeps only the bits that still have a set neighbor one
+    space further along, which shortens every run by one, so the number
+    of passes until the mask is empty is the length of the longest run.
+
+    Parameters
+    ----------
+    mask : int
+        one bit per space, bit = row * width + column
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+
+    Returns
+    -------
+    int - the length of the longest horizontal or vertical run
+    """
+    full, _, no_last_column = _edge_masks(width, height)
+    longest = 0
+    for shift, keep_mask in ((1, no_last_column), (width, full)):
+        run_mask = mask
+        length = 0
+        while run_mask:
+            run_mask &= (run_mask >> shift) & keep_mask
+            length += 1
+        longest = max(longest, length)
+    return longest
+
+
+def hit_runs(mask, width, height):
+    """
+    Return every horizontal and vertical run of set bits in a mask.
+
+    A run starts on a set bit whose neighbor before it is clear, so the
+    starts of every run in a row, and of every run down a column, are
+    found with a shift and an AND.  Each run is then followed from its
+    start to its end.  Runs of a single space are in both lists.
+
+    Parameters
+    ----------
+    mask : int
+        one bit per space, bit = row * width + column
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+
+    Returns
+    -------
+    tuple of two list - (row, first column, last column) of every
+        horizontal run, then (column, first row, last row) of every
+        vertical run
+    """
+    _, no_first_column, no_last_column = _edge_masks(width, height)
+    # the bits whose next space along the row is set as well
+    goes_on = mask & (mask >> 1) & no_last_column
+    rows = []
+    for start in set_bits(mask & ~((mask << 1) & no_first_column)):
+        end = start
+        while goes_on >> end & 1:
+            end += 1
+        rows.append((start // width, start % width, end % width))
+    columns = []
+    for start in set_bits(mask & ~(mask << width)):
+        end = start
+        while mask >> (end + width) & 1:
+            end += width
+        columns.append((start % width, start // width, end // width))
+    return rows, columns
+
+
+class BitBoard:
+    """
+    A board that tracks guesses, hits and ship segments as bitmasks.
+
+    BitBoard offers the same interface methods as Board, so an Opponent
+    can be built with either one.
+
+    Attributes
+    ----------
+    role : str
+        'radar' or 'field' determines board purpose
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    guessed_mask : int
+        bitmask of every space that has been guessed
+    hit_mask : int
+        bitmask of every guessed space that was a hit
+    occupied_mask : int
+        bitmask of every space holding a ship segment
+    """
+    def __init__(self, role, width=10, height=10):
+        """
+        Construct attributes for BitBoard object
+
+        Parameters
+        ----------
+            role : str
+                'radar' or 'field' determines board purpose
+            width : int, optional | default: 10
+                the number of columns on the board
+            height : int, optional | default: 10
+                the number of rows on the board
+        """
+        if role not in {'radar', 'field'}:
+            raise ValueError(
+                "'role' argument must equal 'radar' or 'field'.")
+        if width < 1 or height < 1:
+            raise ValueError(
+                "'width' and 'height' arguments must be at least 1.")
+        self.role = role
+        self.width = width
+        self.height = height
+        self.guessed_mask = 0
+        self.hit_mask = 0
+        self.occupied_mask = 0
+        self._segments = {}
+        # ship masks used for placement, by length and orientation
+        self._span_masks = {}
+
+    # ------------Setup Methods------------ #
+    def _span_mask(self, length, orientation):
+        """Return mask of a ship of given length anchored at bit 0."""
+        key = (length, orientation)
+        if key not in self._span_masks:
+            if orientation == 'h':
+                mask = (1 << length) - 1
+            else:
+                mask = 0
+                for index in range(length):
+                    mask |= 1 << (index * self.width)
+            self._span_masks[key] = mask
+        return self._span_masks[key]
+
+    # ------------Helper Methods------------ #
+    def _bit(self, row, column):
+        """Return the single-bit mask for a row and column."""
+        return 1 << (row * self.width + column)
+
+    def _location(self, row, column):
+        """Return the str location of a row and column, eg. 'F7'."""
+        return location_table(self.width, self.height).labels[row][column]
+
+    def _validate_unguessed(self, row, column):
+        """Check that a space is unguessed, then mark it guessed."""
+        bit = self._bit(row, column)
+        if self.guessed_mask & bit:
+            raise TypeError(
+                "Can't make a guess on '"
+                + self._location(row, column)
+                + "' since a guess has already been made on the space.")
+        self.guessed_mask |= bit
+        return bit
+
+    # ------------Interface Methods------------ #
+    def hit_at(self, row, column):
+        """
+        Return the hit value of a space.
+
+        Returns
+        -------
+        int - 0: unguessed, 1: miss, 2: hit
+        """
+        bit = 1 << (row * self.width + column)
+        if self.hit_mask & bit:
+            return 2
+        if self.guessed_mask & bit:
+            return 1
+        return 0
+
+    def guessed_at(self, row, column):
+        """Return boolean indicating whether a space has been guessed."""
+        return bool(self.guessed_mask >> (row * self.width + column) & 1)
+
+    def segment_at(self, row, column):
+        """Return the Segment placed on a space or None."""
+        return self._segments.get(row * self.width + column)
+
+    def note_guess(self, row, column, hit):
+        """
+        Mark space as guessed and record whether the guess was a hit.
+
+        Returns
+        -------
+        int - newly assigned hit value of the space
+        """
+        bit = self._validate_unguessed(row, column)
+        if hit:
+            self.hit_mask |= bit
+            return 2
+        return 1
+
+    def take_guess(self, row, column):
+        """
+        Mark space as guessed and return segment from space or None.
+
+        Returns
+        -------
+        Segment object or None
+        """
+        bit = self._validate_unguessed(row, column)
+        segment = self.segment_at(row, column)
+        if segment:
+            self.hit_mask |= bit
+        return segment
+
+    def mark_guessed(self, guessed_mask, hit_mask=0):
+        """
+        Mark many spaces guessed at once, like restoring a saved game.
+
+        Parameters
+        ----------
+        guessed_mask : int
+            bitmask of the spaces to mark guessed, none of them guessed
+            yet, bit = row * width + column
+        hit_mask : int, optional | default: 0
+            bitmask of the guessed spaces that were hits, read on a
+            radar board only since a field board knows its segments
+        """
+        if self.guessed_mask & guessed_mask:
+            raise TypeError("Can't mark spaces guessed twice.")
+        self.guessed_mask |= guessed_mask
+        if self.role == 'radar':
+            self.hit_mask |= hit_mask & guessed_mask
+        else:
+            self.hit_mask |= self.occupied_mask & guessed_mask
+
+    def fits(self, row, column, length, orientation):
+        """Return whether a ship fits unobstructed at a starting space."""
+        if orientation == 'h':
+            if row >= self.height or column + length > self.width:
+                return False
+        elif row + length > self.height or column >= self.width:
+            return False
+        mask = self._span_mask(length, orientation) << (
+            row * self.width + column)
+        return not self.occupied_mask & mask
+
+    def place(self, row, column, ship):
+        """Place the segments of a ship starting at the given space."""
+        if not self.fits(row, column, len(ship), ship.orientation):
+            raise TypeError(
+                "Can't place {} at {} since the spaces ".format(
+                    ship, self._location(row, column))
+                + "are occupied or off the board.")
+        if ship.orientation == 'h':
+            step = 1
+        else:
+            step = self.width
+        start = row * self.width + column
+        for index, segment in enumerate(ship.segments):
+            self._segments[start + index * step] = segment
+        self.occupied_mask |= self._span_mask(
+            len(ship), ship.orientation) << start
+
+    def longest_hit_run(self):
+        """Return length of longest horizontal or vertical run of hits."""
+        return longest_run(self.hit_mask, self.width, self.height)
+
+    # ------------Additional Dunder Methods------------ #
+    def __str__(self):
+        """Return string of board with role listed."""
+        return "{} board".format(self.role)
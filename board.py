@@ -1,38 +1,65 @@
 """
 Contains the Board and Space classes to place or guess ship locations.
 
-This module is used to set up two 10x10 grids where the computer
-opponent can track guesses on its turn and also place its own ships to
-receive guesses from the player.
+This module is used to set up two grids (10x10 by default) where the
+computer opponent can track guesses on its turn and also place its own
+ships to receive guesses from the player.
 
 The Board is a zero-indexed list of zero-indexed lists.  The first
 index represents the letter-row, and the second represents the
 number-column.
 For example, space A10 would be identified as board[0][9].
 
+Board also offers interface methods such as hit_at(), place() and
+longest_hit_run(), so callers don't have to reach into the Space
+objects.  The bitboard module provides BitBoard, a bitmask engine with
+the same interface methods.
+
 Classes
 -------
 Board
-    A 2-D list representing a 10 x 10 grid
+    A 2-D list representing a grid, 10 x 10 by default
 Space
     A class for a space on the board which can hold a ship segment.
 """
 
-from string import ascii_lowercase as alphabet
-
+from bitboard import set_bits
+from gameconversions import location_table
+from placementindex import placement_index
 from spaces import FieldSpace, RadarSpace
 
 
+def locations(width, height):
+    """
+    Return the str location of every space on a board, eg. 'J7'.
+
+    Comes from the shared LocationTable of the board size, so every
+    Space on every Board of that size shares the same str objects.
+
+    Returns
+    -------
+    tuple of tuple of str - locations indexed by row, then column
+    """
+    return location_table(width, height).labels
+
+
 class Board(list):
     """
-    A 2-D list representing a 10 x 10 grid
+    A 2-D list representing a grid, 10 x 10 by default
 
     Attributes
     ----------
     role : str
         'radar' or 'field' determines board purpose
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    occupied_mask : int
+        bitmask of every space holding a ship segment, bit = row *
+        width + column like on a BitBoard
     """
-    def __init__(self, role, *args, **kwargs):
+    def __init__(self, role, *args, width=10, height=10, **kwargs):
         """
         Construct attributes for Board object
 
@@ -40,28 +67,136 @@ class Board(list):
         ----------
             role : str
                 'radar' or 'field' determines board purpose
+            width : int, optional, keyword-only | default: 10
+                the number of columns on the board
+            height : int, optional, keyword-only | default: 10
+                the number of rows on the board
         """
         if role not in {'radar', 'field'}:
             raise ValueError(
                 "'role' argument must equal 'radar' or 'field'.")
+        if width < 1 or height < 1:
+            raise ValueError(
+                "'width' and 'height' arguments must be at least 1.")
         super().__init__(*args, **kwargs)
         self.role = role
+        self.width = width
+        self.height = height
+        self.occupied_mask = 0
         self._set_up_spaces()
 
     # ------------Setup Methods------------ #
     def _set_up_spaces(self):
-        """Set up 10 x 10 zero-indexed grid with Space instances."""
-        for index, letter in enumerate(alphabet[:10]):
+        """Set up zero-indexed grid of width x height Space instances."""
+        for index, row_locations in enumerate(
+                locations(self.width, self.height)):
             self.append([])
-            for number in range(10):
-                # Generate str representation of location for space.
-                # Example: 'J7'
-                location = letter.upper() + str(number + 1)
+            for location in row_locations:
                 if self.role == 'radar':
                     self[index].append(RadarSpace(location, self))
                 else:
                     self[index].append(FieldSpace(location, self))
 
+    # ------------Interface Methods------------ #
+    def hit_at(self, row, column):
+        """
+        Return the hit value of a RadarSpace.
+
+        Returns
+        -------
+        int - 0: unguessed, 1: miss, 2: hit
+        """
+        return self[row][column].hit
+
+    def guessed_at(self, row, column):
+        """Return boolean indicating whether a space has been guessed."""
+        return self[row][column].guessed
+
+    def segment_at(self, row, column):
+        """Return the Segment assigned to a FieldSpace or None."""
+        return self[row][column].segment
+
+    def note_guess(self, row, column, hit):
+        """
+        Mark RadarSpace as guessed and record whether it was a hit.
+
+        Returns
+        -------
+        int - newly assigned hit value of the space
+        """
+        return self[row][column].note_guess(hit)
+
+    def take_guess(self, row, column):
+        """
+        Mark FieldSpace as guessed and return its segment or None.
+
+        Returns
+        -------
+        Segment object or None
+        """
+        return self[row][column].take_guess()
+
+    def mark_guessed(self, guessed_mask, hit_mask=0):
+        """
+        Mark many spaces guessed at once, like restoring a saved game.
+
+        Parameters
+        ----------
+        guessed_mask : int
+            bitmask of the spaces to mark guessed, none of them guessed
+            yet, bit = row * width + column
+        hit_mask : int, optional | default: 0
+            bitmask of the guessed spaces that were hits, read on a
+            radar board only since a field board knows its segments
+        """
+        width = self.width
+        for bit in set_bits(guessed_mask):
+            self[bit // width][bit % width].restore_guess(hit_mask >> bit & 1)
+
+    def fits(self, row, column, length, orientation):
+        """Return whether a ship fits unobstructed at a starting space."""
+        return placement_index(self.width, self.height).fits(
+            self.occupied_mask, row, column, length, orientation)
+
+    def place(self, row, column, ship):
+        """Place the segments of a ship starting at the given space."""
+        if not self.fits(row, column, len(ship), ship.orientation):
+            raise TypeError(
+                "Can't place {} at {} since the spaces ".format(
+                    ship, self[row][column].location)
+                + "are occupied or off the board.")
+        if ship.orientation == 'h':
+            for index, segment in enumerate(ship.segments):
+                self[row][column + index].segment = segment
+        else:
+            for index, segment in enumerate(ship.segments):
+                self[row + index][column].segment = segment
+        self.occupied_mask |= placement_index(self.width, self.height).mask(
+            row, column, len(ship), ship.orientation)
+
+    def longest_hit_run(self):
+        """Return length of longest horizontal or vertical run of hits."""
+        longest = 0
+        # check horizontally adjacent hits on each row
+        for row in self:
+            counter = 0
+            for space in row:
+                if space.hit == 2:
+                    counter += 1
+                    longest = max(longest, counter)
+                else:
+                    counter = 0
+        # check vertically adjacent hits on each column
+        for column in range(self.width):
+            counter = 0
+            for row in self:
+                if row[column].hit == 2:
+                    counter += 1
+                    longest = max(longest, counter)
+                else:
+                    counter = 0
+        return longest
+
     # ------------Additional Dunder Methods------------ #
     def __str__(self):
         """Return string of board with role listed."""
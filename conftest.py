@@ -0,0 +1 @@
+"""Lets pytest import the game modules from the root of the repository."""
@@ -0,0 +1,213 @@
+"""
+A probability-density targeting engine for the computer opponent.
+
+On every turn, every legal placement of each ship still afloat is
+counted on the radar board, and the unguessed space covered by the most
+placements is chosen as the next guess.  Placements can't cover a
+miss or a space tied to a sunken ship.  While there are hits not tied
+to a sunken ship, placements that cover those hits are weighted far
+above the rest, so the engine finishes off a damaged ship before
+seeking elsewhere.
+
+Placements are counted for a whole board at once with NumPy sliding
+window sums, so a decision takes a small fraction of a millisecond on a
+10 x 10 board.  The same sums work on a stack of boards, which the
+batch module uses to count placements for many games in one pass.
+
+Functions
+---------
+radar_arrays
+    Return arrays of the blocked spaces and open hits on a radar board.
+density_map
+    Return an array counting the weighted placements covering each space.
+weighted_placements
+    Return weighted placement counts for one board or a stack of boards.
+density_guess
+    Return the row and column of the highest-density unguessed space.
+
+Classes
+-------
+DensityTargeting
+    The 'density' targeting strategy
+"""
+
+import random
+from collections import Counter
+
+import numpy as np
+
+from strategies import TargetingStrategy
+
+# Weight multiplied in for every open hit covered by a placement
+HIT_WEIGHT = 50
+
+
+def radar_arrays(radar_board, sunk_spaces=()):
+    """
+    Return arrays of the blocked spaces and open hits on a radar board.
+
+    Parameters
+    ----------
+    radar_board : Board or BitBoard object
+        the board tracking the opponent's guesses
+    sunk_spaces : iterable of two-tuple of int, optional | default: ()
+        row and column of every space tied to a sunken ship
+
+    Returns
+    -------
+    tuple of two numpy.ndarray - int arrays of blocked spaces (misses
+        and sunken ships) and open hits, each with 1 on a matching space
+        and 0 elsewhere
+    """
+    state = np.array(
+        [[radar_board.hit_at(row, column)
+          for column in range(radar_board.width)]
+         for row in range(radar_board.height)], dtype=np.int16)
+    for row, column in sunk_spaces:
+        state[row, column] = 1
+    return (state == 1).astype(np.int16), (state == 2).astype(np.int16)
+
+
+def _running_sums(grid):
+    """Return running sums along the rows of grid, padded with zeros."""
+    padded = np.zeros((grid.shape[0], grid.shape[1] + 1) + grid.shape[2:],
+                      dtype=np.intp)
+    # a step per column, which NumPy does far quicker than cumsum
+    #   across such short rows
+    for column in range(grid.shape[1]):
+        np.add(padded[:, column], grid[:, column], out=padded[:, column + 1])
+    return padded
+
+
+def _add_placements(density, blocked_sums, hit_sums, hit_weights, length,
+                    count):
+    """Add the horizontal placements of ships of one length to density."""
+    span = blocked_sums.shape[1] - length
+    if span < 1:
+        return
+    # running sums turn every window of 'length' spaces into one subtraction
+    blocked_covered = blocked_sums[:, length:] - blocked_sums[:, :-length]
+    hits_covered = hit_sums[:, length:] - hit_sums[:, :-length]
+    weights = hit_weights.take(hits_covered)
+    weights *= count
+    weights *= blocked_covered == 0
+    # spread the weight of each placement over the spaces it covers
+    for offset in range(length):
+        density[:, offset:offset + span] += weights
+
+
+def density_map(blocked, hits, ship_lengths):
+    """
+    Return an array counting the weighted placements covering each space.
+
+    Parameters
+    ----------
+    blocked : numpy.ndarray
+        2-D array with 1 on every space no ship afloat can cover
+    hits : numpy.ndarray
+        2-D array with 1 on every hit not tied to a sunken ship
+    ship_lengths : iterable of int
+        lengths of the ships still afloat
+
+    Returns
+    -------
+    numpy.ndarray - 2-D float array of weighted placement counts
+    """
+    return weighted_placements(blocked, hits, Counter(ship_lengths).items())
+
+
+def weighted_placements(blocked, hits, length_counts):
+    """
+    Return weighted placement counts for one board or a stack of boards.
+
+    Parameters
+    ----------
+    blocked : numpy.ndarray
+        array with 1 on every space no ship afloat can cover, either
+        (height, width) or (boards, height, width)
+    hits : numpy.ndarray
+        array shaped like blocked with 1 on every hit not tied to a
+        sunken ship
+    length_counts : iterable of two-tuple
+        each ship length afloat and how many ships have it, either an
+        int or an array that broadcasts against the placement windows,
+        eg. (boards, 1, 1) for a different count on each board
+
+    Returns
+    -------
+    numpy.ndarray - float array shaped like blocked of weighted
+        placement counts
+    """
+    stacked = blocked.ndim == 3
+    if stacked:
+        # the boards go last, so each step below works through every
+        #   board at once instead of a few spaces of one row at a time
+        blocked = np.ascontiguousarray(np.moveaxis(blocked, 0, -1))
+        hits = np.ascontiguousarray(np.moveaxis(hits, 0, -1))
+        # a (boards, 1, 1) count turns into (1, 1, boards)
+        length_counts = [(length, np.transpose(count))
+                         for length, count in length_counts]
+    density = np.zeros(blocked.shape, dtype=float)
+    hit_weights = float(HIT_WEIGHT) ** np.arange(max(blocked.shape[:2]) + 1)
+    rows = _running_sums(blocked), _running_sums(hits)
+    # vertical placements are horizontal placements of the transpose
+    columns = (_running_sums(np.swapaxes(blocked, 0, 1)),
+               _running_sums(np.swapaxes(hits, 0, 1)))
+    for length, count in length_counts:
+        _add_placements(density, *rows, hit_weights, length, count)
+        _add_placements(np.swapaxes(density, 0, 1), *columns,
+                        hit_weights, length, count)
+    if stacked:
+        density = np.ascontiguousarray(np.moveaxis(density, -1, 0))
+    return density
+
+
+def density_guess(radar_board, ship_lengths, sunk_spaces=(), rng=random):
+    """
+    Return the row and column of the highest-density unguessed space.
+
+    Ties are broken at random.
+
+    Parameters
+    ----------
+    radar_board : Board or BitBoard object
+        the board tracking the opponent's guesses
+    ship_lengths : iterable of int
+        lengths of the ships still afloat
+    sunk_spaces : iterable of two-tuple of int, optional | default: ()
+        row and column of every space tied to a sunken ship
+    rng : random.Random or module, optional | default: random
+        source of random draws for breaking ties
+
+    Returns
+    -------
+    two-tuple of int - row and column guess coordinates
+    """
+    blocked, hits = radar_arrays(radar_board, sunk_spaces)
+    density = density_map(blocked, hits, ship_lengths)
+    # never guess a space twice
+    density[(blocked | hits).astype(bool)] = -1
+    best = np.flatnonzero(density == density.max())
+    row, column = divmod(int(rng.choice(best)), radar_board.width)
+    return row, column
+
+
+class DensityTargeting(TargetingStrategy):
+    """The 'density' targeting strategy."""
+    def guess(self):
+        """
+        Return tuple of row and column coordinates from placement density.
+
+        Every legal placement of the ships remaining is counted on the
+        radar board, and the unguessed space covered by the most
+        placements is returned.
+
+        Returns
+        -------
+        two-tuple of int - row and column guess coordinates
+        """
+        opponent = self.opponent
+        ship_lengths = [len(ship)
+                        for ship in opponent.radar_fleet.ships_remaining]
+        return density_guess(opponent.radar_board, ship_lengths,
+                             opponent._sunk_spaces, opponent.rng)
@@ -2,7 +2,9 @@
 Contains the Fleet class for a Battleship game.
 
 The Fleet class instantiates one of each Ship subclass and tracks the
-status of a player's ships.
+status of a player's ships.  Ships tell their fleet when they sink, so
+the fleet keeps its remaining and sunk ships up to date as the game goes
+and never has to check every ship to answer a status question.
 
 Classes
 -------
@@ -23,28 +25,73 @@ class Fleet(list):
         indicates whether all ships in fleet have been sunk
     ships_remaining : list
         a list of all ships which have not been sunk
+    ships_sunk : list
+        a list of all ships which have been sunk
     """
     def __init__(self, *args, **kwargs):
         """Construct attributes for Fleet object."""
         super().__init__(*args, **kwargs)
+        # dicts keep the ships in fleet order, like ordered sets
+        self._remaining = {}
+        self._sunk = {}
+        for ship in self:
+            self._track(ship)
         self.append(Battleship())
         self.append(Carrier())
         self.append(Destroyer())
         self.append(PTBoat())
         self.append(Submarine())
 
+    # ------------Helper Methods------------ #
+    def _track(self, ship):
+        """Register the fleet on a ship and file it by status."""
+        ship.fleet = self
+        if ship.sunk:
+            self._sunk[ship] = None
+        else:
+            self._remaining[ship] = None
+
+    def note_ship_sunk(self, ship, sunk):
+        """
+        Move a ship between the remaining and sunk ships.
+
+        Called by a Ship when it sinks or, if hits are undone, refloats.
+
+        Parameters
+        ----------
+            ship : Ship object
+                the ship which changed status
+            sunk : boolean
+                the new sunk status of the ship
+        """
+        if sunk:
+            del self._remaining[ship]
+            self._sunk[ship] = None
+        else:
+            # refloating only happens when hits are undone, so it's fine
+            #   to rebuild the remaining ships here to keep fleet order
+            del self._sunk[ship]
+            self._remaining = {fleet_ship: None for fleet_ship in self
+                               if fleet_ship in self._remaining
+                               or fleet_ship is ship}
+
+    def append(self, ship):
+        """Add a ship to the fleet and start tracking its status."""
+        super().append(ship)
+        self._track(ship)
+
     # ------------Properties------------ #
     @property
     def defeated(self):
         """Indicates whether all ships in fleet have been sunk."""
-        return all([ship.sunk for ship in self])
+        return not self._remaining
 
     @property
     def ships_remaining(self):
         """A list of all ships which have not been sunk"""
-        return [ship for ship in self if not ship.sunk]
+        return list(self._remaining)
 
     @property
     def ships_sunk(self):
-        """A list of all ships which have been sunk"""
-        return [ship for ship in self if ship.sunk]
+        """A list of all ships which have been sunk, in order sunk"""
+        return list(self._sunk)
@@ -2,17 +2,65 @@
 A module that makes conversions back and forth between human-friendly
 coordinates and machine friendly zero-indexed values.
 
+Rows past 'Z' are labeled like spreadsheet columns: 'AA', 'AB' and so
+on, so boards of any height can be converted.
+
+Whole locations like 'J10' are converted with a LocationTable, built
+once per board size, which holds every label of the board and the row
+and column of each one, so converting either way is a single lookup.
+
 Functions
 ---------
 convert_to_index
     Take letter or number values and return a tuple of zero-index values.
 convert_from_index
     Take zero-index int and return str in given format.
+location_table
+    Return the LocationTable for a board size.
+parse_locations
+    Return the row and column of every location in a move list or log.
+format_locations
+    Return the location of every row and column in a sequence.
+
+Classes
+-------
+LocationTable
+    A two-way lookup table of the locations on a board
 """
 
 import re
+from functools import lru_cache
 from string import ascii_lowercase as alphabet
 
+_LETTERS = re.compile(r"[a-zA-Z]+")
+_NUMBER = re.compile(r"[-\d]+")
+
+
+def _letters_to_number(letters):
+    """Return the zero-index number of a row label, eg. 'AA' -> 26."""
+    number = 0
+    for letter in letters.lower():
+        number = number * len(alphabet) + alphabet.index(letter) + 1
+    return number - 1
+
+
+def _number_to_letters(number):
+    """Return the lowercase row label of a zero-index number."""
+    letters = ''
+    number += 1
+    while number:
+        number, remainder = divmod(number - 1, len(alphabet))
+        letters = alphabet[remainder] + letters
+    return letters
+
+
+_FORMAT_OPTIONS = {
+    'lower': _number_to_letters,
+    'upper': lambda num: _number_to_letters(num).upper(),
+    'zero': str,
+    'one': lambda num: str(num + 1),
+}
+
 
 def convert_to_index(*args, zero_index=False):
     """
@@ -21,7 +69,7 @@ def convert_to_index(*args, zero_index=False):
     Parameters
     ----------
     *args : str or int
-        str must be in set [a-zA-Z] or convertible to an int.
+        str must be letters in set [a-zA-Z] or convertible to an int.
         int will be returned unchanged or converted from one-index
             to zero-index based on zero_index argument.
     zero_index : boolean, optional, keyword-only | default: False
@@ -40,11 +88,10 @@ def convert_to_index(*args, zero_index=False):
         index_adjust = -1
     for arg in args:
         if isinstance(arg, str):
-            arg_letter = re.match(r"[a-zA-Z]", arg)
-            arg_number = re.match(r"[-\d]+", arg)
+            arg_letter = _LETTERS.match(arg)
+            arg_number = _NUMBER.match(arg)
             if arg_letter:
-                output.append(
-                    alphabet.index(arg_letter.group(0).lower()))
+                output.append(_letters_to_number(arg_letter.group(0)))
             elif arg_number is not None:
                 output.append(
                     int(arg_number.group(0)) + index_adjust)
@@ -70,32 +117,193 @@ def convert_from_index(number, destination_format='one'):
     ----------
     number : int
         Zero-index number to be converted.
-        If used with 'lower' or 'upper' conversion, must be in range 0-25.
+        If used with 'lower' or 'upper' conversion, must not be negative.
+        Numbers past 25 convert to multi-letter labels, eg. 26 -> 'AA'.
     destination_format : str, optional | default: 'one'
         determine which format to return
         'one' - a one-index number as a string
         'zero' - a zero-index number as a string
-        'lower' - a lowercase letter value
-        'upper' - an uppercase letter value
+        'lower' - a lowercase letter label
+        'upper' - an uppercase letter label
 
     Returns
     -------
     str
         a user-friendly str version of the int in the given format.
     """
-    format_options = {
-        'lower': lambda num: alphabet[num],
-        'upper': lambda num: alphabet[num].upper(),
-        'zero': lambda num: str(num),
-        'one': lambda num: str(num + 1),
-    }
     if not isinstance(number, int):
         raise TypeError("'number' argument must be an integer.")
-    if destination_format in format_options:
-        if (destination_format in {'upper', 'lower'}
-                and (number > len(alphabet) or number < 0)):
+    if destination_format in _FORMAT_OPTIONS:
+        if destination_format in {'upper', 'lower'} and number < 0:
             raise ValueError(
-                "'number' must be 0-25 for 'upper' or 'lower' conversion.")
-        return format_options[destination_format](number)
-    raise ValueError(
-        f"'destination_format' must be one of: {format_options.keys}.")
+                "'number' must not be negative for 'upper' or 'lower' "
+                + "conversion.")
+        return _FORMAT_OPTIONS[destination_format](number)
+    raise ValueError("'destination_format' must be one of: {}.".format(
+        ', '.join(_FORMAT_OPTIONS)))
+
+
+class LocationTable:
+    """
+    A two-way lookup table of the locations on a board.
+
+    Attributes
+    ----------
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    labels : tuple of tuple of str
+        the uppercase location of every space, indexed by row, then
+        column, eg. labels[9][9] == 'J10'
+    """
+    __slots__ = ('width', 'height', 'labels', '_spaces')
+
+    def __init__(self, width=10, height=10):
+        """
+        Build the LocationTable for a board size.
+
+        Prefer location_table, which builds each size only once.
+
+        Parameters
+        ----------
+        width : int, optional | default: 10
+            the number of columns on the board
+        height : int, optional | default: 10
+            the number of rows on the board
+        """
+        self.width = width
+        self.height = height
+        rows = [convert_from_index(row, 'upper') for row in range(height)]
+        columns = [convert_from_index(column, 'one')
+                   for column in range(width)]
+        self.labels = tuple(tuple(row_label + column_label
+                                  for column_label in columns)
+                            for row_label in rows)
+        self._spaces = {}
+        for row, row_labels in enumerate(self.labels):
+            for column, label in enumerate(row_labels):
+                self._spaces[label] = (row, column)
+                self._spaces[label.lower()] = (row, column)
+
+    def parse(self, location):
+        """
+        Return the zero-index row and column of a location like 'J10'.
+
+        Parameters
+        ----------
+        location : str
+            a row label followed by a one-index column, in either case
+
+        Returns
+        -------
+        two-tuple of int - the row and column of the location
+        """
+        try:
+            return self._spaces[location]
+        except (KeyError, TypeError):
+            if not isinstance(location, str):
+                raise TypeError("'location' argument must be a str.") from None
+        try:
+            return self._spaces[location.strip().upper()]
+        except KeyError:
+            raise ValueError("'{}' isn't a location on a {}x{} board."
+                             .format(location, self.width, self.height)
+                             ) from None
+
+    def get(self, location, default=None):
+        """
+        Return the row and column of a location exactly as labeled.
+
+        Unlike parse, nothing is stripped and nothing is raised, so it
+        suits taking many locations that are mostly written out in full.
+
+        Parameters
+        ----------
+        location : str
+            a location like 'J10' or 'j10'
+        default : optional | default: None
+            returned if location isn't exactly a label on the board
+
+        Returns
+        -------
+        two-tuple of int or default - the row and column of the location
+        """
+        return self._spaces.get(location, default)
+
+    def format(self, row, column):
+        """Return the location of a zero-index row and column, eg. 'J10'."""
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            raise ValueError("Space is outside the range of the board.")
+        return self.labels[row][column]
+
+
+@lru_cache(maxsize=None)
+def location_table(width=10, height=10):
+    """
+    Return the LocationTable for a board size.
+
+    Each table is built once and shared, so every board of a size uses
+    the same str objects for its locations.
+
+    Parameters
+    ----------
+    width : int, optional | default: 10
+        the number of columns on the board
+    height : int, optional | default: 10
+        the number of rows on the board
+
+    Returns
+    -------
+    LocationTable object - the table for that board size
+    """
+    return LocationTable(width, height)
+
+
+def parse_locations(locations, *, width=10, height=10):
+    """
+    Return the row and column of every location in a move list or log.
+
+    Parameters
+    ----------
+    locations : str or iterable of str
+        locations like 'J10', either separately or together in one str
+        separated by whitespace, commas or semicolons
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the board
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the board
+
+    Returns
+    -------
+    list of two-tuple of int - the zero-index row and column of each
+        location, in order
+    """
+    if isinstance(locations, str):
+        locations = locations.replace(',', ' ').replace(';', ' ').split()
+    table = location_table(width, height)
+    # look up exact labels directly and leave the rest to parse
+    lookup = table.get
+    return [lookup(location) or table.parse(location)
+            for location in locations]
+
+
+def format_locations(spaces, *, width=10, height=10):
+    """
+    Return the location of every row and column in a sequence.
+
+    Parameters
+    ----------
+    spaces : iterable of two-tuple of int
+        zero-index rows and columns
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the board
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the board
+
+    Returns
+    -------
+    list of str - the location of each space, eg. 'J10', in order
+    """
+    format_location = location_table(width, height).format
+    return [format_location(row, column) for row, column in spaces]
@@ -0,0 +1,457 @@
+"""
+An append-only log of every turn of every game.
+
+Each game is written as a stream of small binary entries as it's played:
+one when it starts, one for each side's shot and its result, one for
+each ship sunk, and one when it ends.  Entries are only ever added to
+the end of a log, every entry names its game, and the entries of games
+played at the same time can be interleaved, so one log can take every
+game a server plays in a day.
+
+A log is read back as a stream too.  read_entries yields entries one at
+a time, and games gathers them into finished games, holding on to only
+the games still being played, so a whole day's log can be scanned with
+a pipeline of generators without loading it into memory.
+
+The entry starting a game holds where the computer's ships were placed,
+its _guess_seed, the seed of its generator and the order of the
+spaces it was going to seek from.  With the seed, a game can also be
+played over again from the start, making every decision again exactly
+as it was made.  replay builds an Opponent from that entry and takes
+every answer up to any turn, never calling make_guess, so it rebuilds
+the boards, fleets, running tallies and seek candidates exactly as they
+were at that turn.  The hit list isn't logged, since it's only ever
+built from the hits on the board, so a replayed Opponent in the middle
+of destroying a ship builds it again on its next guess.
+
+Entry layout (little-endian)
+----------------------------
+every entry
+    kind, then the 64-bit game number
+start
+    version, width, height, engine, _guess_seed, whether there's a
+    seed, the seed, the time budget, the targeting and placement
+    strategy names, each as a byte count and then UTF-8, the row,
+    column and orientation of each of the computer's ships in fleet
+    order, the number of lattice spaces, then every space index in seek
+    order.  Version 1 starts, which held a built-in targeting strategy
+    by number and no placement or time budget, are still read.
+shot
+    row, column and whether it hit, the kind telling whose shot it was
+sunk
+    the sunken ship's place in the fleet, the kind telling whose ship
+end
+    the winner, or none if the game was abandoned
+
+Functions
+---------
+read_entries
+    Yield every entry in a log in the order it was written.
+games
+    Yield every game in a stream of entries as soon as it's over.
+replay
+    Build the computer's Opponent as it was at a turn of a logged game.
+
+Classes
+-------
+GameLog
+    An append-only file of game entries
+"""
+
+import collections
+import os
+import struct
+
+from opponent import CandidateSet, Opponent
+from seeding import fits_64_bits
+from snapshot import ENGINES, SHIPS
+
+VERSION = 2
+# the targeting strategies version 1 logs held by number
+V1_TARGETING = ('lattice', 'density', 'sample', 'solver', 'legacy')
+SIDES = ('computer', 'player')
+# entry kinds
+START, COMPUTER_SHOT, PLAYER_SHOT, COMPUTER_SUNK, PLAYER_SUNK, END = range(6)
+# the winner of an abandoned game
+NO_WINNER = 0xFF
+
+_PREFIX = struct.Struct('<BQ')
+_START = struct.Struct('<HHBBBqd')
+_START_V1 = struct.Struct('<HHBBBBq')
+_SHIP = struct.Struct('<HHB')
+_INDEX = struct.Struct('<H')
+_SHOT = struct.Struct('<HHB')
+_BYTE = struct.Struct('<B')
+
+GameStart = collections.namedtuple(
+    'GameStart', 'game width height targeting placement time_budget engine '
+    'guess_seed seed ships lattice_count seek_order')
+Shot = collections.namedtuple('Shot', 'game side row column hit')
+Sunk = collections.namedtuple('Sunk', 'game side ship')
+GameEnd = collections.namedtuple('GameEnd', 'game winner')
+Game = collections.namedtuple('Game', 'start turns end')
+Game.__doc__ = """
+A logged game: its GameStart entry, its Shot and Sunk entries in order
+and its GameEnd entry, or None if the log ended while it was going.
+"""
+
+
+class GameLog:
+    """
+    An append-only file of game entries.
+
+    Attributes
+    ----------
+    path : str
+        the file entries are added to, created if it doesn't exist
+    """
+    def __init__(self, path):
+        """
+        Open a GameLog to add entries to.
+
+        Parameters
+        ----------
+        path : str
+            the file to add entries to, created if it doesn't exist
+        """
+        self.path = path
+        self._file = open(path, 'ab')
+
+    # ------------Helper Methods------------ #
+    def _write(self, kind, game, payload):
+        """Add one entry to the end of the log."""
+        self._file.write(_PREFIX.pack(kind, game) + payload)
+
+    # ------------Interface Methods------------ #
+    def start(self, opponent, *, game=None, seed=None):
+        """
+        Log the start of a game, before any guesses have been made.
+
+        Parameters
+        ----------
+        opponent : Opponent object
+            the computer's side of the game, with its ships placed
+        game : int or None, optional, keyword-only | default: None
+            a 64-bit number naming the game in the log, None picks one
+            at random
+        seed : int or None, optional, keyword-only | default: None
+            the seed to record for the game, None for the Opponent's
+            own seed; a seed outside the signed 64-bit range is left out
+
+        Returns
+        -------
+        int - the game number to log the rest of the game under
+        """
+        radar_board = opponent.radar_board
+        field_board = opponent.field_board
+        width, height = radar_board.width, radar_board.height
+        if opponent.last_guess is not None or any(
+                field_board.guessed_at(row, column)
+                for row in range(height) for column in range(width)):
+            raise ValueError("Games must be logged from their first turn.")
+        if game is None:
+            # not from the Opponent's generator, so logging never
+            #   changes a game's draws
+            game = int.from_bytes(os.urandom(8), 'little')
+        if seed is None:
+            seed = opponent.seed
+        if not fits_64_bits(seed):
+            seed = None
+        # a ship's first space in reading order is the one it was placed at
+        anchors = {}
+        for row in range(height):
+            for column in range(width):
+                segment = field_board.segment_at(row, column)
+                if segment and segment.ship not in anchors:
+                    anchors[segment.ship] = row, column
+        ships = []
+        for ship in opponent.field_fleet:
+            if ship not in anchors:
+                raise ValueError("{} hasn't been placed.".format(ship))
+            ships.append(_SHIP.pack(*anchors[ship], ship.orientation == 'v'))
+        names = []
+        for name in (opponent.targeting, opponent.placement):
+            encoded = name.encode()
+            if len(encoded) > 0xFF:
+                raise ValueError("Strategy names over 255 bytes can't be "
+                                 "logged.")
+            names.append(_BYTE.pack(len(encoded)) + encoded)
+        seek_order = [*opponent._lattice, *opponent._off_lattice]
+        self._write(START, game, b''.join((
+            _BYTE.pack(VERSION),
+            _START.pack(width, height, ENGINES.index(type(radar_board)),
+                        opponent._guess_seed, seed is not None, seed or 0,
+                        opponent.time_budget),
+            *names,
+            *ships,
+            _INDEX.pack(len(opponent._lattice)),
+            struct.pack('<{}H'.format(len(seek_order)),
+                        *(row * width + column
+                          for row, column in seek_order)),
+        )))
+        return game
+
+    def shot(self, game, side, row, column, hit):
+        """
+        Log a shot and whether it hit.
+
+        Parameters
+        ----------
+        game : int
+            the game number returned by start
+        side : str
+            'computer' or 'player', whoever took the shot
+        row : int
+            the zero-indexed row of the shot
+        column : int
+            the zero-indexed column of the shot
+        hit : boolean
+            indicates whether the shot hit a ship
+        """
+        if side not in SIDES:
+            raise ValueError("'side' must be 'computer' or 'player'.")
+        kind = COMPUTER_SHOT if side == SIDES[0] else PLAYER_SHOT
+        self._write(kind, game, _SHOT.pack(row, column, bool(hit)))
+
+    def sunk(self, game, side, ship):
+        """
+        Log a ship sunk by the last shot a side took.
+
+        Parameters
+        ----------
+        game : int
+            the game number returned by start
+        side : str
+            'computer' or 'player', whoever sunk the ship
+        ship : int
+            the sunken ship's place in the fleet, counting from 0
+        """
+        if side not in SIDES:
+            raise ValueError("'side' must be 'computer' or 'player'.")
+        kind = COMPUTER_SUNK if side == SIDES[0] else PLAYER_SUNK
+        self._write(kind, game, _BYTE.pack(ship))
+
+    def end(self, game, winner=None):
+        """
+        Log the end of a game.
+
+        Parameters
+        ----------
+        game : int
+            the game number returned by start
+        winner : str or None, optional | default: None
+            'computer' or 'player', or None if the game was abandoned
+        """
+        if winner is not None and winner not in SIDES:
+            raise ValueError("'winner' must be 'computer', 'player' or "
+                             "None.")
+        self._write(END, game, _BYTE.pack(
+            NO_WINNER if winner is None else SIDES.index(winner)))
+
+    def flush(self):
+        """Write every entry added so far to the file."""
+        self._file.flush()
+
+    def close(self):
+        """Write every entry and close the file."""
+        self._file.close()
+
+    def __enter__(self):
+        """Return the GameLog to use as a context manager."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the GameLog on leaving a with block."""
+        self.close()
+
+
+def _read(stream, size):
+    """Return size bytes from a stream, or None if it ends first."""
+    data = stream.read(size)
+    return data if len(data) == size else None
+
+
+def read_entries(stream):
+    """
+    Yield every entry in a log in the order it was written.
+
+    An entry cut short at the end of the log, as when the log is still
+    being written, ends the stream without an error.
+
+    Parameters
+    ----------
+    stream : binary file object
+        the log, opened for reading
+
+    Yields
+    ------
+    GameStart, Shot, Sunk or GameEnd namedtuple - each entry
+    """
+    while True:
+        prefix = _read(stream, _PREFIX.size)
+        if prefix is None:
+            return
+        kind, game = _PREFIX.unpack(prefix)
+        if kind == START:
+            data = _read(stream, _BYTE.size)
+            if data is None:
+                return
+            version, = _BYTE.unpack(data)
+            if version == 1:
+                data = _read(stream, _START_V1.size)
+                if data is None:
+                    return
+                (width, height, targeting, engine, guess_seed, has_seed,
+                 seed) = _START_V1.unpack(data)
+                targeting = V1_TARGETING[targeting]
+                placement = 'legacy'
+                time_budget = None
+            elif version == VERSION:
+                data = _read(stream, _START.size)
+                if data is None:
+                    return
+                (width, height, engine, guess_seed, has_seed, seed,
+                 time_budget) = _START.unpack(data)
+                names = []
+                for _ in range(2):
+                    size = _read(stream, _BYTE.size)
+                    name = None if size is None else _read(
+                        stream, _BYTE.unpack(size)[0])
+                    if name is None:
+                        return
+                    names.append(name.decode())
+                targeting, placement = names
+            else:
+                raise ValueError("Not a version {} game log.".format(
+                    VERSION))
+            spaces = width * height
+            data = _read(stream, SHIPS * _SHIP.size + _INDEX.size
+                         + spaces * _INDEX.size)
+            if data is None:
+                return
+            ships = tuple(_SHIP.iter_unpack(data[:SHIPS * _SHIP.size]))
+            lattice_count, = _INDEX.unpack_from(data, SHIPS * _SHIP.size)
+            seek_order = struct.unpack_from(
+                '<{}H'.format(spaces), data, SHIPS * _SHIP.size
+                + _INDEX.size)
+            yield GameStart(game, width, height, targeting, placement,
+                            time_budget, ENGINES[engine], guess_seed,
+                            seed if has_seed else None, ships,
+                            lattice_count, seek_order)
+        elif kind in (COMPUTER_SHOT, PLAYER_SHOT):
+            data = _read(stream, _SHOT.size)
+            if data is None:
+                return
+            row, column, hit = _SHOT.unpack(data)
+            yield Shot(game, SIDES[kind - COMPUTER_SHOT], row, column,
+                       bool(hit))
+        elif kind in (COMPUTER_SUNK, PLAYER_SUNK, END):
+            data = _read(stream, _BYTE.size)
+            if data is None:
+                return
+            value, = _BYTE.unpack(data)
+            if kind == END:
+                yield GameEnd(game, None if value == NO_WINNER
+                              else SIDES[value])
+            else:
+                yield Sunk(game, SIDES[kind - COMPUTER_SUNK], value)
+        else:
+            raise ValueError("Unknown game log entry kind: {}.".format(kind))
+
+
+def games(entries, *, unfinished=False):
+    """
+    Yield every game in a stream of entries as soon as it's over.
+
+    Only the games still going are held in memory.  Entries of a game
+    whose start isn't in the stream are skipped.
+
+    Parameters
+    ----------
+    entries : iterable of entries
+        entries like those from read_entries
+    unfinished : boolean, optional, keyword-only | default: False
+        True yields the games still going when the stream ends too,
+        with an end of None
+
+    Yields
+    ------
+    Game namedtuple - each game, in the order they ended
+    """
+    playing = {}
+    for entry in entries:
+        if isinstance(entry, GameStart):
+            playing[entry.game] = Game(entry, [], None)
+        elif entry.game not in playing:
+            continue
+        elif isinstance(entry, GameEnd):
+            yield playing.pop(entry.game)._replace(end=entry)
+        else:
+            playing[entry.game].turns.append(entry)
+    if unfinished:
+        yield from playing.values()
+
+
+def replay(game, turn=None):
+    """
+    Build the computer's Opponent as it was at a turn of a logged game.
+
+    Parameters
+    ----------
+    game : Game namedtuple
+        the game, like those from games
+    turn : int or None, optional | default: None
+        the number of shots, by either side, to take the answers of,
+        None for every shot in the game
+
+    Returns
+    -------
+    Opponent object - the computer as it was after that many shots
+
+    The Opponent gets the logged seed, but its rng starts over from
+    that seed rather than where the game had got to, since the draws
+    made by every guess aren't logged.  To carry on making exactly the
+    same draws, play the game again from the start with an Opponent
+    built with the seed, giving it the logged answers.
+    """
+    start = game.start
+    width = start.width
+    options = {}
+    if start.time_budget is not None:
+        options['time_budget'] = start.time_budget
+    # an unregistered strategy name raises ValueError here
+    opponent = Opponent(board_class=start.engine, targeting=start.targeting,
+                        placement=start.placement, width=width,
+                        height=start.height, place_ships=False,
+                        seed=start.seed, **options)
+    for ship, (row, column, vertical) in zip(opponent.field_fleet,
+                                             start.ships):
+        if (ship.orientation == 'v') != bool(vertical):
+            ship.rotate()
+        opponent.field_board.place(row, column, ship)
+    opponent._guess_seed = start.guess_seed
+    seek_order = [divmod(index, width) for index in start.seek_order]
+    opponent._lattice = CandidateSet(seek_order[:start.lattice_count])
+    opponent._off_lattice = CandidateSet(seek_order[start.lattice_count:])
+
+    shots = 0
+    for entry in game.turns:
+        if isinstance(entry, Shot):
+            if turn is not None and shots == turn:
+                break
+            shots += 1
+            if entry.side == 'computer':
+                opponent.take_guess_answer(entry.row, entry.column,
+                                           entry.hit)
+            else:
+                segment = opponent.field_board.take_guess(entry.row,
+                                                          entry.column)
+                if segment:
+                    segment.hit = True
+        elif entry.side == 'computer':
+            ship = opponent.radar_fleet[entry.ship]
+            ship.sunk = True
+            opponent.take_sunk_answer(ship)
+    # the hit list is built again from the hits on the next guess
+    opponent._destroy_mode = bool(opponent.spare_hits)
+    return opponent
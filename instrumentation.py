@@ -0,0 +1,258 @@
+"""
+Decision statistics for the computer opponent.
+
+An Opponent collects nothing unless its stats attribute holds a
+DecisionStats object, so the only cost when collection is off is one
+attribute check per guess and per ship placed.  Setting stats on or
+back to None turns collection on or off at any time, and one
+DecisionStats can be shared by every Opponent in a server or a
+benchmark run to collect them all together, even by Opponents
+guessing in other threads, since every guess and placement is added
+under a lock.
+
+For each guess, make_guess reports the seconds it took, whether it was
+seeking or destroying a ship, how many times the guess was started over
+inside _destroy_ship (the recursion depth), how many hit lists were
+built for it (the retries), the size of the hit list left afterwards
+and the number of spaces left to seek from.  Each ship placed reports
+how many random spots were rejected before one fit.
+
+The totals can be exported as JSON or in the Prometheus text format,
+and the most recent guesses are kept as they were reported, for finding
+out why one turn was slow.
+
+Classes
+-------
+DecisionStats
+    Running totals of the decisions made by Opponents
+"""
+
+import collections
+import json
+import threading
+
+# upper bounds in seconds of the guess time histogram buckets
+BUCKETS = (1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+# the number of recent guesses kept as they were reported
+HISTORY = 1000
+MODES = ('seek', 'destroy')
+
+Guess = collections.namedtuple(
+    'Guess', 'targeting mode seconds depth retries hit_list seek_candidates')
+
+
+class DecisionStats:
+    """
+    Running totals of the decisions made by Opponents.
+
+    Attributes
+    ----------
+    guesses : dict
+        maps (targeting, mode) to the number of guesses made
+    seconds : dict
+        maps (targeting, mode) to the total seconds spent guessing
+    buckets : dict
+        maps (targeting, mode) to a list counting the guesses that took
+        no longer than each BUCKETS bound, plus one for the rest
+    slowest : float
+        the most seconds any guess took
+    depth : int
+        the total recursion depth of every guess
+    max_depth : int
+        the deepest recursion of any guess
+    retries : int
+        the total hit lists built
+    hit_list : int
+        the total hit list size left after every guess
+    max_hit_list : int
+        the longest hit list left after any guess
+    ships_placed : int
+        the number of ships placed
+    rejections : int
+        the total random spots rejected while placing ships
+    max_rejections : int
+        the most spots rejected placing any one ship
+    history : collections.deque
+        the most recent Guess namedtuples, up to HISTORY of them
+    """
+    def __init__(self, history=HISTORY):
+        """
+        Build a DecisionStats with nothing collected.
+
+        Parameters
+        ----------
+        history : int, optional | default: HISTORY
+            the number of recent guesses to keep
+        """
+        self.guesses = collections.Counter()
+        self.seconds = collections.Counter()
+        self.buckets = {}
+        self.slowest = 0.0
+        self.depth = 0
+        self.max_depth = 0
+        self.retries = 0
+        self.hit_list = 0
+        self.max_hit_list = 0
+        self.ships_placed = 0
+        self.rejections = 0
+        self.max_rejections = 0
+        self.history = collections.deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    # ------------Collection Methods------------ #
+    def record_guess(self, targeting, mode, seconds, depth, retries,
+                     hit_list, seek_candidates):
+        """
+        Add one guess to the totals.
+
+        Parameters
+        ----------
+        targeting : str
+            the Opponent's targeting mode
+        mode : str
+            'seek' or 'destroy'
+        seconds : float
+            the time make_guess took
+        depth : int
+            the times the guess was started over inside _destroy_ship
+        retries : int
+            the hit lists built for the guess
+        hit_list : int
+            the size of the hit list left after the guess
+        seek_candidates : int
+            the spaces left to seek from
+        """
+        with self._lock:
+            key = (targeting, mode)
+            self.guesses[key] += 1
+            self.seconds[key] += seconds
+            if key not in self.buckets:
+                self.buckets[key] = [0] * (len(BUCKETS) + 1)
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    break
+            else:
+                index = len(BUCKETS)
+            self.buckets[key][index] += 1
+            self.slowest = max(self.slowest, seconds)
+            self.depth += depth
+            self.max_depth = max(self.max_depth, depth)
+            self.retries += retries
+            self.hit_list += hit_list
+            self.max_hit_list = max(self.max_hit_list, hit_list)
+            self.history.append(Guess(targeting, mode, seconds, depth, retries,
+                                      hit_list, seek_candidates))
+
+    def record_placement(self, rejections):
+        """Add one ship placed after a number of rejected spots."""
+        with self._lock:
+            self.ships_placed += 1
+            self.rejections += rejections
+            self.max_rejections = max(self.max_rejections, rejections)
+
+    def clear(self):
+        """Forget everything collected."""
+        with self._lock:
+            self.__init__(self.history.maxlen)
+
+    # ------------Export Methods------------ #
+    def as_dict(self):
+        """
+        Return the totals as a dict of JSON types.
+
+        Returns
+        -------
+        dict - 'guesses' lists the count, total and mean seconds and
+            bucket counts of each targeting mode and mode, with the
+            other totals alongside
+        """
+        guesses = []
+        for (targeting, mode), count in sorted(self.guesses.items()):
+            seconds = self.seconds[(targeting, mode)]
+            guesses.append({
+                'targeting': targeting,
+                'mode': mode,
+                'count': count,
+                'seconds': seconds,
+                'mean_seconds': seconds / count,
+                'buckets': dict(zip([str(bound) for bound in BUCKETS]
+                                    + ['+Inf'],
+                                    self.buckets[(targeting, mode)])),
+            })
+        total = sum(self.guesses.values())
+        return {
+            'guesses': guesses,
+            'slowest_seconds': self.slowest,
+            'mean_depth': self.depth / total if total else 0,
+            'max_depth': self.max_depth,
+            'mean_retries': self.retries / total if total else 0,
+            'mean_hit_list': self.hit_list / total if total else 0,
+            'max_hit_list': self.max_hit_list,
+            'ships_placed': self.ships_placed,
+            'placement_rejections': self.rejections,
+            'max_placement_rejections': self.max_rejections,
+        }
+
+    def to_json(self, **kwargs):
+        """Return the totals as a JSON str, passing kwargs to json.dumps."""
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def to_prometheus(self, prefix='battleship_opponent'):
+        """
+        Return the totals in the Prometheus text exposition format.
+
+        Parameters
+        ----------
+        prefix : str, optional | default: 'battleship_opponent'
+            the start of every metric name
+
+        Returns
+        -------
+        str - the metrics, one sample per line
+        """
+        lines = ['# HELP {}_guess_seconds Time make_guess took.'.format(
+                     prefix),
+                 '# TYPE {}_guess_seconds histogram'.format(prefix)]
+        for (targeting, mode), count in sorted(self.guesses.items()):
+            labels = 'targeting="{}",mode="{}"'.format(targeting, mode)
+            cumulative = 0
+            for bound, bucket in zip([repr(bound) for bound in BUCKETS]
+                                     + ['+Inf'],
+                                     self.buckets[(targeting, mode)]):
+                cumulative += bucket
+                lines.append('{}_guess_seconds_bucket{{{},le="{}"}} {}'
+                             .format(prefix, labels, bound, cumulative))
+            lines.append('{}_guess_seconds_sum{{{}}} {!r}'.format(
+                prefix, labels, self.seconds[(targeting, mode)]))
+            lines.append('{}_guess_seconds_count{{{}}} {}'.format(
+                prefix, labels, count))
+        counters = (
+            ('guess_depth', self.depth,
+             'Times guesses were started over inside _destroy_ship.'),
+            ('guess_retries', self.retries,
+             'Hit lists built while guessing.'),
+            ('guess_hit_list', self.hit_list,
+             'Hit list sizes left after guesses.'),
+            ('ships_placed', self.ships_placed, 'Ships placed.'),
+            ('placement_rejections', self.rejections,
+             'Random spots rejected while placing ships.'),
+        )
+        for name, value, text in counters:
+            lines.append('# HELP {}_{}_total {}'.format(prefix, name, text))
+            lines.append('# TYPE {}_{}_total counter'.format(prefix, name))
+            lines.append('{}_{}_total {}'.format(prefix, name, value))
+        gauges = (
+            ('guess_seconds_max', self.slowest,
+             'The most seconds any guess took.'),
+            ('guess_depth_max', self.max_depth,
+             'The deepest recursion of any guess.'),
+            ('guess_hit_list_max', self.max_hit_list,
+             'The longest hit list left after any guess.'),
+            ('placement_rejections_max', self.max_rejections,
+             'The most spots rejected placing any one ship.'),
+        )
+        for name, value, text in gauges:
+            lines.append('# HELP {}_{} {}'.format(prefix, name, text))
+            lines.append('# TYPE {}_{} gauge'.format(prefix, name))
+            lines.append('{}_{} {!r}'.format(prefix, name, value))
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,340 @@
+"""
+Random fleet layouts in bulk, written to and read from binary files.
+
+A layout places every ship of a Fleet, in fleet order, the same way
+Opponent.place_ship does: each ship is drawn from the board size's
+PlacementIndex, every spot still free being equally likely.  No Board,
+Fleet or Space objects are built, only one occupancy bitmask per
+layout, so millions of layouts can be made for benchmarks or for
+counting how often ships lie on each space.
+
+write_layouts splits the layouts into chunks and makes them across a
+process pool.  Each chunk draws from its own generator, seeded with
+seeding.spawn_seeds, so a file only depends on the seed, the count and
+the chunk size, not on the number of processes.
+
+File layout (little-endian)
+---------------------------
+header
+    magic, version, width, height, number of ships, seed, then the
+    length of each ship in fleet order, one byte each
+layouts
+    one unsigned short per ship, row * width + column of its anchor
+    shifted left by one, plus one if it runs down ('v'); every layout is
+    the same size, so layout n starts at header + n * record size
+
+LayoutFile reads a file through a memory map, so layouts can be taken
+one at a time in order or picked out by number without reading the
+rest of the file.
+
+Usage: python -m layouts OUTPUT [--count N] [--processes N] [--seed N]
+                         [--width N] [--height N] [--chunk N]
+
+Functions
+---------
+fleet_lengths
+    Return the length of each ship of a Fleet, in fleet order.
+random_layout
+    Return the placement of every ship of one random layout.
+write_layouts
+    Write random layouts to a file using a process pool.
+
+Classes
+-------
+Placement
+    The anchor row and column and the orientation of one ship
+LayoutFile
+    Layouts read from a file through a memory map
+"""
+
+import argparse
+import collections
+import mmap
+import random
+import struct
+import sys
+from multiprocessing import Pool
+
+from fleet import Fleet
+from placementindex import placement_index
+from seeding import new_seed, spawn_seeds
+
+MAGIC = b'BSLY'
+VERSION = 1
+CHUNK_SIZE = 10000
+
+_HEADER = struct.Struct('<4sBHHBq')
+
+Placement = collections.namedtuple('Placement', 'row column orientation')
+
+
+def fleet_lengths():
+    """Return the length of each ship of a Fleet, in fleet order."""
+    return tuple(len(ship) for ship in Fleet())
+
+
+def _check_size(width, height):
+    """Check that every anchor of a board size fits in a record."""
+    if width < 1 or height < 1:
+        raise ValueError(
+            "'width' and 'height' arguments must be at least 1.")
+    if width * height > 0x8000:
+        raise ValueError("Boards over {} spaces can't be written.".format(
+            0x8000))
+
+
+def random_layout(rng, *, width=10, height=10, lengths=None):
+    """
+    Return the placement of every ship of one random layout.
+
+    Parameters
+    ----------
+    rng : random.Random or module
+        source of random draws
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the board
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the board
+    lengths : sequence of int or None, optional, keyword-only
+        | default: None
+        the ship lengths to place, None for fleet_lengths()
+
+    Returns
+    -------
+    list of Placement - one per ship, in the order of lengths
+    """
+    index = placement_index(width, height)
+    occupied = 0
+    layout = []
+    for length in fleet_lengths() if lengths is None else lengths:
+        row, column, orientation, _ = index.choose(occupied, length, rng)
+        occupied |= index.mask(row, column, length, orientation)
+        layout.append(Placement(row, column, orientation))
+    return layout
+
+
+def _make_chunk(job):
+    """Return the packed records of a chunk of layouts."""
+    width, height, lengths, seed, count = job
+    rng = random.Random(seed)
+    codes = []
+    for _ in range(count):
+        for row, column, orientation in random_layout(
+                rng, width=width, height=height, lengths=lengths):
+            codes.append((row * width + column) << 1 | (orientation == 'v'))
+    return struct.pack('<{}H'.format(len(codes)), *codes)
+
+
+def write_layouts(path, count, *, seed=None, processes=None, width=10,
+                  height=10, chunk_size=CHUNK_SIZE):
+    """
+    Write random layouts to a file using a process pool.
+
+    Parameters
+    ----------
+    path : str
+        the file to write, replacing it if it exists
+    count : int
+        the number of layouts
+    seed : int or None, optional, keyword-only | default: None
+        seed of the whole file, None for a fresh one
+    processes : int or None, optional, keyword-only | default: None
+        size of the process pool, None uses every CPU
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the board
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the board
+    chunk_size : int, optional, keyword-only | default: CHUNK_SIZE
+        layouts handed to a worker at a time
+
+    Returns
+    -------
+    int - the seed the file was written with
+    """
+    _check_size(width, height)
+    if count < 0:
+        raise ValueError("'count' can't be negative.")
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' must be at least 1.")
+    if seed is None:
+        seed = new_seed()
+    lengths = fleet_lengths()
+    starts = range(0, count, chunk_size)
+    jobs = [(width, height, lengths, chunk_seed,
+             min(chunk_size, count - start))
+            for start, chunk_seed in zip(starts,
+                                         spawn_seeds(seed, len(starts)))]
+    with open(path, 'wb') as layout_file:
+        layout_file.write(_HEADER.pack(MAGIC, VERSION, width, height,
+                                       len(lengths), seed))
+        layout_file.write(bytes(lengths))
+        with Pool(processes) as pool:
+            # imap keeps the chunks in order, whichever finishes first
+            for chunk in pool.imap(_make_chunk, jobs):
+                layout_file.write(chunk)
+    return seed
+
+
+class LayoutFile:
+    """
+    Layouts read from a file through a memory map.
+
+    A LayoutFile is a sequence of layouts: len gives the number of
+    layouts, indexing returns one layout as a list of Placement, and
+    iterating goes through them all in order.  A layout cut short at
+    the end of the file, like one being written, is left out.
+
+    Attributes
+    ----------
+    path : str
+        the file the layouts are read from
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    lengths : tuple of int
+        the length of each ship, in the order they're placed
+    seed : int
+        the seed the file was written with
+    """
+    def __init__(self, path):
+        """
+        Open a file of layouts.
+
+        Parameters
+        ----------
+        path : str
+            a file written by write_layouts
+        """
+        self.path = path
+        with open(path, 'rb') as layout_file:
+            self._mmap = mmap.mmap(layout_file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        try:
+            (magic, version, self.width, self.height, ships,
+             self.seed) = _HEADER.unpack_from(self._mmap)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            self._mmap.close()
+            raise ValueError("{} isn't a version {} layout file.".format(
+                path, VERSION))
+        self.lengths = tuple(self._mmap[_HEADER.size:_HEADER.size + ships])
+        self._start = _HEADER.size + ships
+        self._record = struct.Struct('<{}H'.format(ships))
+        self._count = (len(self._mmap) - self._start) // self._record.size
+
+    # ------------Helper Methods------------ #
+    def _placements(self, codes):
+        """Return the Placement of each ship in a record."""
+        return [Placement(*divmod(code >> 1, self.width),
+                          'v' if code & 1 else 'h')
+                for code in codes]
+
+    def _codes(self, index):
+        """Return the packed ship codes of a layout by number."""
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("Layout index out of range.")
+        return self._record.unpack_from(
+            self._mmap, self._start + index * self._record.size)
+
+    # ------------Interface Methods------------ #
+    def mask(self, index):
+        """
+        Return the bitmask of every space a layout's ships cover.
+
+        Parameters
+        ----------
+        index : int
+            the number of the layout
+
+        Returns
+        -------
+        int - bit row * width + column is set for each ship segment
+        """
+        placements = placement_index(self.width, self.height)
+        mask = 0
+        for length, placement in zip(self.lengths, self[index]):
+            mask |= placements.mask(placement.row, placement.column,
+                                    length, placement.orientation)
+        return mask
+
+    def as_array(self):
+        """
+        Return every layout as a NumPy array, without copying the file.
+
+        The array reads straight from the memory map, so the map stays
+        open after close until every array from it has been dropped.
+
+        Returns
+        -------
+        numpy.ndarray - shape (layouts, ships) of the packed ship codes,
+            anchor << 1 plus 1 for 'v', as stored in the file
+        """
+        # imported here so NumPy is only needed for arrays
+        import numpy as np
+        return np.frombuffer(self._mmap, dtype='<u2',
+                             count=self._count * len(self.lengths),
+                             offset=self._start).reshape(
+                                 self._count, len(self.lengths))
+
+    def close(self):
+        """Close the memory map, once no array still reads from it."""
+        try:
+            self._mmap.close()
+        except BufferError:
+            # arrays from as_array still use the map, which is closed
+            #   when the last of them is garbage collected
+            pass
+
+    # ------------Additional Dunder Methods------------ #
+    def __len__(self):
+        """Return the number of layouts in the file."""
+        return self._count
+
+    def __getitem__(self, index):
+        """Return a layout by number as a list of Placement."""
+        return self._placements(self._codes(index))
+
+    def __iter__(self):
+        """Yield every layout in order as a list of Placement."""
+        # unpacked straight from the map, so no view of it is held
+        #   between layouts and the file can be closed part way through
+        for offset in range(self._start,
+                            self._start + self._count * self._record.size,
+                            self._record.size):
+            yield self._placements(self._record.unpack_from(self._mmap,
+                                                            offset))
+
+    def __enter__(self):
+        """Return the file for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the file at the end of a with statement."""
+        self.close()
+
+
+def main(argv=None):
+    """Write random layouts from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('output', help="the file to write")
+    parser.add_argument('--count', type=int, default=1000000)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--height', type=int, default=10)
+    parser.add_argument('--chunk', type=int, default=CHUNK_SIZE,
+                        help="layouts handed to a worker at a time")
+    args = parser.parse_args(argv)
+    seed = write_layouts(args.output, args.count, seed=args.seed,
+                         processes=args.processes, width=args.width,
+                         height=args.height, chunk_size=args.chunk)
+    print("Wrote {} layouts to {} with seed {}.".format(
+        args.count, args.output, seed))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,7 @@
 """
-Contains the Opponent and Turn classes.  The Opponent owns a radar
-board and field board and includes all the methods for randomly placing
-its ships and hunting for the player's ships.
+Contains the Opponent, Turn, HitRunIndex and CandidateSet classes.  The
+Opponent owns a radar board and field board and includes all the methods
+for randomly placing its ships and hunting for the player's ships.
 
 Classes
 -------
@@ -9,13 +9,26 @@ Opponent
     A class for the computer opponent in a game of Battleship
 Turn
     Used by the Opponent class to keep track of its guesses
+HitRunIndex
+    Used by the Opponent class to keep track of runs of adjacent hits
+CandidateSet
+    Used by the Opponent class to keep the spaces left to seek
 """
 
 import random
+import time
 
+from bitboard import hit_runs, longest_run
 from board import Board
 from fleet import Fleet
+from placementindex import placement_index
+from seeding import new_seed
 from ships import Ship
+from strategies import placement_strategy, targeting_strategy
+
+# When True, the running hit tallies are checked against a full recount
+#   every time they are read.  Meant for tests and simulations only.
+DEBUG = False
 
 
 class Opponent:
@@ -32,6 +45,21 @@ class Opponent:
         a board for placing the opponent's ships and taking player guesses
     field_fleet : Fleet object
         a fleet containing the opponent's ships to track player hits
+    targeting : str
+        the name of the targeting strategy make_guess picks guesses
+        with, see the strategies module
+    placement : str
+        the name of the placement strategy the ships were placed with
+    time_budget : float
+        seconds 'sample' targeting spends sampling for each guess
+    stats : DecisionStats object or None
+        where every guess and ship placement is reported, None reports
+        nothing; can be set or cleared at any time
+    seed : int
+        the seed of rng, to record with the game
+    rng : random.Random object
+        the generator every random draw of the opponent and its
+        strategies comes from
 
     Properties
     ----------
@@ -42,123 +70,226 @@ class Opponent:
     last_guess : Turn object
         the most recently made guess
     """
-    def __init__(self):
-        """Builds a new Opponent object. Takes no arguments."""
-        self.radar_board = Board('radar')
+    def __init__(self, *, board_class=Board, targeting='lattice', width=10,
+                 height=10, time_budget=0.005, place_ships=True,
+                 stats=None, placement='legacy', seed=None):
+        """
+        Builds a new Opponent object.
+
+        Parameters
+        ----------
+        board_class : class, optional, keyword-only | default: Board
+            the board engine used for the radar and field boards, either
+            Board or bitboard.BitBoard
+        targeting : str, optional, keyword-only | default: 'lattice'
+            a registered targeting strategy: 'legacy' or 'lattice'
+            seeks on a lattice grid and destroys around hits, 'density'
+            guesses where the most ship placements fit, 'sample'
+            guesses where ships lie in the most sampled fleet layouts,
+            'solver' seeks like 'lattice' but destroys by working out
+            every way the hits could belong to the ships
+        width : int, optional, keyword-only | default: 10
+            the number of columns on both boards
+        height : int, optional, keyword-only | default: 10
+            the number of rows on both boards
+        time_budget : float, optional, keyword-only | default: 0.005
+            seconds 'sample' targeting spends sampling for each guess
+        place_ships : boolean, optional, keyword-only | default: True
+            False leaves the field board empty, for restoring a snapshot
+        stats : DecisionStats object or None, optional, keyword-only
+                | default: None
+            where to report every guess and ship placement, see the
+            instrumentation module
+        placement : str, optional, keyword-only | default: 'legacy'
+            a registered placement strategy: 'legacy' places ships at
+            random, 'spaced' keeps them from touching when it can
+        seed : int or None, optional, keyword-only | default: None
+            seed for rng, None for a fresh one from the operating
+            system; the same seed always gives the same game
+        """
+        targeting_class = targeting_strategy(targeting)
+        placement_class = placement_strategy(placement)
+        self.targeting = targeting
+        self.placement = placement
+        self.time_budget = time_budget
+        self.stats = stats
+        if seed is not None and (not isinstance(seed, int)
+                                 or isinstance(seed, bool)):
+            raise TypeError("'seed' must be an int.")
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.radar_board = board_class('radar', width=width, height=height)
         self.radar_fleet = Fleet()
 
         self._destroy_mode = False
         self._guess_list = []
         self._hit_list = []
+        # spaces judged to hold a sunken ship, used by 'density' targeting
+        self._sunk_spaces = set()
+        self._hit_runs = HitRunIndex()
+        # running tallies behind the total_hits and spare_hits properties
+        self._total_hits = 0
+        self._sunk_hits = 0
+        # times the current guess was started over and hit lists built
+        #   for it, reported to stats
+        self._depth = 0
+        self._retries = 0
         # _guess_seed determines evens or odds for _seek_ships method
         #   and order of row and column hits in _hit_list
-        self._guess_seed = random.randint(0, 1)
+        self._guess_seed = self.rng.randint(0, 1)
+        # spaces for _seek_ships to guess from, in random order
+        self._lattice, self._off_lattice = self._build_lattice()
+        # spaces are pruned from the lattice when this length can't fit
+        self._seek_length = min(len(ship) for ship in self.radar_fleet)
 
-        self.field_board = Board('field')
+        self.field_board = board_class('field', width=width, height=height)
         self.field_fleet = Fleet()
-        self._place_ships()
+        self._targeter = targeting_class(self)
+        self._placer = placement_class(self)
+        if place_ships:
+            self._place_ships()
 
 
     # ------------Setup Methods------------ #
+    def _build_lattice(self):
+        """
+        Split the radar board into lattice and off-lattice spaces.
+
+        The lattice is every other space, like one color of a
+        checkerboard, which is enough to find every ship of length 2 or
+        more.  _guess_seed decides which color is used.  Both lists are
+        shuffled so they can be guessed from in order.
+
+        Returns
+        -------
+        two-tuple of CandidateSet - lattice and off-lattice spaces
+        """
+        lattice = []
+        off_lattice = []
+        for row in range(self.radar_board.height):
+            for column in range(self.radar_board.width):
+                if (row + column + self._guess_seed) % 2 == 0:
+                    lattice.append((row, column))
+                else:
+                    off_lattice.append((row, column))
+        self.rng.shuffle(lattice)
+        self.rng.shuffle(off_lattice)
+        return CandidateSet(lattice), CandidateSet(off_lattice)
+
     def _place_ships(self):
         """Place every ship in the opponent's fleet on the board."""
         for ship in self.field_fleet:
-            self._place_ship(ship)
-
-    def _place_ship(self, ship):
-        """Place a single ship on the board randomly."""
-        row = random.randint(0, len(self.field_board) - 1)
-        column = random.randint(0, len(self.field_board[0]) - 1)
-        rotate = random.randint(0, 1)
-        if rotate:
+            self._placer.place(ship)
+
+    def place_ship(self, ship, rejections=0):
+        """
+        Place a single ship on the field board randomly.
+
+        The placement is drawn from the board size's PlacementIndex,
+        so every spot the ship fits in is equally likely.  Placement
+        strategies use it to place a ship, or to fall back on.
+
+        Parameters
+        ----------
+        ship : Ship object
+            the ship to place
+        rejections : int, optional | default: 0
+            spots already rejected for the ship by a placement strategy,
+            reported to stats along with any rejected here
+        """
+        board = self.field_board
+        row, column, orientation, drawn = placement_index(
+            board.width, board.height).choose(board.occupied_mask,
+                                              len(ship), self.rng)
+        if ship.orientation != orientation:
             ship.rotate()
-        if self._check_spaces(row, column, ship):
-            if ship.orientation == 'h':
-                for index, segment in enumerate(ship.segments):
-                    self.field_board[row][column + index].segment = segment
-            if ship.orientation == 'v':
-                for index, segment in enumerate(ship.segments):
-                    self.field_board[row + index][column].segment = segment
-        else:
-            self._place_ship(ship)
-
-    def _check_spaces(self, row, column, ship):
-        """Check if spaces are available at given starting space for ship."""
-        if ship.orientation == 'h':  # if ship is horizontal
-            for index in range(len(ship)):
-                # If any proposed space for a ship does not exist
-                #   or is already occupied, stop the for loop and
-                #   return False from the method.
-                try:
-                    if (column + index) >= len(self.field_board[row]):
-                        return False
-                    if self.field_board[row][column + index].segment:
-                        return False
-                except IndexError:
-                    print(
-                        "Starting space is outside the range of the board.")
-        else:  # if ship is vertical
-            for index in range(len(ship)):
-                try:
-                    if (row + index) >= len(self.field_board):
-                        return False
-                    if self.field_board[row + index][column].segment:
-                        return False
-                except IndexError:
-                    print(
-                        "Starting space is outside the range of the board.")
-        return True
+        board.place(row, column, ship)
+        if self.stats is not None:
+            self.stats.record_placement(rejections + drawn)
+
+    def fits(self, row, column, ship):
+        """
+        Return whether a ship fits on the field board at a spot.
+
+        Parameters
+        ----------
+        row : int
+            the row of the ship's first segment
+        column : int
+            the column of the ship's first segment
+        ship : Ship object
+            the ship, checked in its current orientation
+
+        Returns
+        -------
+        boolean - True if every space the ship would cover is free
+        """
+        return self.field_board.fits(row, column, len(ship),
+                                     ship.orientation)
 
 
     # ------------Helper Methods------------ #
     @property
     def total_hits(self):
         """Return the total number of hits made by Opponent."""
-        total = 0
-        for guess in self._guess_list:
-            if guess.hit:
-                total += 1
-        return total
+        if DEBUG:
+            self._check_hit_tallies()
+        return self._total_hits
 
     @property
     def spare_hits(self):
         """Return number of hits not accounted for in sunk ships."""
-        total_sunk_hits = 0
+        if DEBUG:
+            self._check_hit_tallies()
+        return self._total_hits - self._sunk_hits
+
+    def _check_hit_tallies(self):
+        """Check the running hit tallies against a full recount."""
+        total_hits = 0
+        for guess in self._guess_list:
+            if guess.hit:
+                total_hits += 1
+        sunk_hits = 0
         for ship in self.radar_fleet.ships_sunk:
-            total_sunk_hits += len(ship)
-        return self.total_hits - total_sunk_hits
+            sunk_hits += len(ship)
+        assert total_hits == self._total_hits, (
+            "Running total of {} hits doesn't match recount of {}.".format(
+                self._total_hits, total_hits))
+        assert sunk_hits == self._sunk_hits, (
+            "Running total of {} sunk hits doesn't match recount of {}."
+            .format(self._sunk_hits, sunk_hits))
+
+    def _mark_sunk_spaces(self, ship):
+        """
+        Record the spaces most likely held by a ship sunk on last guess.
+
+        A sunken ship must lie in a straight run of hits that ends at
+        the last guess and isn't already tied to another sunken ship.
+        When more than one run fits, the run guessed most recently wins.
+        """
+        order = {(guess.row, guess.column): index
+                 for index, guess in enumerate(self._guess_list)}
+        row, column = self.last_guess.row, self.last_guess.column
+        best_run = None
+        for row_step, column_step in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            run = [(row + row_step * index, column + column_step * index)
+                   for index in range(len(ship))]
+            if all(space in order and space not in self._sunk_spaces
+                   and self.radar_board.hit_at(*space) == 2
+                   for space in run):
+                if best_run is None or (min(order[space] for space in run)
+                        > min(order[space] for space in best_run)):
+                    best_run = run
+        if best_run:
+            self._sunk_spaces.update(best_run)
 
     def possible_sunk(self):
         """Return list of possibly sunk ships from radar board."""
-        longest_possible = 0
-        # check horizontally adjacent hits on each row
-        for row in range(len(self.radar_board)):
-            row_counter = 0
-            for column in range(len(self.radar_board[row])):
-                if self.radar_board[row][column].hit == 2:
-                    row_counter += 1
-                    if column + 1 >= len(self.radar_board[row]):
-                        if row_counter > longest_possible:
-                            longest_possible = row_counter
-                        row_counter = 0
-                else:
-                    if row_counter > longest_possible:
-                        longest_possible = row_counter
-                    row_counter = 0
-        # check vertically adjacent hits on each column
-        for column in range(len(self.radar_board[0])):
-            column_counter = 0
-            for row in range(len(self.radar_board)):
-                if self.radar_board[row][column].hit == 2:
-                    column_counter += 1
-                    if row + 1 >= len(self.radar_board):
-                        if column_counter > longest_possible:
-                            longest_possible = column_counter
-                        column_counter = 0
-                else:
-                    if column_counter > longest_possible:
-                        longest_possible = column_counter
-                    column_counter = 0
+        # the longest run of adjacent hits in any row or column
+        longest_possible = self._hit_runs.longest
+        if DEBUG:
+            assert longest_possible == self.radar_board.longest_hit_run(), (
+                "Hit run index doesn't match the radar board.")
         # check longest_possible against number of hits not already
         #   tied to a sunken ship
         unaccounted_hits = self.spare_hits
@@ -172,25 +303,24 @@ class Opponent:
         """Add potential hits right and left of starting point."""
         # gather potential hits in row to right of start
         for index in range(longest_unsunk):
-            if (starting_column + index >= len(
-                    self.radar_board[0])):
+            if starting_column + index >= self.radar_board.width:
                 break
-            space = self.radar_board[starting_row][
-                            starting_column + index]
-            if space.hit == 1:
+            hit = self.radar_board.hit_at(starting_row,
+                                          starting_column + index)
+            if hit == 1:
                 break
-            if space.hit == 0:
+            if hit == 0:
                 self._hit_list.append((starting_row,
                                         starting_column + index))
         # gather potential hits in row to left of start
         for index in range(longest_unsunk):
             if starting_column - index < 0:
                 break
-            space = self.radar_board[starting_row][
-                            starting_column - index]
-            if space.hit == 1:
+            hit = self.radar_board.hit_at(starting_row,
+                                          starting_column - index)
+            if hit == 1:
                 break
-            if space.hit == 0:
+            if hit == 0:
                 self._hit_list.append((starting_row,
                                         starting_column - index))
 
@@ -199,25 +329,24 @@ class Opponent:
         """Add potential hits above and below starting point."""
         # gather potential hits in column below start
         for index in range(longest_unsunk):
-            if (starting_row + index >= len(
-                    self.radar_board)):
+            if starting_row + index >= self.radar_board.height:
                 break
-            space = self.radar_board[starting_row + index][
-                                     starting_column]
-            if space.hit == 1:
+            hit = self.radar_board.hit_at(starting_row + index,
+                                          starting_column)
+            if hit == 1:
                 break
-            if space.hit == 0:
+            if hit == 0:
                 self._hit_list.append((starting_row + index,
                                         starting_column))
         # gather potential hits in column above start
         for index in range(longest_unsunk):
             if starting_row - index < 0:
                 break
-            space = self.radar_board[starting_row - index][
-                                     starting_column]
-            if space.hit == 1:
+            hit = self.radar_board.hit_at(starting_row - index,
+                                          starting_column)
+            if hit == 1:
                 break
-            if space.hit == 0:
+            if hit == 0:
                 self._hit_list.append((starting_row - index,
                                        starting_column))
 
@@ -236,7 +365,8 @@ class Opponent:
         -------
         boolean - indicates whether list was successfully created.
         """
-        if not starting_row or not starting_column:
+        self._retries += 1
+        if starting_row is None or starting_column is None:
             starting_point = None
             # Go through the _guess_list in reverse order to check for the
             #   first hit in the current ship destroying cycle.
@@ -297,67 +427,83 @@ class Opponent:
         elif self.last_guess.sunk:
             self._hit_list.clear()
             self._destroy_mode = False
-            return self.make_guess()
+            self._depth += 1
+            return self._legacy_guess()
         if len(self._hit_list) > 0:
             return self._hit_list.pop(0)
         # If there are no items in _hit_list, call method to build list
+        self._depth += 1
         if self._build_hit_list():
             return self._destroy_ship()
         else:
             self._destroy_mode = False
-            return self.make_guess()
+            return self._legacy_guess()
 
     def _seek_ships(self):
         """
         Return tuple of row and column coordinates for guesses.
 
-        Currently uses a lattice grid for efficient searching.  This
-        works by guessing only even columns with even rows and only odd
-        columns with odd rows.  It also eliminates possibilities where
-        there aren't enough potential hits around a space.  This is
-        incomplete since it adds row and column possibilities together,
-        but it does narrow down the possibilities.
+        Uses a lattice grid for efficient searching.  This works by
+        guessing only even columns with even rows and only odd columns
+        with odd rows (reversed by _guess_seed), which works for a board
+        of any size.  The lattice is a CandidateSet kept up to date as
+        answers come in: guessed spaces are removed, and so are spaces
+        where the shortest remaining ship can't fit, so the next space
+        in the set is always worth guessing.
 
-        Note: Currently will only work with even row lengths on the
-        radar board.
+        Once the lattice runs out, which can happen when stray hits
+        were never followed up, the off-lattice spaces are guessed.
 
         Returns
         -------
         two-tuple of int - row and column guess coordinates
         """
-        row = random.randint(0, len(self.field_board) - 1)
-        # make column even
-        column = random.randint(0, int((len(self.field_board[0]) / 2)) - 1)
-        column = column * 2
-        # if row is odd, make column odd (reverses with _guess_seed value)
-        if (row + self._guess_seed) % 2 != 0:
-            column += 1
-        if self.radar_board[row][column].guessed:
-            # make a new guess if the space has already been guessed
-            return self._seek_ships()
-        # build hit list around proposed guess
-        self._build_hit_list(row, column)
-        # determine length of shortest remaining ship
-        ships_remaining = self.radar_fleet.ships_remaining
-        shortest_unsunk = min([len(ship) for ship in ships_remaining])
-        # check if there's room for the shortest remaining ship around
-        #   the proposed guess
-        if len(self._hit_list) + self.spare_hits >= shortest_unsunk:
-            self._hit_list.clear()
-            return row, column
-        # if there isn't room, generate another guess
-        self._hit_list.clear()
-        return self._seek_ships()
+        for spaces in (self._lattice, self._off_lattice):
+            if spaces:
+                return spaces.next
+        raise RuntimeError("There are no spaces left to guess.")
 
-    def make_guess(self):
-        """
-        Make a guess based on existing guesses.
+    @property
+    def seek_candidates(self):
+        """Return the number of spaces left for _seek_ships to guess."""
+        return len(self._lattice) + len(self._off_lattice)
+
+    def _too_small(self, row, column):
+        """Return whether the shortest remaining ship can't fit a space."""
+        height, width = self.radar_board.height, self.radar_board.width
+        for row_step, column_step in ((0, 1), (1, 0)):
+            room = 1
+            for direction in (1, -1):
+                next_row = row + row_step * direction
+                next_column = column + column_step * direction
+                while (room < self._seek_length
+                       and 0 <= next_row < height
+                       and 0 <= next_column < width
+                       and self.radar_board.hit_at(next_row,
+                                                   next_column) != 1):
+                    room += 1
+                    next_row += row_step * direction
+                    next_column += column_step * direction
+            if room >= self._seek_length:
+                return False
+        return True
 
-        Returns
-        -------
-        tuple of two int
-            zero-indexed row and column for guess
-        """
+    def _prune(self, spaces):
+        """Remove spaces the shortest remaining ship can't fit from seeking."""
+        for space in spaces:
+            if ((space in self._lattice or space in self._off_lattice)
+                    and self._too_small(*space)):
+                self._lattice.discard(space)
+                self._off_lattice.discard(space)
+
+    def _prune_around(self, row, column):
+        """Prune the spaces in line with a miss that it could box in."""
+        reach = range(1 - self._seek_length, self._seek_length)
+        self._prune([(row, column + offset) for offset in reach]
+                    + [(row + offset, column) for offset in reach])
+
+    def _legacy_guess(self):
+        """Return the next guess of 'legacy' targeting."""
         if self.last_guess:
             if self.last_guess.sunk:
                 self._destroy_mode = False
@@ -370,6 +516,32 @@ class Opponent:
             row, column = self._seek_ships()
         return row, column
 
+    def make_guess(self):
+        """
+        Make a guess based on existing guesses.
+
+        When stats is set, the time taken and how the guess was made
+        are reported to it.
+
+        Returns
+        -------
+        tuple of two int
+            zero-indexed row and column for guess
+        """
+        if self.stats is None:
+            return self._targeter.guess()
+        self._depth = 0
+        self._retries = 0
+        start = time.perf_counter()
+        guess = self._targeter.guess()
+        seconds = time.perf_counter() - start
+        self.stats.record_guess(
+            self.targeting,
+            'destroy' if self._targeter.destroying() else 'seek', seconds,
+            self._depth, self._retries, len(self._hit_list),
+            self.seek_candidates)
+        return guess
+
     def take_guess_answer(self, row, column, hit):
         """
         Take the result of a guess to mark it down on radar.
@@ -388,12 +560,19 @@ class Opponent:
         None
         """
         try:
-            self.radar_board[row][column].note_guess(hit)
+            self.radar_board.note_guess(row, column, hit)
         except TypeError as typeerror:
             print(typeerror)
         else:
-            self._guess_list.append(Turn(self.radar_board[row][column],
-                                    row, column))
+            self._guess_list.append(Turn(self.radar_board, row, column))
+            self._lattice.discard((row, column))
+            self._off_lattice.discard((row, column))
+            if hit:
+                self._total_hits += 1
+                self._hit_runs.add_hit(row, column)
+            else:
+                self._prune_around(row, column)
+            self._targeter.take_guess_answer(row, column, hit)
 
     def take_sunk_answer(self, ship):
         """Mark a ship sunk on the previous guess.
@@ -404,11 +583,58 @@ class Opponent:
             Indicates the ship sunk on that guess or None for no ship sunk.
         """
         if isinstance(ship, Ship) or ship is None:
+            if self.last_guess.sunk:
+                # a new answer replaces the one given earlier
+                self._sunk_hits -= len(self.last_guess.sunk)
             self.last_guess.sunk = ship
+            if ship:
+                self._sunk_hits += len(ship)
+                self._mark_sunk_spaces(ship)
+                ships_remaining = self.radar_fleet.ships_remaining
+                if (ships_remaining and self._seek_length
+                        < min(len(ship) for ship in ships_remaining)):
+                    self._seek_length = min(len(ship)
+                                            for ship in ships_remaining)
+                    self._prune(list(self._lattice)
+                                + list(self._off_lattice))
+            self._targeter.take_sunk_answer(ship)
         else:
             raise TypeError("'ship' argument must be None or Ship object.")
 
 
+    # ------------Snapshot Methods------------ #
+    def snapshot(self):
+        """
+        Return a compact binary snapshot of the game so far.
+
+        See the snapshot module for the record layout.
+
+        Returns
+        -------
+        bytes - a fixed-size record that restore turns back into an Opponent
+        """
+        # imported here since the snapshot module imports this one
+        from snapshot import dump
+        return dump(self)
+
+    @classmethod
+    def restore(cls, record):
+        """
+        Build an Opponent from a snapshot made by the snapshot method.
+
+        Parameters
+        ----------
+        record : bytes-like object
+            the snapshot to restore
+
+        Returns
+        -------
+        Opponent object - the opponent as it was when the snapshot was taken
+        """
+        from snapshot import load
+        return load(record)
+
+
     # ------------Additional Dunder Methods------------ #
     def __str__(self):
         """Return string representation for announcements."""
@@ -421,8 +647,8 @@ class Turn:
 
     Attributes
     ----------
-    space : Space object
-        space associated with turn
+    board : Board or BitBoard object
+        radar board on which the guess was recorded
     row : int
         row number associated with turn
     column : int
@@ -435,20 +661,22 @@ class Turn:
     hit : boolean
         indicates whether the guess was a hit on the turn
     """
-    def __init__(self, space, row, column):
+    __slots__ = ('board', 'row', 'column', '_sunk')
+
+    def __init__(self, board, row, column):
         """
         Build a Turn object.
 
         Parameters
         ----------
-        space : Space object
-            the space associated with the guess
+        board : Board or BitBoard object
+            the radar board on which the guess was recorded
         row : int
             the row associated with the guess
         column : int
             the column associated with the guess
         """
-        self.space = space
+        self.board = board
         self.row = row
         self.column = column
         self._sunk = None
@@ -476,4 +704,169 @@ class Turn:
     @property
     def hit(self):
         """Return boolean indicating whether guess was a hit."""
-        return self.space.hit == 2
+        return self.board.hit_at(self.row, self.column) == 2
+
+
+class HitRunIndex:
+    """
+    Class for keeping track of runs of adjacent hits on the radar board.
+
+    A run is a line of hits next to each other in a row or a column.
+    Only the two end spaces of each run store its length.  A new hit
+    can only join the runs that end right next to it, so recording a
+    hit and finding the longest run both take constant time.  from_mask
+    builds an index for hits already made, finding their runs with
+    bitmask shifts instead of adding the hits one at a time.
+
+    Attributes
+    ----------
+    longest : int
+        length of the longest horizontal or vertical run of hits
+    """
+    def __init__(self):
+        """Build an empty HitRunIndex object. Takes no arguments."""
+        self._row_ends = {}
+        self._column_ends = {}
+        self.longest = 0
+        # (hit_mask, width, height) from from_mask, whose runs are only
+        #   worked out when the next hit is added
+        self._pending = None
+
+    @classmethod
+    def from_mask(cls, hit_mask, width, height):
+        """
+        Build a HitRunIndex holding every hit of a mask.
+
+        longest is found straight away with bitmask shifts, while the
+        ends of the runs, only needed to join new hits, are found when
+        the next hit is added.
+
+        Parameters
+        ----------
+        hit_mask : int
+            bitmask of the hits, bit = row * width + column
+        width : int
+            the number of columns on the board
+        height : int
+            the number of rows on the board
+
+        Returns
+        -------
+        HitRunIndex object - as if every hit had been added in any order
+        """
+        index = cls()
+        index.longest = longest_run(hit_mask, width, height)
+        if hit_mask:
+            index._pending = (hit_mask, width, height)
+        return index
+
+    def _add_pending_runs(self):
+        """Store the ends of every run of the mask given to from_mask."""
+        rows, columns = hit_runs(*self._pending)
+        self._pending = None
+        for ends, runs in ((self._row_ends, rows),
+                           (self._column_ends, columns)):
+            for line, first, last in runs:
+                ends[(line, first)] = ends[(line, last)] = last - first + 1
+
+    @staticmethod
+    def _join(ends, line, index):
+        """
+        Join a new hit to the runs ending next to it in one line.
+
+        Parameters
+        ----------
+        ends : dict
+            maps (line, index) of the end spaces of runs to run length
+        line : int
+            the row or column holding the hit
+        index : int
+            position of the hit along the line
+
+        Returns
+        -------
+        int - length of the run holding the new hit
+        """
+        before = ends.get((line, index - 1), 0)
+        after = ends.get((line, index + 1), 0)
+        length = before + 1 + after
+        ends[(line, index - before)] = length
+        ends[(line, index + after)] = length
+        return length
+
+    def add_hit(self, row, column):
+        """
+        Record a hit and update the runs it joins.
+
+        Parameters
+        ----------
+        row : int
+            a zero-indexed row for the hit
+        column : int
+            a zero-indexed column for the hit
+        """
+        if self._pending:
+            self._add_pending_runs()
+        self.longest = max(self.longest,
+                           self._join(self._row_ends, row, column),
+                           self._join(self._column_ends, column, row))
+
+
+class CandidateSet:
+    """
+    Class for keeping the spaces left to seek in a random order.
+
+    The spaces are held in a list shuffled once when the set is built,
+    with a dict from each space to its place in the list.  A space is
+    removed by moving the last space into its place, which keeps the
+    order random, so adding, removing and drawing are all constant time
+    and a draw never has to be retried.
+
+    Properties
+    ----------
+    next : two-tuple of int or None
+        the space to guess next, or None if the set is empty
+    """
+    __slots__ = ('_spaces', '_places')
+
+    def __init__(self, spaces=()):
+        """
+        Build a CandidateSet object.
+
+        Parameters
+        ----------
+        spaces : iterable of two-tuple of int, optional | default: ()
+            row and column of every space, kept in the given order
+        """
+        self._spaces = list(spaces)
+        self._places = {space: place
+                        for place, space in enumerate(self._spaces)}
+
+    @property
+    def next(self):
+        """Return the space to guess next, or None if there are none."""
+        if self._spaces:
+            return self._spaces[-1]
+        return None
+
+    def discard(self, space):
+        """Remove a space from the set, if it's there."""
+        place = self._places.pop(space, None)
+        if place is None:
+            return
+        last = self._spaces.pop()
+        if last != space:
+            self._spaces[place] = last
+            self._places[last] = place
+
+    def __contains__(self, space):
+        """Return whether a space is in the set."""
+        return space in self._places
+
+    def __iter__(self):
+        """Iterate over the spaces, the next one last."""
+        return iter(self._spaces)
+
+    def __len__(self):
+        """Return the number of spaces in the set."""
+        return len(self._spaces)
@@ -0,0 +1,248 @@
+"""
+A precomputed index of every ship placement on a board.
+
+A ship lies on a board from an anchor space, its top or left end, in
+one of two orientations: 'h' runs right from the anchor and 'v' runs
+down.  A PlacementIndex lists every placement of a ship length that
+stays on the board as an integer bitmask, bit = row * width + column
+like on a BitBoard.  Whether a placement is free is then a single AND
+against a mask of the spaces already taken, and a random free placement
+is a draw from the placements that survive that AND.
+
+Each board size has one index, built by placement_index the first time
+it's asked for and shared by every Opponent after that, and the
+placements of each ship length are only built the first time the length
+is used.  The sampler and attribution modules count placements from the
+same index.
+
+Functions
+---------
+placement_index
+    Return the PlacementIndex for a board size.
+
+Classes
+-------
+PlacementIndex
+    Every placement of every ship length on a board, as bitmasks
+"""
+
+from functools import lru_cache
+
+ORIENTATIONS = ('h', 'v')
+
+
+class PlacementIndex:
+    """
+    Every placement of every ship length on a board, as bitmasks.
+
+    Attributes
+    ----------
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    """
+    __slots__ = ('width', 'height', '_entries', '_masks', '_anchored',
+                 '_covering')
+    # random placements drawn before falling back to filtering them all
+    ATTEMPTS = 8
+
+    def __init__(self, width=10, height=10):
+        """
+        Build an empty PlacementIndex for a board size.
+
+        Prefer placement_index, which builds each size only once.
+
+        Parameters
+        ----------
+        width : int, optional | default: 10
+            the number of columns on the board
+        height : int, optional | default: 10
+            the number of rows on the board
+        """
+        if width < 1 or height < 1:
+            raise ValueError(
+                "'width' and 'height' arguments must be at least 1.")
+        self.width = width
+        self.height = height
+        self._entries = {}
+        self._masks = {}
+        self._anchored = {}
+        self._covering = {}
+
+    # ------------Setup Methods------------ #
+    def _build(self, length):
+        """Build every placement of a ship length."""
+        if length < 1:
+            raise ValueError("'length' must be at least 1.")
+        width, height = self.width, self.height
+        spans = {'h': (1 << length) - 1,
+                 'v': sum(1 << (index * width) for index in range(length))}
+        entries = []
+        anchored = {orientation: [None] * (width * height)
+                    for orientation in ORIENTATIONS}
+        for row in range(height):
+            for column in range(width):
+                anchor = row * width + column
+                for orientation in ORIENTATIONS:
+                    if orientation == 'h':
+                        fits = column + length <= width
+                    else:
+                        fits = row + length <= height
+                    if fits:
+                        mask = spans[orientation] << anchor
+                        entries.append((mask, row, column, orientation))
+                        anchored[orientation][anchor] = mask
+        self._entries[length] = tuple(entries)
+        self._masks[length] = tuple(entry[0] for entry in entries)
+        self._anchored[length] = {orientation: tuple(masks)
+                                  for orientation, masks in anchored.items()}
+
+    # ------------Interface Methods------------ #
+    def entries(self, length):
+        """
+        Return every placement of a ship length.
+
+        Returns
+        -------
+        tuple of tuple - (mask, row, column, orientation) of each
+            placement, by anchor in reading order, 'h' before 'v'
+        """
+        if length not in self._entries:
+            self._build(length)
+        return self._entries[length]
+
+    def masks(self, length):
+        """Return the bitmask of every placement of a ship length."""
+        if length not in self._masks:
+            self._build(length)
+        return self._masks[length]
+
+    def mask(self, row, column, length, orientation):
+        """
+        Return the bitmask of a placement, or None if it's off the board.
+
+        Parameters
+        ----------
+        row : int
+            the row of the anchor space
+        column : int
+            the column of the anchor space
+        length : int
+            the length of the ship
+        orientation : str
+            'h' or 'v'
+
+        Returns
+        -------
+        int or None - the spaces the ship would cover
+        """
+        if not (0 <= row < self.height and 0 <= column < self.width):
+            return None
+        if length not in self._anchored:
+            self._build(length)
+        return self._anchored[length][orientation][row * self.width + column]
+
+    def fits(self, occupied, row, column, length, orientation):
+        """
+        Return whether a placement is on the board and clear of others.
+
+        Parameters
+        ----------
+        occupied : int
+            bitmask of the spaces already taken
+        row, column, length, orientation
+            the placement, as for mask
+
+        Returns
+        -------
+        boolean - indicates whether a ship can be placed there
+        """
+        mask = self.mask(row, column, length, orientation)
+        return mask is not None and not mask & occupied
+
+    def free(self, occupied, length):
+        """Return the placements of a ship length clear of occupied."""
+        return [entry for entry in self.entries(length)
+                if not entry[0] & occupied]
+
+    def choose(self, occupied, length, rng):
+        """
+        Return a random placement of a ship length clear of occupied.
+
+        Every free placement is equally likely.  A few placements are
+        drawn from the whole index first, which almost always finds a
+        free one on a sparse board, and only if they're all taken are
+        the free placements filtered out to draw from.
+
+        Parameters
+        ----------
+        occupied : int
+            bitmask of the spaces already taken
+        length : int
+            the length of the ship
+        rng : random.Random or module
+            source of random draws
+
+        Returns
+        -------
+        tuple - row, column and orientation of the placement, and the
+            number of placements drawn that weren't free
+        """
+        entries = self.entries(length)
+        # a ship too long for the board has no placements at all
+        if entries:
+            for rejections in range(self.ATTEMPTS):
+                entry = rng.choice(entries)
+                if not entry[0] & occupied:
+                    return entry[1], entry[2], entry[3], rejections
+            entries = self.free(occupied, length)
+        if not entries:
+            raise RuntimeError(
+                "There's no room left for a ship of length {}.".format(
+                    length))
+        entry = rng.choice(entries)
+        return entry[1], entry[2], entry[3], self.ATTEMPTS
+
+    def covering(self, length):
+        """
+        Return the placements of a ship length covering each space.
+
+        Returns
+        -------
+        tuple of tuple of int - the placement bitmasks covering each
+            space, indexed by row * width + column
+        """
+        if length not in self._covering:
+            by_space = [[] for _ in range(self.width * self.height)]
+            for mask in self.masks(length):
+                remaining = mask
+                while remaining:
+                    low = remaining & -remaining
+                    by_space[low.bit_length() - 1].append(mask)
+                    remaining ^= low
+            self._covering[length] = tuple(tuple(masks)
+                                           for masks in by_space)
+        return self._covering[length]
+
+
+@lru_cache(maxsize=None)
+def placement_index(width=10, height=10):
+    """
+    Return the PlacementIndex for a board size.
+
+    Each index is built once and shared, so the placements of a board
+    size are only ever worked out once per process.
+
+    Parameters
+    ----------
+    width : int, optional | default: 10
+        the number of columns on the board
+    height : int, optional | default: 10
+        the number of rows on the board
+
+    Returns
+    -------
+    PlacementIndex object - the index for that board size
+    """
+    return PlacementIndex(width, height)
@@ -0,0 +1,241 @@
+"""
+An incremental terminal renderer for app.py.
+
+The top of the screen shows the player's guesses on the computer's
+field board next to the computer's guesses on its radar board, and
+prompts go underneath.  Rather than clearing the screen by starting a
+shell, the Renderer writes ANSI escape sequences itself: the boards are
+drawn in full once, every cell drawn is cached, and each refresh after
+that only moves the cursor to the cells that changed, rewrites them and
+clears the prompt area below the boards.  The text of every board row is
+cached as well, with the cells it was made from, so a refresh only
+formats the rows where a space changed.
+
+When the output isn't a terminal, like a pipe or a log file, no escape
+sequences are written at all.  The boards are printed as plain text
+whenever they change, and clearing the screen does nothing.
+
+Functions
+---------
+board_lines
+    Return the lines of text showing a board with a row and column header.
+guess_text
+    Return the text showing the guess on a space of a board.
+
+Classes
+-------
+Renderer
+    Draws the boards on a terminal, redrawing only what changed
+"""
+
+import sys
+
+from gameconversions import location_table
+
+CSI = '\x1b['
+# text for an unguessed space, a miss and a hit, like hit_at values
+GUESS_TEXT = ('  ', ' o', ' X')
+# spaces between boards shown side by side
+GUTTER = 4
+
+
+def guess_text(board, row, column):
+    """
+    Return the text showing the guess on a space of a board.
+
+    A radar board records whether guesses hit, while a field board
+    knows where its ships are, so either can be shown without giving
+    away any ship that hasn't been hit.
+    """
+    if board.role == 'radar':
+        return GUESS_TEXT[board.hit_at(row, column)]
+    if not board.guessed_at(row, column):
+        return GUESS_TEXT[0]
+    return GUESS_TEXT[2 if board.segment_at(row, column) else 1]
+
+
+def board_lines(board, cell_text=guess_text):
+    """
+    Return the lines of text showing a board with a row and column header.
+
+    Parameters
+    ----------
+    board : Board or BitBoard object
+        the board to show
+    cell_text : function, optional | default: guess_text
+        takes the board, a row and a column and returns the two
+        character text for that space
+
+    Returns
+    -------
+    list of str - the column header, then one line per row
+    """
+    row_labels, label_width = _row_labels(board)
+    lines = [_header(board, label_width)]
+    for row, label in enumerate(row_labels):
+        lines.append(_row_line(label, label_width,
+                               [cell_text(board, row, column)
+                                for column in range(board.width)]))
+    return lines
+
+
+# ------------Helper Functions------------ #
+def _row_labels(board):
+    """Return the label of every row of a board and the widest's width."""
+    labels = location_table(board.width, board.height).labels
+    row_labels = [row_locations[0][:-1] for row_locations in labels]
+    return row_labels, max(len(label) for label in row_labels)
+
+
+def _header(board, label_width):
+    """Return the column header line of a board."""
+    header = [" " * (label_width + 3)]
+    header.extend("{:<3}".format(column + 1)
+                  for column in range(board.width))
+    return ''.join(header).rstrip()
+
+
+def _row_line(label, label_width, texts):
+    """Return the line of a board row from the text of its cells."""
+    return " {:>{}} |".format(label, label_width) + ''.join(
+        text + "|" for text in texts)
+
+
+class Renderer:
+    """
+    Draws the boards on a terminal, redrawing only what changed.
+
+    Attributes
+    ----------
+    stream : file object
+        where the screen is written, sys.stdout by default
+    ansi : boolean
+        indicates whether escape sequences are written to stream
+    """
+    def __init__(self, stream=None, *, ansi=None):
+        """
+        Build a Renderer.
+
+        Parameters
+        ----------
+        stream : file object or None, optional | default: None
+            where to write, None for sys.stdout
+        ansi : boolean or None, optional, keyword-only | default: None
+            whether to use escape sequences, None to use them only when
+            stream is a terminal
+        """
+        self.stream = sys.stdout if stream is None else stream
+        if ansi is None:
+            isatty = getattr(self.stream, 'isatty', None)
+            ansi = bool(isatty and isatty())
+        self.ansi = ansi
+        # the lines and cells last drawn, None when they must be redrawn
+        self._lines = None
+        self._cells = None
+        # for each board by position: its title and size, then the cell
+        #   texts and line of every row, as last formatted
+        self._rows = {}
+
+    # ------------Helper Methods------------ #
+    def _board_text(self, position, title, board):
+        """
+        Return the title and lines of a board, and its cell texts.
+
+        Rows whose cells are the same as when the board in this
+        position was last formatted reuse the line made then.
+
+        Returns
+        -------
+        tuple of two list - the title, header and row lines, then a
+            list of the cell texts of each row
+        """
+        texts = [tuple(guess_text(board, row, column)
+                       for column in range(board.width))
+                 for row in range(board.height)]
+        key = (title, board.width, board.height)
+        cached = self._rows.get(position)
+        if cached is None or cached[0] != key:
+            row_labels, label_width = _row_labels(board)
+            cached = (key, [title, _header(board, label_width)],
+                      [None] * board.height, row_labels, label_width)
+            self._rows[position] = cached
+        _, lines, rows, row_labels, label_width = cached
+        for row, row_texts in enumerate(texts):
+            if rows[row] is None or rows[row][0] != row_texts:
+                rows[row] = (row_texts, _row_line(row_labels[row],
+                                                  label_width, row_texts))
+        return lines + [line for _, line in rows], texts
+
+    def _frame(self, boards):
+        """
+        Return the lines of a frame and the text of every cell in it.
+
+        Returns
+        -------
+        tuple of list of str and dict - the lines, and the two character
+            text of each board space keyed by (line, column) of the
+            screen, both zero-indexed
+        """
+        lines = []
+        cells = {}
+        left = 0
+        for position, (title, board) in enumerate(boards):
+            board_text, texts = self._board_text(position, title, board)
+            # every space starts after the row label and its border
+            first = len(board_text[-1]) - 3 * board.width
+            for row, row_texts in enumerate(texts):
+                for column, text in enumerate(row_texts):
+                    cells[(row + 2, left + first + 3 * column)] = text
+            width = max(len(text) for text in board_text)
+            for index, text in enumerate(board_text):
+                if index == len(lines):
+                    lines.append(' ' * left)
+                lines[index] = lines[index].ljust(left) + text
+            left += width + GUTTER
+        return lines, cells
+
+    def _write(self, text):
+        """Write text to the stream and flush it."""
+        self.stream.write(text)
+        self.stream.flush()
+
+    # ------------Interface Methods------------ #
+    def clear(self):
+        """Clear the whole screen, or do nothing if it's not a terminal."""
+        if self.ansi:
+            self._write(CSI + 'H' + CSI + '2J')
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget what was drawn so the next refresh draws everything."""
+        self._lines = None
+        self._cells = None
+
+    def refresh(self, boards):
+        """
+        Show the boards at the top of the screen and clear the prompts.
+
+        Parameters
+        ----------
+        boards : list of two-tuple
+            a title and a Board or BitBoard object for every board,
+            shown side by side from left to right
+        """
+        lines, cells = self._frame(boards)
+        if not self.ansi:
+            if lines != self._lines:
+                self._write('\n'.join(lines) + '\n\n')
+            self._lines, self._cells = lines, cells
+            return
+        output = []
+        if self._cells is None or cells.keys() != self._cells.keys():
+            output.append(CSI + 'H' + CSI + '2J' + '\n'.join(lines))
+        else:
+            for (line, column), text in cells.items():
+                if self._cells[(line, column)] != text:
+                    output.append('{}{};{}H{}'.format(CSI, line + 1,
+                                                      column + 1, text))
+        # the prompts start on the line after a blank one below the boards
+        output.append('{}{};1H{}J'.format(CSI, len(lines) + 2, CSI))
+        self._write(''.join(output))
+        self._lines, self._cells = lines, cells
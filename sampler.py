@@ -0,0 +1,297 @@
+"""
+A Monte Carlo targeting engine for the computer opponent.
+
+Rather than counting placements of each ship on its own, like the
+density module does, this engine samples whole fleet layouts that agree
+with everything the radar board knows, and guesses the unguessed space
+that holds a ship in the most samples.  A sampled layout must:
+
+- keep every ship off every miss and keep ships from overlapping
+- cover every hit with some ship
+- put every ship answered sunk on hits only, including the space it was
+  sunk on, all guessed no later than the turn it was sunk on
+- leave at least one unhit space in every ship still afloat
+
+Because layouts are sampled as a whole, a cluster of hits from ships
+lying side by side is explained by several ships at once, and a hit that
+can only belong to one ship is credited to it.
+
+Each layout places the sunken ships first, then covers the hits still
+unexplained one at a time with a ship still afloat, then scatters the
+rest of the fleet.  This keeps almost every sample valid even late in a
+game, though it leans towards layouts that explain the hits with few
+ships, so the frequencies are an approximation of the true posterior.
+
+Sampling stops at a deadline, so a guess never takes much longer than
+its time budget no matter how loaded the machine is.  Ships are kept as
+integer bitmasks, bit = row * width + column, like on a BitBoard.
+
+Functions
+---------
+placements
+    Return the bitmask of every placement of a ship length on a board.
+covering
+    Return the placements of a ship length covering each space.
+radar_masks
+    Return the hits, misses and sunk ship constraints of the guesses.
+sample_counts
+    Return how often each unguessed space held a ship in sampled layouts.
+sample_guess
+    Return the row and column of the most often occupied unguessed space.
+
+Classes
+-------
+SampleTargeting
+    The 'sample' targeting strategy
+"""
+
+import random
+import time
+
+from placementindex import placement_index
+from strategies import TargetingStrategy
+
+# Seconds spent sampling layouts for each guess
+TIME_BUDGET = 0.005
+# Random draws made to fit each ship that isn't covering a hit
+PLACEMENT_ATTEMPTS = 20
+
+
+def placements(width, height, length):
+    """
+    Return the bitmask of every placement of a ship length on a board.
+
+    Parameters
+    ----------
+    width : int
+        the number of columns on the board
+    height : int
+        the number of rows on the board
+    length : int
+        the length of the ship
+
+    Returns
+    -------
+    tuple of int - one bitmask per horizontal and vertical placement,
+        from the board size's PlacementIndex
+    """
+    return placement_index(width, height).masks(length)
+
+
+def covering(width, height, length):
+    """
+    Return the placements of a ship length covering each space.
+
+    Returns
+    -------
+    tuple of tuple of int - the placement bitmasks covering each space,
+        indexed by row * width + column
+    """
+    return placement_index(width, height).covering(length)
+
+
+def radar_masks(width, guess_list):
+    """
+    Return the hits, misses and sunk ship constraints of the guesses.
+
+    Parameters
+    ----------
+    width : int
+        the number of columns on the radar board
+    guess_list : list of Turn objects
+        every answered guess, in the order they were made
+
+    Returns
+    -------
+    tuple - hit mask, miss mask and a list of (length, space, allowed
+        mask) for each ship answered sunk
+    """
+    hits = 0
+    misses = 0
+    sunk = []
+    for guess in guess_list:
+        space = guess.row * width + guess.column
+        if guess.hit:
+            hits |= 1 << space
+        else:
+            misses |= 1 << space
+        if guess.sunk:
+            # hits after this turn can't be part of the sunken ship
+            sunk.append((len(guess.sunk), space, hits))
+    return hits, misses, sunk
+
+
+def _sample_layout(width, height, sunk_options, lengths, hits, misses,
+                   rng):
+    """
+    Return the bitmask of one random layout, or None if it failed.
+
+    Parameters
+    ----------
+    sunk_options : list of list of int
+        the placements each sunken ship could have
+    lengths : list of int
+        the lengths of the ships still afloat
+    hits : int
+        bitmask of every hit
+    misses : int
+        bitmask of every miss
+    rng : random.Random or module
+        source of random draws
+    """
+    occupied = 0
+    for options in sunk_options:
+        options = [mask for mask in options if not mask & occupied]
+        if not options:
+            return None
+        occupied |= rng.choice(options)
+    blocked = occupied | misses
+    lengths = list(lengths)
+    uncovered = hits & ~occupied
+    while uncovered:
+        space = (uncovered & -uncovered).bit_length() - 1
+        # a ship afloat covering the hit, which can't be hit all over
+        options = [(index, mask)
+                   for index, length in enumerate(lengths)
+                   for mask in covering(width, height, length)[space]
+                   if not mask & blocked and mask & ~hits]
+        if not options:
+            return None
+        index, mask = rng.choice(options)
+        del lengths[index]
+        blocked |= mask
+        occupied |= mask
+        uncovered &= ~mask
+    for length in lengths:
+        options = placements(width, height, length)
+        for _ in range(PLACEMENT_ATTEMPTS):
+            mask = rng.choice(options)
+            if not mask & blocked and mask & ~hits:
+                break
+        else:
+            return None
+        blocked |= mask
+        occupied |= mask
+    return occupied
+
+
+def sample_counts(width, height, guess_list, ship_lengths,
+                  time_budget=TIME_BUDGET, rng=random):
+    """
+    Return how often each unguessed space held a ship in sampled layouts.
+
+    Parameters
+    ----------
+    width : int
+        the number of columns on the radar board
+    height : int
+        the number of rows on the radar board
+    guess_list : list of Turn objects
+        every answered guess, in the order they were made
+    ship_lengths : iterable of int
+        the length of every ship still afloat
+    time_budget : float, optional | default: TIME_BUDGET
+        seconds to spend sampling
+    rng : random.Random or module, optional | default: random
+        source of random draws
+
+    Returns
+    -------
+    tuple of list of int and int - the count for each space, indexed by
+        row * width + column, and the number of valid layouts sampled
+    """
+    deadline = time.perf_counter() + time_budget
+    hits, misses, sunk = radar_masks(width, guess_list)
+    guessed = hits | misses
+    sunk_options = [
+        [mask for mask in covering(width, height, length)[space]
+         if not mask & ~allowed]
+        for length, space, allowed in sunk]
+    # ships with the fewest options are placed first
+    sunk_options.sort(key=len)
+    ship_lengths = list(ship_lengths)
+    counts = [0] * (width * height)
+    samples = 0
+    while True:
+        layout = _sample_layout(width, height, sunk_options, ship_lengths,
+                                hits, misses, rng)
+        if layout is not None:
+            samples += 1
+            layout &= ~guessed
+            while layout:
+                low = layout & -layout
+                counts[low.bit_length() - 1] += 1
+                layout ^= low
+        if time.perf_counter() >= deadline:
+            return counts, samples
+
+
+def sample_guess(radar_board, guess_list, ship_lengths,
+                 time_budget=TIME_BUDGET, rng=random):
+    """
+    Return the row and column of the most often occupied unguessed space.
+
+    Ties are broken at random.  If no valid layout was found in time,
+    an unguessed space next to a hit is chosen, or else any unguessed
+    space.
+
+    Parameters
+    ----------
+    radar_board : Board or BitBoard object
+        the board tracking the opponent's guesses
+    guess_list : list of Turn objects
+        every answered guess, in the order they were made
+    ship_lengths : iterable of int
+        the length of every ship still afloat
+    time_budget : float, optional | default: TIME_BUDGET
+        seconds to spend sampling
+    rng : random.Random or module, optional | default: random
+        source of random draws
+
+    Returns
+    -------
+    two-tuple of int - row and column guess coordinates
+    """
+    width, height = radar_board.width, radar_board.height
+    counts, samples = sample_counts(width, height, guess_list, ship_lengths,
+                                    time_budget, rng)
+    if samples:
+        most = max(counts)
+        best = [space for space, count in enumerate(counts)
+                if count == most]
+        return divmod(rng.choice(best), width)
+    unguessed = [(row, column) for row in range(height)
+                 for column in range(width)
+                 if not radar_board.guessed_at(row, column)]
+    if not unguessed:
+        raise RuntimeError("There are no spaces left to guess.")
+    near_hits = [(row, column) for row, column in unguessed
+                 if any(0 <= row + row_step < height
+                        and 0 <= column + column_step < width
+                        and radar_board.hit_at(row + row_step,
+                                               column + column_step) == 2
+                        for row_step, column_step
+                        in ((0, 1), (0, -1), (1, 0), (-1, 0)))]
+    return rng.choice(near_hits or unguessed)
+
+
+class SampleTargeting(TargetingStrategy):
+    """The 'sample' targeting strategy."""
+    def guess(self):
+        """
+        Return tuple of row and column coordinates from sampled layouts.
+
+        Whole fleet layouts agreeing with every answer so far are
+        sampled until the Opponent's time_budget runs out, and the
+        unguessed space holding a ship in the most layouts is returned.
+
+        Returns
+        -------
+        two-tuple of int - row and column guess coordinates
+        """
+        opponent = self.opponent
+        ship_lengths = [len(ship)
+                        for ship in opponent.radar_fleet.ships_remaining]
+        return sample_guess(opponent.radar_board, opponent._guess_list,
+                            ship_lengths, opponent.time_budget,
+                            opponent.rng)
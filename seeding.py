@@ -0,0 +1,66 @@
+"""
+Seeds for the random generators of games.
+
+Every Opponent draws from a random.Random generator of its own, seeded
+with an int that's kept as its seed attribute, so a game played again
+with the same seeds makes exactly the same draws.  An Opponent built
+without a seed gets a fresh one from the operating system, so every
+game has a seed that can be recorded.
+
+Work handed out to a process pool, or games that need more than one
+generator, take their seeds from spawn_seeds.  It hashes a parent seed
+with each child's number, so the child streams are unrelated to each
+other and to the parent, and the same parent always spawns the same
+children no matter which process asks.
+
+Functions
+---------
+fits_64_bits
+    Return whether a seed can be stored as a signed 64-bit int.
+new_seed
+    Return a fresh seed from the operating system.
+spawn_seeds
+    Return independent child seeds derived from a seed.
+"""
+
+import hashlib
+import os
+
+# seeds fit in a signed 64-bit int, so they can be stored anywhere
+SEED_BITS = 63
+
+
+def fits_64_bits(seed):
+    """Return whether a seed can be stored as a signed 64-bit int."""
+    return (isinstance(seed, int) and not isinstance(seed, bool)
+            and -2 ** 63 <= seed < 2 ** 63)
+
+
+def new_seed():
+    """Return a fresh seed from the operating system."""
+    return int.from_bytes(os.urandom(8), 'little') >> (64 - SEED_BITS)
+
+
+def spawn_seeds(seed, count):
+    """
+    Return independent child seeds derived from a seed.
+
+    Parameters
+    ----------
+    seed : int
+        the parent seed
+    count : int
+        the number of child seeds
+
+    Returns
+    -------
+    list of int - count seeds, the same every time for the same parent
+    """
+    if not isinstance(seed, int):
+        raise TypeError("'seed' must be an int.")
+    children = []
+    for index in range(count):
+        digest = hashlib.sha256('{}/{}'.format(seed, index).encode()).digest()
+        children.append(int.from_bytes(digest[:8], 'little')
+                        >> (64 - SEED_BITS))
+    return children
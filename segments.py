@@ -24,6 +24,8 @@ class Segment():
     hit : boolean
         indicates whether the Segment instance has been hit
     """
+    __slots__ = ('string_rep_tup', 'ship', '_hit')
+
     def __init__(self, string_rep_tup, ship):
         """
         Constructs attributes for Segment object
@@ -48,16 +50,24 @@ class Segment():
 
     @hit.setter
     def hit(self, value):
-        """Set hit value. Produces an error if already hit."""
+        """
+        Set hit value. Produces an error if already hit.
+
+        The owning ship is told about every change so it can keep its
+        count of hit segments up to date.
+        """
         if value:
             if not self._hit:
                 self._hit = True
+                self.ship.note_segment_hit(True)
             else:
                 raise TypeError(
                     "Cannot set 'hit' attribute to True on this "
                     + "segment since it is already marked as hit.")
         elif not value:
-            self._hit = False
+            if self._hit:
+                self._hit = False
+                self.ship.note_segment_hit(False)
         else:
             raise ValueError("Value for 'hit' can only be a boolean.")
 
@@ -0,0 +1,492 @@
+"""
+An asyncio server hosting many games against the computer opponent.
+
+Clients connect over TCP and send one JSON object per line.  Every
+request names an operation with 'op', and every game session is kept
+under an ID handed out by the 'new' operation, so any number of
+sessions can be played at once over any number of connections.  Each
+response is one JSON line with 'ok' set to true or false, and echoes
+the request's 'id' if it had one so clients can match responses to
+requests.
+
+Operations
+----------
+new
+    Start a session.  Optional 'targeting', 'width' and 'height' (up to
+    MAX_SIZE each), and 'seed'.  Returns 'session' and the 'seed' the
+    computer plays with, which plays the same game again when given
+    back.
+guess
+    The computer makes a guess.  Returns 'row', 'column' and 'location'.
+answer
+    Answer the computer's guess at 'row' and 'column' with 'hit'.
+    Returns 'possible_sunk', the names of ships that might have sunk.
+sunk
+    Tell the computer which ship, by name in 'ship', sunk on its last
+    guess, or null for none.  Returns 'winner' if the fleet is gone.
+fire
+    The player guesses at 'row' and 'column' or at a 'location' like
+    'B7'.  Returns 'hit', 'sunk' and 'winner'.
+close
+    End a session.
+stats
+    Return the decision statistics of every session as 'stats', or as
+    Prometheus text in 'text' if 'format' is 'prometheus'.  Optional
+    'collect' turns collection on or off.
+
+Every operation works on in-memory game state only, so no request waits
+on anything but its own socket.  Two kinds of request take long enough to
+hold up every other session: building the computer on a board of more
+than OFFLOAD_SPACES spaces, and guesses by 'sample' targeting, which
+sample for their whole time budget.  Those run in the event loop's
+default executor instead, and a session is busy while its guess is made
+there, so other requests for it are turned away until the guess comes
+back.  With --store, sessions left idle for --idle-timeout seconds are
+moved out of memory into a memory-mapped snapshot file and brought back
+the next time they're used.  With --record, every turn of every session
+is added to a game log (see gamelog.py), each session logged under the
+number made of the first 16 hex digits of its ID.
+
+Usage: python -m server [--host HOST] [--port PORT] [--store FILE]
+                        [--idle-timeout SECONDS] [--record FILE]
+                        [--stats]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import uuid
+
+from gameconversions import location_table
+from opponent import Opponent
+from seeding import fits_64_bits
+
+DEFAULT_PORT = 8754
+IDLE_TIMEOUT = 300
+# the widest and tallest board a session can have, since every space
+#   of both boards is kept in memory for as long as the session lasts
+MAX_SIZE = 100
+# sessions on boards with more spaces than this are built off the loop
+OFFLOAD_SPACES = 100
+
+
+class GameServer:
+    """
+    A collection of game sessions and the operations on them.
+
+    Attributes
+    ----------
+    sessions : dict
+        maps session IDs to Opponent objects held in memory
+    store : SnapshotStore object or None
+        where idle sessions are kept, if anywhere
+    idle_timeout : float
+        seconds a session can go unused before evict_idle stores it
+    game_log : GameLog object or None
+        where every turn is logged, if anywhere
+    stats : DecisionStats object or None
+        where every session reports its decisions, None while
+        collection is off
+    """
+    def __init__(self, store=None, idle_timeout=IDLE_TIMEOUT,
+                 game_log=None, stats=None):
+        """
+        Build a GameServer with no sessions.
+
+        Parameters
+        ----------
+        store : SnapshotStore object or None, optional | default: None
+            where idle sessions are kept, None keeps every session in
+            memory
+        idle_timeout : float, optional | default: IDLE_TIMEOUT
+            seconds a session can go unused before evict_idle stores it
+        game_log : GameLog object or None, optional | default: None
+            where every turn is logged, None logs nothing
+        stats : DecisionStats object or None, optional | default: None
+            where sessions report their decisions, None collects nothing
+        """
+        self.sessions = {}
+        self.store = store
+        self.idle_timeout = idle_timeout
+        self.game_log = game_log
+        self.stats = stats
+        # kept while collection is off so turning it on carries on
+        self._stats = stats
+        self._last_used = {}
+        # sessions whose guess is being made in the executor
+        self._busy = set()
+        self._operations = {
+            'new': self._new,
+            'guess': self._guess,
+            'answer': self._answer,
+            'sunk': self._sunk,
+            'fire': self._fire,
+            'close': self._close,
+            'stats': self._stats_operation,
+        }
+
+    # ------------Helper Methods------------ #
+    def _session(self, request):
+        """Return the Opponent for the session named in a request."""
+        session = request.get('session')
+        if session in self._busy:
+            raise ValueError("Session {} is busy making a guess.".format(
+                session))
+        if session not in self.sessions:
+            if self.store is None or session not in self.store:
+                raise ValueError("Unknown session: {}.".format(session))
+            self.sessions[session] = self.store.pop(session)
+            self.sessions[session].stats = self.stats
+        self._last_used[session] = time.monotonic()
+        return self.sessions[session]
+
+    @staticmethod
+    def _space(request, board):
+        """Return the row and column named in a request."""
+        if 'location' in request:
+            return location_table(board.width, board.height).parse(
+                str(request['location']))
+        row, column = int(request['row']), int(request['column'])
+        if not (0 <= row < board.height and 0 <= column < board.width):
+            raise ValueError("Space is outside the range of the board.")
+        return row, column
+
+    @staticmethod
+    def _board_size(request):
+        """Return the width and height asked for in a 'new' request."""
+        width = int(request.get('width', 10))
+        height = int(request.get('height', 10))
+        if width > MAX_SIZE or height > MAX_SIZE:
+            raise ValueError("Boards can't be bigger than {0}x{0}.".format(
+                MAX_SIZE))
+        return width, height
+
+    @staticmethod
+    def _game_number(request):
+        """Return the game log number of the session named in a request."""
+        return int(request['session'][:16], 16)
+
+    def _new_opponent(self, request):
+        """Build the Opponent of a 'new' request, touching no sessions."""
+        width, height = self._board_size(request)
+        seed = request.get('seed')
+        # sessions are snapshot and logged, which store 64-bit seeds
+        if seed is not None and not fits_64_bits(seed):
+            raise ValueError("'seed' must be an int that fits in 64 bits.")
+        return Opponent(targeting=request.get('targeting', 'lattice'),
+                        width=width, height=height, stats=self.stats,
+                        seed=seed)
+
+    def _add_session(self, opponent):
+        """Keep a new Opponent under a new session ID, returning the reply."""
+        # collection may have been turned on or off while it was built
+        opponent.stats = self.stats
+        session = uuid.uuid4().hex
+        self.sessions[session] = opponent
+        self._last_used[session] = time.monotonic()
+        if self.game_log is not None:
+            self.game_log.start(opponent, game=int(session[:16], 16))
+        return {'session': session, 'seed': opponent.seed}
+
+    @staticmethod
+    def _make_guess(opponent):
+        """Return the response to a guess made by an Opponent."""
+        row, column = opponent.make_guess()
+        table = location_table(opponent.radar_board.width,
+                               opponent.radar_board.height)
+        return {'row': row, 'column': column,
+                'location': table.format(row, column)}
+
+    async def _off_loop(self, request):
+        """
+        Carry out a request in the executor if it would block the loop.
+
+        Returns
+        -------
+        dict or None - the response, or None if the request is quick
+            enough to carry out on the event loop
+        """
+        loop = asyncio.get_running_loop()
+        if request['op'] == 'new':
+            width, height = self._board_size(request)
+            if width * height <= OFFLOAD_SPACES:
+                return None
+            opponent = await loop.run_in_executor(None, self._new_opponent,
+                                                  request)
+            return self._add_session(opponent)
+        if request['op'] == 'guess':
+            opponent = self._session(request)
+            if opponent.targeting != 'sample':
+                return None
+            session = request['session']
+            self._busy.add(session)
+            try:
+                return await loop.run_in_executor(None, self._make_guess,
+                                                  opponent)
+            finally:
+                self._busy.discard(session)
+        return None
+
+    # ------------Operations------------ #
+    def _new(self, request):
+        """Start a new session."""
+        return self._add_session(self._new_opponent(request))
+
+    def _guess(self, request):
+        """Have the computer make a guess."""
+        return self._make_guess(self._session(request))
+
+    def _answer(self, request):
+        """Answer the computer's guess with a hit or a miss."""
+        opponent = self._session(request)
+        row, column = self._space(request, opponent.radar_board)
+        if opponent.radar_board.guessed_at(row, column):
+            raise ValueError("That space has already been answered.")
+        hit = request['hit']
+        if not isinstance(hit, bool):
+            raise ValueError("'hit' must be true or false.")
+        opponent.take_guess_answer(row, column, hit)
+        if self.game_log is not None:
+            self.game_log.shot(self._game_number(request), 'computer', row,
+                               column, hit)
+        possible_sunk = opponent.possible_sunk() if hit else []
+        return {'possible_sunk': [str(ship) for ship in possible_sunk]}
+
+    def _sunk(self, request):
+        """Tell the computer which ship sunk on its last guess."""
+        opponent = self._session(request)
+        if opponent.last_guess is None:
+            raise ValueError("No guess by the computer has been answered yet.")
+        name = request.get('ship')
+        ship = None
+        if name is not None:
+            for possible in opponent.possible_sunk():
+                if str(possible) == name:
+                    ship = possible
+                    break
+            else:
+                raise ValueError("{} can't have been sunk.".format(name))
+            ship.sunk = True
+        opponent.take_sunk_answer(ship)
+        winner = 'computer' if opponent.radar_fleet.defeated else None
+        if self.game_log is not None and ship is not None:
+            game = self._game_number(request)
+            self.game_log.sunk(game, 'computer',
+                               opponent.radar_fleet.index(ship))
+            if winner:
+                self.game_log.end(game, winner)
+                self.game_log.flush()
+        return {'winner': winner}
+
+    def _fire(self, request):
+        """Take the player's guess at the computer's field board."""
+        opponent = self._session(request)
+        row, column = self._space(request, opponent.field_board)
+        segment = opponent.field_board.take_guess(row, column)
+        response = {'hit': bool(segment), 'sunk': None, 'winner': None}
+        if segment:
+            segment.hit = True
+            if segment.ship.sunk:
+                response['sunk'] = str(segment.ship)
+            if opponent.field_fleet.defeated:
+                response['winner'] = 'player'
+        if self.game_log is not None:
+            game = self._game_number(request)
+            self.game_log.shot(game, 'player', row, column, bool(segment))
+            if response['sunk']:
+                self.game_log.sunk(game, 'player',
+                                   opponent.field_fleet.index(segment.ship))
+            if response['winner']:
+                self.game_log.end(game, 'player')
+                self.game_log.flush()
+        return response
+
+    def _close(self, request):
+        """End a session."""
+        opponent = self._session(request)
+        if (self.game_log is not None
+                and not opponent.radar_fleet.defeated
+                and not opponent.field_fleet.defeated):
+            self.game_log.end(self._game_number(request))
+            self.game_log.flush()
+        del self.sessions[request['session']]
+        del self._last_used[request['session']]
+        return {}
+
+    def _stats_operation(self, request):
+        """Return the decision statistics, turning collection on or off."""
+        if 'collect' in request:
+            if request['collect']:
+                if self._stats is None:
+                    from instrumentation import DecisionStats
+                    self._stats = DecisionStats()
+                self.stats = self._stats
+            else:
+                self.stats = None
+            for opponent in self.sessions.values():
+                opponent.stats = self.stats
+        if self._stats is None:
+            raise ValueError("Decision statistics have never been "
+                             "collected.")
+        if request.get('format') == 'prometheus':
+            return {'text': self._stats.to_prometheus()}
+        return {'stats': self._stats.as_dict()}
+
+    # ------------Interface Methods------------ #
+    def evict_idle(self, now=None):
+        """
+        Move sessions unused for idle_timeout seconds into the store.
+
+        Sessions on boards of a different size than the store's, or that
+        can't be snapshot, stay in memory.
+
+        Parameters
+        ----------
+        now : float or None, optional | default: None
+            the time.monotonic() value to measure idleness from, None
+            uses the current time
+
+        Returns
+        -------
+        int - the number of sessions moved into the store
+        """
+        if self.store is None:
+            return 0
+        if now is None:
+            now = time.monotonic()
+        evicted = 0
+        for session, last_used in list(self._last_used.items()):
+            opponent = self.sessions[session]
+            if (now - last_used >= self.idle_timeout
+                    and session not in self._busy
+                    and opponent.radar_board.width == self.store.width
+                    and opponent.radar_board.height == self.store.height):
+                try:
+                    self.store.put(session, opponent)
+                except (TypeError, ValueError):
+                    # one session that can't be stored mustn't stop
+                    #   the rest from being evicted
+                    continue
+                del self.sessions[session]
+                del self._last_used[session]
+                evicted += 1
+        return evicted
+
+    async def handle_request(self, request):
+        """
+        Carry out one request and return the response.
+
+        Requests that would block the event loop, see _off_loop, are
+        carried out in its default executor.
+
+        Parameters
+        ----------
+        request : dict
+            the decoded JSON request
+
+        Returns
+        -------
+        dict - the response, with 'ok' and 'error' if it failed
+        """
+        try:
+            operation = self._operations[request['op']]
+            response = await self._off_loop(request)
+            if response is None:
+                response = operation(request)
+            response['ok'] = True
+        except KeyError as keyerror:
+            response = {'ok': False,
+                        'error': "Missing or unknown field: {}.".format(
+                            keyerror)}
+        except (TypeError, ValueError, RuntimeError) as error:
+            response = {'ok': False, 'error': str(error)}
+        except Exception as error:
+            # a bug in one request mustn't drop the client's connection
+            response = {'ok': False,
+                        'error': "Internal error: {!r}.".format(error)}
+        if 'id' in request:
+            response['id'] = request['id']
+        return response
+
+    async def handle_connection(self, reader, writer):
+        """Answer JSON line requests from one client until it leaves."""
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError
+                except ValueError:
+                    response = {'ok': False,
+                                'error': "Requests must be JSON objects."}
+                else:
+                    response = await self.handle_request(request)
+                writer.write(json.dumps(response).encode() + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=DEFAULT_PORT):
+        """Listen for clients until cancelled."""
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=2 ** 16)
+        if self.store is not None:
+            asyncio.ensure_future(self._evict_periodically())
+        async with server:
+            await server.serve_forever()
+
+    async def _evict_periodically(self):
+        """Evict idle sessions every half idle_timeout."""
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            self.evict_idle()
+
+
+def main(argv=None):
+    """Run the game server from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--store',
+                        help="keep idle 10x10 sessions in snapshot FILE")
+    parser.add_argument('--idle-timeout', type=float, default=IDLE_TIMEOUT)
+    parser.add_argument('--record',
+                        help="add every turn of every session to game log "
+                        "FILE")
+    parser.add_argument('--stats', action='store_true',
+                        help="collect decision statistics from the start")
+    args = parser.parse_args(argv)
+    store = None
+    if args.store:
+        from snapshot import SnapshotStore
+        store = SnapshotStore(args.store)
+    game_log = None
+    if args.record:
+        from gamelog import GameLog
+        game_log = GameLog(args.record)
+    stats = None
+    if args.stats:
+        from instrumentation import DecisionStats
+        stats = DecisionStats()
+    print("Serving Battleship Bot on {}:{}".format(args.host, args.port))
+    try:
+        asyncio.run(GameServer(store, args.idle_timeout, game_log,
+                               stats).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if store is not None:
+            store.close()
+        if game_log is not None:
+            game_log.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
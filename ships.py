@@ -4,7 +4,9 @@ Contains Ship and its subclasses for a Battleship game.
 The Ship class keeps segments grouped appropriately and uses the
 segments to determine whether a ship is sunk. It also creates the
 segments with the appropriate string representations that match the
-class of the ship.
+class of the ship.  Each subclass keeps its string representations in
+class-level tuples shared by all its instances, and every class uses
+__slots__ to keep the many ships of concurrent games small.
 
 Classes
 -------
@@ -33,11 +35,11 @@ class Ship():
         the object representing who owns the ship
     ship_type : str
         indicates the type of ship for reference in messages
-    horizontal_string_reps : list of tuples
-        a list of tuples that contain string representations for
+    horizontal_string_reps : sequence of tuples
+        a sequence of tuples that contain string representations for
         hit and not hit segments of the Ship when horizontal
-    vertical_string_reps : list of tuples
-        a list of tuples that contain string representations for
+    vertical_string_reps : sequence of tuples
+        a sequence of tuples that contain string representations for
         hit and not hit segments of the Ship when vertical
     orientation : str
         orientation of the Ship on the board
@@ -45,12 +47,17 @@ class Ship():
             'v' for vertical
     segments : list of Segment objects
         a list containing each Segment of the Ship
+    fleet : Fleet object or None
+        the Fleet the Ship belongs to, told when the Ship sinks
 
     Properties
     ----------
     sunk: boolean
         indicates whether the Ship instance is sunk
     """
+    __slots__ = ('ship_type', 'horizontal_string_reps',
+                 'vertical_string_reps', 'orientation', 'fleet', 'segments',
+                 '_hits')
 
     def __init__(self, ship_type, horizontal_string_reps,
                  vertical_string_reps, *, orientation='h'):
@@ -62,9 +69,9 @@ class Ship():
             ship_type : str
                 a string representing the type of ship
                 example: 'PT Boat'
-            horizontal_string_reps : list of tuples, optional
+            horizontal_string_reps : sequence of tuples, optional
                 should generally be passed by __init__ in subclass
-            vertical_string_reps : list of tuples, optional
+            vertical_string_reps : sequence of tuples, optional
                 should generally be passed by __init__ in subclass
             orientation : str, optional, keyword-only | default: 'h'
                 'h' for horizontal, 'v' for vertical
@@ -77,7 +84,9 @@ class Ship():
         self.horizontal_string_reps = horizontal_string_reps
         self.vertical_string_reps = vertical_string_reps
         self.orientation = orientation
+        self.fleet = None
         self.segments = []
+        self._hits = 0
         self._assign_segments()
 
     def _assign_segments(self):
@@ -117,6 +126,26 @@ class Ship():
             segment.string_rep_tup = segment_rep
         return self.orientation
 
+    def note_segment_hit(self, hit):
+        """
+        Update the count of hit segments when a segment changes.
+
+        Called by the 'hit' setter of Segment.  If the change sinks or
+        refloats the Ship, its fleet is told as well.
+
+        Parameters
+        ----------
+            hit : boolean
+                True when a segment was hit, False when a hit was undone
+        """
+        was_sunk = self.sunk
+        if hit:
+            self._hits += 1
+        else:
+            self._hits -= 1
+        if self.fleet is not None and self.sunk != was_sunk:
+            self.fleet.note_ship_sunk(self, self.sunk)
+
     # ------------Properties------------ #
     @property
     def sunk(self):
@@ -127,7 +156,7 @@ class Ship():
         -------
         boolean - indicates whether the ship was sunk
         """
-        return all([segment.hit for segment in self.segments])
+        return self._hits == len(self.segments)
 
     @sunk.setter
     def sunk(self, value):
@@ -157,6 +186,22 @@ class Carrier(Ship):
     """
     Subclass of ship with Carrier attributes filled in.
     """
+    __slots__ = ()
+
+    HORIZONTAL_STRING_REPS = (
+        ("[=", "[x"),
+        ("==", "=x"),
+        ("#=", "#x"),
+        ("==", "=x"),
+        ("=]", "x]"),
+    )
+    VERTICAL_STRING_REPS = (
+        ("[]", "[X"),
+        ("||", "|X"),
+        ("#|", "#X"),
+        ("||", "|X"),
+        ("[]", "[X"),
+    )
 
     def __init__(self, *, orientation='h'):
         """
@@ -169,28 +214,29 @@ class Carrier(Ship):
             orientation : str, optional, keyword-only
                 'h' for horizontal, 'v' for vertical (default is 'h')
         """
-        horizontal_string_reps = [
-            ("[=", "[x"),
-            ("==", "=x"),
-            ("#=", "#x"),
-            ("==", "=x"),
-            ("=]", "x]"),
-        ]
-        vertical_string_reps = [
-            ("[]", "[X"),
-            ("||", "|X"),
-            ("#|", "#X"),
-            ("||", "|X"),
-            ("[]", "[X"),
-        ]
-        super().__init__('Carrier', horizontal_string_reps,
-                         vertical_string_reps, orientation=orientation)
+        super().__init__('Carrier', self.HORIZONTAL_STRING_REPS,
+                         self.VERTICAL_STRING_REPS,
+                         orientation=orientation)
 
 
 class Battleship(Ship):
     """
     Subclass of Ship with Battleship attributes filled in.
     """
+    __slots__ = ()
+
+    HORIZONTAL_STRING_REPS = (
+        ("<=", "<x"),
+        ("==", "=x"),
+        ("==", "=x"),
+        ("=]", "x]"),
+    )
+    VERTICAL_STRING_REPS = (
+        ("/\\", "/X"),
+        ("||", "|X"),
+        ("||", "|X"),
+        ("[]", "[X"),
+    )
 
     def __init__(self, *, orientation='h'):
         """
@@ -203,26 +249,27 @@ class Battleship(Ship):
             orientation : str, optional, keyword-only
                 'h' for horizontal, 'v' for vertical (default is 'h')
         """
-        horizontal_string_reps = [
-            ("<=", "<x"),
-            ("==", "=x"),
-            ("==", "=x"),
-            ("=]", "x]"),
-        ]
-        vertical_string_reps = [
-            ("/\\", "/X"),
-            ("||", "|X"),
-            ("||", "|X"),
-            ("[]", "[X"),
-        ]
-        super().__init__('Battleship', horizontal_string_reps,
-                         vertical_string_reps, orientation=orientation)
+        super().__init__('Battleship', self.HORIZONTAL_STRING_REPS,
+                         self.VERTICAL_STRING_REPS,
+                         orientation=orientation)
 
 
 class Destroyer(Ship):
     """
     Subclass of Ship with Destroyer attributes filled in.
     """
+    __slots__ = ()
+
+    HORIZONTAL_STRING_REPS = (
+        ("<=", "<x"),
+        ("==", "=x"),
+        ("=]", "x]"),
+    )
+    VERTICAL_STRING_REPS = (
+        ("/\\", "/X"),
+        ("||", "|X"),
+        ("[]", "[X"),
+    )
 
     def __init__(self, *, orientation='h'):
         """
@@ -235,24 +282,27 @@ class Destroyer(Ship):
             orientation : str, optional, keyword-only
                 'h' for horizontal, 'v' for vertical (default is 'h')
         """
-        horizontal_string_reps = [
-            ("<=", "<x"),
-            ("==", "=x"),
-            ("=]", "x]"),
-        ]
-        vertical_string_reps = [
-            ("/\\", "/X"),
-            ("||", "|X"),
-            ("[]", "[X"),
-        ]
-        super().__init__('Destroyer', horizontal_string_reps,
-                         vertical_string_reps, orientation=orientation)
+        super().__init__('Destroyer', self.HORIZONTAL_STRING_REPS,
+                         self.VERTICAL_STRING_REPS,
+                         orientation=orientation)
 
 
 class Submarine(Ship):
     """
     Subclass of Ship with Submarine attributes filled in.
     """
+    __slots__ = ()
+
+    HORIZONTAL_STRING_REPS = (
+        ("<=", "<x"),
+        ("^=", "^x"),
+        ("=>", "x>"),
+    )
+    VERTICAL_STRING_REPS = (
+        ("/\\", "/X"),
+        ("|>", "|X"),
+        ("\\/", "\\X"),
+    )
 
     def __init__(self, *, orientation='h'):
         """
@@ -265,24 +315,25 @@ class Submarine(Ship):
             orientation : str, optional, keyword-only
                 'h' for horizontal, 'v' for vertical (default is 'h')
         """
-        horizontal_string_reps = [
-            ("<=", "<x"),
-            ("^=", "^x"),
-            ("=>", "x>"),
-        ]
-        vertical_string_reps = [
-            ("/\\", "/X"),
-            ("|>", "|X"),
-            ("\\/", "\\X"),
-        ]
-        super().__init__('Submarine', horizontal_string_reps,
-                         vertical_string_reps, orientation=orientation)
+        super().__init__('Submarine', self.HORIZONTAL_STRING_REPS,
+                         self.VERTICAL_STRING_REPS,
+                         orientation=orientation)
 
 
 class PTBoat(Ship):
     """
     Subclass of Ship with PTBoat attributes filled in.
     """
+    __slots__ = ()
+
+    HORIZONTAL_STRING_REPS = (
+        ("<=", "<x"),
+        ("=]", "x]"),
+    )
+    VERTICAL_STRING_REPS = (
+        ("/\\", "/X"),
+        ("[]", "[X"),
+    )
 
     def __init__(self, *, orientation='h'):
         """
@@ -295,13 +346,6 @@ class PTBoat(Ship):
             orientation : str, optional, keyword-only
                 'h' for horizontal, 'v' for vertical (default is 'h')
         """
-        horizontal_string_reps = [
-            ("<=", "<x"),
-            ("=]", "x]"),
-        ]
-        vertical_string_reps = [
-            ("/\\", "/X"),
-            ("[]", "[X"),
-        ]
-        super().__init__('PT Boat', horizontal_string_reps,
-                         vertical_string_reps, orientation=orientation)
+        super().__init__('PT Boat', self.HORIZONTAL_STRING_REPS,
+                         self.VERTICAL_STRING_REPS,
+                         orientation=orientation)
@@ -0,0 +1,321 @@
+"""
+A headless simulator for judging the computer opponent.
+
+The simulator plays the guessing half of a game without any prompts:
+an Opponent makes guesses against a randomly placed fleet, and the
+answers to make_guess are given back through take_guess_answer and
+take_sunk_answer just like a player would give them in app.py.  Games
+are fanned out over a process pool, and the number of shots it took to
+win each game is collected in a histogram.  With --batch, 'density'
+targeting games are played a whole chunk at a time by the batch module,
+which is many times faster.
+
+Usage: python -m simulator [--games N] [--processes N] [--seed N]
+                           [--targeting MODE] [--engine ENGINE]
+                           [--width N] [--height N] [--output FILE]
+                           [--debug] [--batch]
+
+Functions
+---------
+answer_guess
+    Answer an opponent guess against a field board and fleet.
+play_game
+    Play one game and return the number of shots it took to win.
+play_batch
+    Play 'density' targeting games together and return shots-to-win.
+run_tournament
+    Play many games over a process pool and histogram shots-to-win.
+"""
+
+import argparse
+import json
+import sys
+from collections import Counter
+from multiprocessing import Pool
+
+import opponent as opponent_module
+from bitboard import BitBoard
+from board import Board
+from fleet import Fleet
+from opponent import Opponent
+from seeding import new_seed, spawn_seeds
+
+ENGINES = {'board': Board, 'bitboard': BitBoard}
+
+
+def answer_guess(opponent, field_board, field_fleet, row, column):
+    """
+    Answer an opponent guess against a field board and fleet.
+
+    The guess is marked on the field board and the answer is passed
+    to the opponent.  When the guess sinks a ship, the matching ship in
+    the opponent's radar fleet is marked sunk and passed back too.
+
+    Returns
+    -------
+    boolean - indicates whether the fleet has been defeated
+    """
+    segment = field_board.take_guess(row, column)
+    opponent.take_guess_answer(row, column, bool(segment))
+    if segment:
+        segment.hit = True
+        if segment.ship.sunk:
+            for ship in opponent.radar_fleet:
+                if ship.ship_type == segment.ship.ship_type:
+                    ship.sunk = True
+                    opponent.take_sunk_answer(ship)
+            return field_fleet.defeated
+    return False
+
+
+def play_game(seed=None, *, engine='board', targeting='lattice', width=10,
+              height=10, stats=None, placement='legacy'):
+    """
+    Play one game and return the number of shots it took to win.
+
+    Parameters
+    ----------
+    seed : int or None, optional | default: None
+        seed of the game so it can be played again, None for a fresh
+        one; the opponent's and target's generators are spawned from it
+    engine : str, optional, keyword-only | default: 'board'
+        'board' or 'bitboard' determines the board class used
+    targeting : str, optional, keyword-only | default: 'lattice'
+        targeting mode passed to the Opponent
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the boards
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the boards
+    stats : DecisionStats object or None, optional, keyword-only
+            | default: None
+        where the opponent reports its guesses, see the instrumentation
+        module
+    placement : str, optional, keyword-only | default: 'legacy'
+        placement strategy the target fleet is placed with
+
+    Returns
+    -------
+    int or None - shots taken to win, or None if the opponent stalled
+    """
+    if seed is None:
+        seed = new_seed()
+    opponent_seed, target_seed = spawn_seeds(seed, 2)
+    board_class = ENGINES[engine]
+    opponent = Opponent(board_class=board_class, targeting=targeting,
+                        width=width, height=height, stats=stats,
+                        seed=opponent_seed)
+    # the target fleet is placed by the same rules as the opponent's own,
+    #   unless another placement strategy is asked for, from a stream of
+    #   its own so every targeting strategy faces the same fleet
+    target = Opponent(board_class=board_class, width=width, height=height,
+                      placement=placement, seed=target_seed)
+    shots = 0
+    while True:
+        try:
+            row, column = opponent.make_guess()
+        except RuntimeError:
+            # a targeting mode that can't come up with a guess stalls
+            return None
+        shots += 1
+        if answer_guess(opponent, target.field_board, target.field_fleet,
+                        row, column):
+            return shots
+
+
+def play_batch(seeds, *, width=10, height=10):
+    """
+    Play 'density' targeting games together and return shots-to-win.
+
+    The fleet in each game is placed just like the target fleet of
+    play_game with the same seed, and the guesses and answers of every
+    game are made together by an OpponentBatch.  Each game breaks ties
+    with a generator of its own, seeded like the opponent of play_game,
+    so a game's result doesn't depend on which other games share its
+    batch.
+
+    Parameters
+    ----------
+    seeds : sequence of int
+        one seed per game
+    width : int, optional, keyword-only | default: 10
+        the number of columns on the boards
+    height : int, optional, keyword-only | default: 10
+        the number of rows on the boards
+
+    Returns
+    -------
+    list of int - shots taken to win each game, in the order of seeds
+    """
+    if not seeds:
+        return []
+    # imported here so NumPy is only needed for batched games
+    import numpy as np
+
+    from batch import OpponentBatch
+    ships = np.zeros((len(seeds), height, width), dtype=np.int8)
+    opponent_seeds = []
+    for game, seed in enumerate(seeds):
+        opponent_seed, target_seed = spawn_seeds(seed, 2)
+        opponent_seeds.append(opponent_seed)
+        # on the engine that's quickest to build
+        target = Opponent(board_class=BitBoard, width=width, height=height,
+                          seed=target_seed)
+        fleet = list(target.field_fleet)
+        for row in range(height):
+            for column in range(width):
+                segment = target.field_board.segment_at(row, column)
+                if segment:
+                    ships[game, row, column] = fleet.index(segment.ship) + 1
+    # index 0 stands for open water
+    ship_lengths = np.array([0] + [len(ship) for ship in Fleet()])
+    hits_left = np.tile(ship_lengths[1:], (len(seeds), 1))
+    batch = OpponentBatch(len(seeds), width=width, height=height,
+                          seed=opponent_seeds)
+    while batch.active.any():
+        games, rows, columns = batch.make_guesses()
+        ship = ships[games, rows, columns].astype(np.intp)
+        hits = ship > 0
+        hits_left[games[hits], ship[hits] - 1] -= 1
+        sunk = hits.copy()
+        sunk[hits] = hits_left[games[hits], ship[hits] - 1] == 0
+        batch.apply_answers(games, rows, columns, hits,
+                            np.where(sunk, ship_lengths[ship], 0))
+    return batch.shots.tolist()
+
+
+def _play_seeds(job):
+    """Play a range of seeded games and return histogram and stalls."""
+    start, stop, options = job
+    histogram = Counter()
+    stalled = 0
+    if options.get('batch'):
+        histogram.update(play_batch(range(start, stop),
+                                    width=options['width'],
+                                    height=options['height']))
+        return histogram, stalled
+    for seed in range(start, stop):
+        shots = play_game(seed, **options)
+        if shots is None:
+            stalled += 1
+        else:
+            histogram[shots] += 1
+    return histogram, stalled
+
+
+def _set_debug(debug):
+    """Turn the opponent module's debug checks on or off in a worker."""
+    opponent_module.DEBUG = debug
+
+
+def run_tournament(games, *, processes=None, chunk_size=1000, seed=0,
+                   debug=False, **options):
+    """
+    Play many games over a process pool and histogram shots-to-win.
+
+    Game number n is played with seed + n, so a run can be repeated and
+    any single game looked at again with play_game.
+
+    Parameters
+    ----------
+    games : int
+        the number of games to play
+    processes : int or None, optional, keyword-only | default: None
+        size of the process pool, None uses every CPU
+    chunk_size : int, optional, keyword-only | default: 1000
+        games handed to a worker at a time
+    seed : int, optional, keyword-only | default: 0
+        seed of the first game
+    debug : boolean, optional, keyword-only | default: False
+        check the opponent's running tallies on every read
+    **options
+        engine, targeting, placement, width and height keyword arguments
+        passed to play_game, or batch=True with width and height to play
+        'density' targeting games with play_batch
+
+    Returns
+    -------
+    tuple of Counter and int - histogram mapping shots-to-win to number
+        of games, and the number of stalled games
+    """
+    jobs = [(start, min(start + chunk_size, seed + games), options)
+            for start in range(seed, seed + games, chunk_size)]
+    histogram = Counter()
+    stalled = 0
+    with Pool(processes, initializer=_set_debug,
+              initargs=(debug,)) as pool:
+        for chunk_histogram, chunk_stalled in pool.imap_unordered(
+                _play_seeds, jobs):
+            histogram.update(chunk_histogram)
+            stalled += chunk_stalled
+    return histogram, stalled
+
+
+def summarize(histogram, stalled):
+    """Return a dict of summary statistics for a shots-to-win histogram."""
+    won = sum(histogram.values())
+    summary = {'games': won + stalled, 'won': won, 'stalled': stalled}
+    if won:
+        ordered = sorted(histogram.elements())
+        summary.update({
+            'mean': sum(ordered) / won,
+            'median': ordered[won // 2],
+            'min': ordered[0],
+            'max': ordered[-1],
+        })
+    return summary
+
+
+def main(argv=None):
+    """Run a tournament from the command line and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--games', type=int, default=10000)
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--targeting', default=None,
+                        help="targeting strategy (default: lattice)")
+    parser.add_argument('--placement', default='legacy',
+                        help="placement strategy of the target fleets "
+                        "(default: legacy)")
+    parser.add_argument('--engine', choices=sorted(ENGINES),
+                        default='board')
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--height', type=int, default=10)
+    parser.add_argument('--output', help="write results as JSON to FILE")
+    parser.add_argument('--debug', action='store_true',
+                        help="check the opponent's running tallies")
+    parser.add_argument('--batch', action='store_true',
+                        help="play 'density' targeting games in batches")
+    args = parser.parse_args(argv)
+    if args.batch:
+        if args.targeting not in {None, 'density'}:
+            parser.error("--batch only plays 'density' targeting.")
+        if args.placement != 'legacy':
+            parser.error("--batch only plays 'legacy' placement.")
+        options = {'batch': True, 'width': args.width,
+                   'height': args.height}
+    else:
+        options = {'engine': args.engine,
+                   'targeting': args.targeting or 'lattice',
+                   'placement': args.placement,
+                   'width': args.width, 'height': args.height}
+    histogram, stalled = run_tournament(
+        args.games, processes=args.processes, seed=args.seed,
+        debug=args.debug, **options)
+    summary = summarize(histogram, stalled)
+    for key, value in summary.items():
+        print("{:>8}: {}".format(key, value))
+    if histogram:
+        tallest = max(histogram.values())
+        for shots in range(min(histogram), max(histogram) + 1):
+            bar = '#' * round(50 * histogram[shots] / tallest)
+            print("{:>8} | {}".format(shots, bar))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'summary': summary,
+                       'histogram': {str(shots): count for shots, count
+                                     in sorted(histogram.items())}},
+                      output_file, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,523 @@
+"""
+Compact binary snapshots of Opponent sessions.
+
+A snapshot is a fixed-size record holding everything needed to carry on
+a game exactly where it was left: the radar hits, the field guesses and
+the spaces tied to sunken ships as bitmaps, where each of the
+opponent's ships sits, which of the player's ships were answered sunk
+and on which turn, the order of every guess, the lattice still left to
+seek from, the hit list, the _guess_seed, the names of its targeting
+and placement strategies and its time budget, and the seed and state
+of the Opponent's generator.  It comes to 3131 bytes on a 10x10 board,
+most of it the state of the generator.
+
+load writes that state straight into a new Opponent without replaying
+a single answer: the bitmaps go onto the boards in one call each, the
+running hit tallies are counted from the hit bitmap and the hit run
+index is rebuilt from it with bitmask shifts.  Loading a snapshot costs
+about as much as building a new Opponent, whatever the turn, where
+replaying the game would cost a few times more.
+
+The size of a record only depends on the board size, so records can be
+kept side by side in slots of a file.  SnapshotStore does that over a
+memory-mapped file, which lets a server move idle sessions out of
+memory and bring them back when they are next used.
+
+Record layout (little-endian)
+-----------------------------
+header
+    magic, version, width, height, engine, _guess_seed, destroy mode,
+    then the number of guesses, hit list entries, lattice spaces and
+    off-lattice spaces
+strategies
+    the targeting and placement strategy names, each padded to
+    NAME_SIZE bytes, then the time budget
+generator
+    the seed, then the Mersenne Twister state words and position and
+    whether a gauss value is waiting, with the value
+radar hits, field guesses, sunk spaces
+    one bit per space, bit = row * width + column
+field ships
+    row, column and orientation of each ship in fleet order
+radar sunk turns
+    the turn each player ship was answered sunk on, or 0xFFFF
+guesses, hit list, lattice then off-lattice
+    one unsigned short space index each, padded to a fixed length
+
+Since the generator is restored along with the boards, a restored game
+makes exactly the draws it would have made, and goes on exactly as it
+would have for every targeting except 'sample', whose time budget makes
+the number of layouts it samples depend on the clock.  Strategies are
+stored by name, so any strategy registered with the strategies module
+can be snapshot, as long as it's registered again before the snapshot
+is restored.  A strategy is built afresh on restore, so one that keeps
+state of its own, beyond its Opponent's, starts that state over.
+
+Functions
+---------
+record_size
+    Return the size in bytes of a snapshot for a board size.
+dump
+    Return a snapshot of an Opponent.
+load
+    Build an Opponent from a snapshot.
+
+Classes
+-------
+SnapshotStore
+    Snapshots kept in fixed-size slots of a memory-mapped file
+"""
+
+import mmap
+import os
+import random
+import struct
+from functools import lru_cache
+
+from bitboard import BitBoard, set_bits
+from board import Board
+from fleet import Fleet
+from opponent import CandidateSet, HitRunIndex, Opponent, Turn
+from seeding import fits_64_bits
+from strategies import placement_strategy, targeting_strategy
+
+MAGIC = b'BSOP'
+VERSION = 4
+ENGINES = (Board, BitBoard)
+NO_TURN = 0xFFFF
+# the longest strategy name, in bytes, a snapshot can hold
+NAME_SIZE = 16
+SHIPS = len(Fleet())
+
+_HEADER = struct.Struct('<4sBHHBBBHHHH')
+_STRATEGIES = struct.Struct('<{0}s{0}sd'.format(NAME_SIZE))
+# seed, then random.Random state: 624 words, the position and gauss_next
+_GENERATOR = struct.Struct('<q625IBd')
+_SHIP = struct.Struct('<HHB')
+_INDEX = struct.Struct('<H')
+
+
+def _layout(width, height):
+    """Return the space, bitmap and hit list sizes for a board size."""
+    if width < 1 or height < 1:
+        raise ValueError("'width' and 'height' must be at least 1.")
+    spaces = width * height
+    if spaces > NO_TURN:
+        raise ValueError("Boards over {} spaces can't be snapshot.".format(
+            NO_TURN))
+    # the hit list holds at most a ship length each way from a hit
+    return spaces, (spaces + 7) // 8, 4 * max(width, height)
+
+
+@lru_cache(maxsize=None)
+def _spaces(width, height):
+    """Return the row and column of every space index of a board size."""
+    return tuple(divmod(index, width) for index in range(width * height))
+
+
+@lru_cache(maxsize=None)
+def record_size(width=10, height=10):
+    """
+    Return the size in bytes of a snapshot for a board size.
+
+    Parameters
+    ----------
+    width : int, optional | default: 10
+        the number of columns on the boards
+    height : int, optional | default: 10
+        the number of rows on the boards
+
+    Returns
+    -------
+    int - the number of bytes in every snapshot of that board size
+    """
+    spaces, bitmap_size, hit_list_size = _layout(width, height)
+    return (_HEADER.size + _STRATEGIES.size + _GENERATOR.size
+            + 3 * bitmap_size
+            + SHIPS * _SHIP.size
+            + SHIPS * _INDEX.size
+            + _INDEX.size * (2 * spaces + hit_list_size))
+
+
+def _pack_indexes(indexes, length):
+    """Pack space indexes as unsigned shorts, padded to length."""
+    indexes = list(indexes)
+    if len(indexes) > length:
+        raise ValueError("Too many spaces to fit in a snapshot.")
+    return struct.pack('<{}H'.format(length),
+                       *indexes, *[0] * (length - len(indexes)))
+
+
+def _pack_bitmap(indexes, size):
+    """Pack space indexes as a bitmap of size bytes."""
+    mask = 0
+    for index in indexes:
+        mask |= 1 << index
+    return mask.to_bytes(size, 'little')
+
+
+def dump(opponent):
+    """
+    Return a snapshot of an Opponent.
+
+    Parameters
+    ----------
+    opponent : Opponent object
+        the opponent to take a snapshot of
+
+    Returns
+    -------
+    bytes - a record of record_size(width, height) bytes
+    """
+    radar_board = opponent.radar_board
+    field_board = opponent.field_board
+    width, height = radar_board.width, radar_board.height
+    spaces, bitmap_size, hit_list_size = _layout(width, height)
+
+    def index(space):
+        return space[0] * width + space[1]
+
+    guesses = [(guess.row, guess.column) for guess in opponent._guess_list]
+    header = _HEADER.pack(
+        MAGIC, VERSION, width, height,
+        ENGINES.index(type(radar_board)), opponent._guess_seed,
+        opponent._destroy_mode, len(guesses), len(opponent._hit_list),
+        len(opponent._lattice), len(opponent._off_lattice))
+    names = []
+    for name in (opponent.targeting, opponent.placement):
+        encoded = name.encode()
+        if len(encoded) > NAME_SIZE:
+            raise ValueError("Strategy names over {} bytes can't be "
+                             "snapshot: '{}'.".format(NAME_SIZE, name))
+        names.append(encoded)
+    strategies = _STRATEGIES.pack(*names, opponent.time_budget)
+    if not fits_64_bits(opponent.seed):
+        raise ValueError("Seeds over 64 bits can't be snapshot.")
+    _, words, gauss_next = opponent.rng.getstate()
+    generator = _GENERATOR.pack(opponent.seed, *words,
+                                gauss_next is not None, gauss_next or 0.0)
+
+    radar_hits = [index(space) for space in guesses
+                  if radar_board.hit_at(*space) == 2]
+    field_guesses = []
+    # a ship's first space in reading order is the one it was placed at
+    anchors = {}
+    for row in range(height):
+        for column in range(width):
+            if field_board.guessed_at(row, column):
+                field_guesses.append(row * width + column)
+            segment = field_board.segment_at(row, column)
+            if segment and segment.ship not in anchors:
+                anchors[segment.ship] = row, column
+    ships = b''
+    for ship in opponent.field_fleet:
+        if ship not in anchors:
+            raise ValueError("{} hasn't been placed.".format(ship))
+        ships += _SHIP.pack(*anchors[ship], ship.orientation == 'v')
+
+    sunk_turns = {guess.sunk: turn
+                  for turn, guess in enumerate(opponent._guess_list)
+                  if guess.sunk}
+    sunk = _pack_indexes((sunk_turns.get(ship, NO_TURN)
+                          for ship in opponent.radar_fleet),
+                         SHIPS)
+
+    return b''.join((
+        header,
+        strategies,
+        generator,
+        _pack_bitmap(radar_hits, bitmap_size),
+        _pack_bitmap(field_guesses, bitmap_size),
+        _pack_bitmap(map(index, opponent._sunk_spaces), bitmap_size),
+        ships,
+        sunk,
+        _pack_indexes(map(index, guesses), spaces),
+        _pack_indexes(map(index, opponent._hit_list), hit_list_size),
+        _pack_indexes(map(index, [*opponent._lattice,
+                                  *opponent._off_lattice]), spaces),
+    ))
+
+
+def load(record):
+    """
+    Build an Opponent from a snapshot.
+
+    Parameters
+    ----------
+    record : bytes-like object
+        a snapshot made by dump
+
+    Returns
+    -------
+    Opponent object - the opponent as it was when the snapshot was taken
+    """
+    record = memoryview(record)
+    (magic, version, width, height, engine, guess_seed, destroy_mode,
+     guess_count, hit_list_count, lattice_count,
+     off_lattice_count) = _HEADER.unpack_from(record)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not a version {} Opponent snapshot.".format(
+            VERSION))
+    spaces, bitmap_size, hit_list_size = _layout(width, height)
+    if len(record) != record_size(width, height):
+        raise ValueError("Snapshot should be {} bytes, not {}.".format(
+            record_size(width, height), len(record)))
+
+    targeting, placement, time_budget = _STRATEGIES.unpack_from(
+        record, _HEADER.size)
+    # an unregistered strategy name raises ValueError here
+    targeting = targeting.rstrip(b'\0').decode()
+    placement = placement.rstrip(b'\0').decode()
+    targeting_class = targeting_strategy(targeting)
+    placement_class = placement_strategy(placement)
+    generator = _GENERATOR.unpack_from(record,
+                                       _HEADER.size + _STRATEGIES.size)
+    seed, has_gauss, gauss_next = generator[0], *generator[-2:]
+    offset = _HEADER.size + _STRATEGIES.size + _GENERATOR.size
+
+    def read_bitmap():
+        nonlocal offset
+        mask = int.from_bytes(record[offset:offset + bitmap_size], 'little')
+        offset += bitmap_size
+        return mask
+
+    def read_indexes(count, length):
+        nonlocal offset
+        indexes = struct.unpack_from('<{}H'.format(count), record, offset)
+        offset += length * _INDEX.size
+        return indexes
+
+    space = _spaces(width, height).__getitem__
+    radar_hits = read_bitmap()
+    field_guesses = read_bitmap()
+    sunk_spaces = read_bitmap()
+    ship_records = []
+    for _ in range(SHIPS):
+        ship_records.append(_SHIP.unpack_from(record, offset))
+        offset += _SHIP.size
+    sunk_turns = read_indexes(SHIPS, SHIPS)
+    guesses = read_indexes(guess_count, spaces)
+    hit_list = read_indexes(hit_list_count, hit_list_size)
+    seek_order = list(map(space, read_indexes(
+        lattice_count + off_lattice_count, spaces)))
+
+    # every attribute Opponent.__init__ sets is written straight from
+    #   the record, so nothing is drawn, shuffled, placed or replayed
+    opponent = Opponent.__new__(Opponent)
+    board_class = ENGINES[engine]
+    opponent.targeting = targeting
+    opponent.placement = placement
+    opponent.time_budget = time_budget
+    opponent.stats = None
+    opponent.seed = seed
+    # setstate replaces the whole state, so the generator isn't seeded
+    opponent.rng = random.Random.__new__(random.Random)
+    opponent.rng.setstate((3, generator[1:-2],
+                           gauss_next if has_gauss else None))
+
+    radar_board = board_class('radar', width=width, height=height)
+    guessed = 0
+    for index in guesses:
+        guessed |= 1 << index
+    radar_board.mark_guessed(guessed, radar_hits)
+    opponent.radar_board = radar_board
+    opponent.radar_fleet = Fleet()
+    guess_list = [Turn(radar_board, row, column)
+                  for row, column in map(space, guesses)]
+    sunk_hits = 0
+    for ship, turn in zip(opponent.radar_fleet, sunk_turns):
+        if turn != NO_TURN:
+            ship.sunk = True
+            guess_list[turn].sunk = ship
+            sunk_hits += len(ship)
+    opponent._guess_list = guess_list
+    opponent._destroy_mode = bool(destroy_mode)
+    opponent._hit_list = list(map(space, hit_list))
+    opponent._sunk_spaces = set(map(space, set_bits(sunk_spaces)))
+    opponent._hit_runs = HitRunIndex.from_mask(radar_hits, width, height)
+    opponent._total_hits = bin(radar_hits).count('1')
+    opponent._sunk_hits = sunk_hits
+    opponent._depth = 0
+    opponent._retries = 0
+    opponent._guess_seed = guess_seed
+    opponent._lattice = CandidateSet(seek_order[:lattice_count])
+    opponent._off_lattice = CandidateSet(seek_order[lattice_count:])
+    # the shortest ship left is only raised while ships are left to find,
+    #   so once they're all sunk it stays at the last one sunk
+    remaining = opponent.radar_fleet.ships_remaining
+    if remaining:
+        opponent._seek_length = min(len(ship) for ship in remaining)
+    else:
+        opponent._seek_length = len(
+            opponent.radar_fleet[sunk_turns.index(max(sunk_turns))])
+
+    field_board = board_class('field', width=width, height=height)
+    opponent.field_board = field_board
+    opponent.field_fleet = Fleet()
+    for ship, (row, column, vertical) in zip(opponent.field_fleet,
+                                             ship_records):
+        if (ship.orientation == 'v') != bool(vertical):
+            ship.rotate()
+        field_board.place(row, column, ship)
+    field_board.mark_guessed(field_guesses)
+    for index in set_bits(field_guesses & field_board.occupied_mask):
+        field_board.segment_at(*space(index)).hit = True
+    opponent._targeter = targeting_class(opponent)
+    opponent._placer = placement_class(opponent)
+    return opponent
+
+
+class SnapshotStore:
+    """
+    Snapshots kept in fixed-size slots of a memory-mapped file.
+
+    Each slot holds a key of up to 32 bytes followed by a snapshot, and
+    an empty key marks a free slot.  The file grows by doubling when it
+    runs out of slots, and the keys are read back when an existing file
+    is opened, so snapshots outlive the process that stored them.
+
+    Attributes
+    ----------
+    path : str
+        the file the snapshots are kept in
+    width : int
+        the number of columns on the boards of every snapshot
+    height : int
+        the number of rows on the boards of every snapshot
+    """
+    KEY_SIZE = 32
+
+    def __init__(self, path, *, width=10, height=10, slots=256):
+        """
+        Open or create a SnapshotStore.
+
+        Parameters
+        ----------
+        path : str
+            the file to keep snapshots in, created if it doesn't exist
+        width : int, optional, keyword-only | default: 10
+            the number of columns on the boards of every snapshot
+        height : int, optional, keyword-only | default: 10
+            the number of rows on the boards of every snapshot
+        slots : int, optional, keyword-only | default: 256
+            the number of slots to start a new file with
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self._record_size = record_size(width, height)
+        self._slot_size = self.KEY_SIZE + self._record_size
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size % self._slot_size:
+            self._file.close()
+            raise ValueError("{} doesn't hold {}x{} snapshots.".format(
+                path, width, height))
+        if not size:
+            self._file.truncate(max(1, slots) * self._slot_size)
+        self._map()
+        self._slots = {}
+        self._free = []
+        for slot in reversed(range(self._slot_count)):
+            key = self._key_at(slot)
+            if key:
+                self._slots[key] = slot
+            else:
+                self._free.append(slot)
+
+    # ------------Helper Methods------------ #
+    def _map(self):
+        """Memory map the whole file."""
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        self._slot_count = len(self._mmap) // self._slot_size
+
+    def _grow(self):
+        """Double the number of slots in the file."""
+        self._mmap.close()
+        self._file.truncate(2 * self._slot_count * self._slot_size)
+        old_count = self._slot_count
+        self._map()
+        self._free.extend(reversed(range(old_count, self._slot_count)))
+
+    def _key_at(self, slot):
+        """Return the key stored in a slot, or '' for a free slot."""
+        start = slot * self._slot_size
+        return bytes(self._mmap[start:start + self.KEY_SIZE]).rstrip(
+            b'\0').decode()
+
+    # ------------Interface Methods------------ #
+    def put(self, key, opponent):
+        """
+        Store a snapshot of an Opponent under a key.
+
+        Parameters
+        ----------
+        key : str
+            a name for the snapshot of up to 32 bytes, eg. a session ID
+        opponent : Opponent object
+            the opponent to store, on a board of the store's size
+        """
+        encoded = key.encode()
+        if not 0 < len(encoded) <= self.KEY_SIZE:
+            raise ValueError("Keys must be 1 to {} bytes long.".format(
+                self.KEY_SIZE))
+        if (opponent.radar_board.width != self.width
+                or opponent.radar_board.height != self.height):
+            raise ValueError("This store only holds {}x{} games.".format(
+                self.width, self.height))
+        record = dump(opponent)
+        slot = self._slots.get(key)
+        if slot is None:
+            if not self._free:
+                self._grow()
+            slot = self._free.pop()
+        start = slot * self._slot_size
+        self._mmap[start:start + self._slot_size] = (
+            encoded.ljust(self.KEY_SIZE, b'\0') + record)
+        self._slots[key] = slot
+
+    def get(self, key):
+        """Return the Opponent stored under a key."""
+        start = self._slots[key] * self._slot_size + self.KEY_SIZE
+        return load(self._mmap[start:start + self._record_size])
+
+    def discard(self, key):
+        """Free the slot of a key, if it's in the store."""
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            start = slot * self._slot_size
+            self._mmap[start:start + self.KEY_SIZE] = bytes(self.KEY_SIZE)
+            self._free.append(slot)
+
+    def pop(self, key):
+        """Return the Opponent stored under a key and free its slot."""
+        opponent = self.get(key)
+        self.discard(key)
+        return opponent
+
+    def flush(self):
+        """Write any changes through to the file."""
+        self._mmap.flush()
+
+    def close(self):
+        """Flush and close the file."""
+        self._mmap.flush()
+        self._mmap.close()
+        self._file.close()
+
+    # ------------Additional Dunder Methods------------ #
+    def __contains__(self, key):
+        """Return whether a snapshot is stored under a key."""
+        return key in self._slots
+
+    def __len__(self):
+        """Return the number of snapshots stored."""
+        return len(self._slots)
+
+    def __enter__(self):
+        """Return the store for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Close the store at the end of a with statement."""
+        self.close()
@@ -28,6 +28,9 @@ class Space:
     guessed : boolean
         whether a guess has been made on the space
     """
+    # Every game builds 200 spaces, so __slots__ keeps them small.
+    __slots__ = ('location', 'board', '_guessed')
+
     def __init__(self, location, board):
         """
         Construct attributes for Space object
@@ -59,6 +62,19 @@ class Space:
                 + "' since a guess has already been made on the space.")
         self._guessed = True
 
+    # ------------Interface Methods------------ #
+    def restore_guess(self, hit=False):
+        """
+        Mark space as guessed without checking, to restore a saved game.
+
+        Parameters
+        ----------
+            hit : boolean, optional | default: False
+                indicates whether the guess was a hit, only kept by
+                RadarSpace
+        """
+        self._guessed = True
+
     # ------------Additional Dunder Methods------------ #
     def __str__(self):
         """Return string of space object with location and board."""
@@ -81,6 +97,8 @@ class FieldSpace(Space):
     segment : None or Segment object
         the Segment object assigned to the space (or None if not assigned)
     """
+    __slots__ = ('_segment',)
+
     def __init__(self, location, board):
         """
         Construct attributes for FieldSpace object
@@ -140,6 +158,8 @@ class RadarSpace(Space):
         1: miss
         2: hit
     """
+    __slots__ = ('_hit',)
+
     def __init__(self, location, board):
         """
         Construct attributes for RadarSpace object
@@ -181,3 +201,8 @@ class RadarSpace(Space):
         else:
             self._hit = 1
         return self.hit
+
+    def restore_guess(self, hit=False):
+        """Mark space as guessed and hit without checking, to restore."""
+        self._guessed = True
+        self._hit = 2 if hit else 1
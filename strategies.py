@@ -0,0 +1,280 @@
+"""
+Targeting and placement strategies for the computer opponent.
+
+An Opponent is built with the name of a targeting strategy, which picks
+its guesses, and the name of a placement strategy, which places its
+ships.  Strategies are registered by name with the dotted path of the
+class that implements them, like 'density:DensityTargeting', and the
+module is only imported the first time the strategy is used.  The
+plain command line game never imports NumPy or any other engine it
+doesn't play with.
+
+A targeting strategy is built with its Opponent and returns each guess
+from guess.  Its Opponent keeps the boards, fleets, guess list and seek
+candidates up to date as answers come in, and calls take_guess_answer
+and take_sunk_answer on the strategy afterwards in case it keeps state
+of its own.  A placement strategy places one ship at a time on its
+Opponent's field board, checking spots with Opponent.fits and placing
+ships with Opponent.place_ship or the board's place.  Strategies draw
+from their Opponent's rng, so a seeded Opponent plays the same game
+every time.
+
+'legacy' targeting is the lattice search with its hit list, and
+'legacy' placement is the random placement Opponents have always used.
+'lattice' is kept as another name for 'legacy' targeting.
+
+Functions
+---------
+register_targeting
+    Register a targeting strategy under a name.
+register_placement
+    Register a placement strategy under a name.
+targeting_names
+    Return the names of every registered targeting strategy.
+placement_names
+    Return the names of every registered placement strategy.
+targeting_strategy
+    Return the targeting strategy class registered under a name.
+placement_strategy
+    Return the placement strategy class registered under a name.
+
+Classes
+-------
+TargetingStrategy
+    The interface every targeting strategy follows
+PlacementStrategy
+    The interface every placement strategy follows
+LegacyTargeting
+    Seeks on a lattice and destroys around hits from a hit list
+LegacyPlacement
+    Places every ship at a random spot, each free spot equally likely
+SpacedPlacement
+    Places ships at random, keeping them from touching when it can
+"""
+
+import importlib
+
+_TARGETING = {
+    'legacy': 'strategies:LegacyTargeting',
+    'lattice': 'strategies:LegacyTargeting',
+    'density': 'density:DensityTargeting',
+    'sample': 'sampler:SampleTargeting',
+    'solver': 'attribution:SolverTargeting',
+}
+_PLACEMENT = {
+    'legacy': 'strategies:LegacyPlacement',
+    'spaced': 'strategies:SpacedPlacement',
+}
+# classes already imported, by registry and name
+_LOADED = {}
+
+
+class TargetingStrategy:
+    """
+    The interface every targeting strategy follows.
+
+    Attributes
+    ----------
+    opponent : Opponent object
+        the opponent the strategy guesses for
+    """
+    def __init__(self, opponent):
+        """
+        Build a strategy for an Opponent.
+
+        Parameters
+        ----------
+        opponent : Opponent object
+            the opponent to guess for, with its boards set up
+        """
+        self.opponent = opponent
+
+    def guess(self):
+        """
+        Return the next guess.
+
+        Returns
+        -------
+        two-tuple of int - row and column guess coordinates
+        """
+        raise NotImplementedError
+
+    def destroying(self):
+        """Return whether the last guess was made to finish off a ship."""
+        return self.opponent.spare_hits > 0
+
+    def take_guess_answer(self, row, column, hit):
+        """Take note of the answer to a guess, after the Opponent has."""
+
+    def take_sunk_answer(self, ship):
+        """Take note of a ship sunk on the last guess, or None."""
+
+
+class PlacementStrategy:
+    """
+    The interface every placement strategy follows.
+
+    Attributes
+    ----------
+    opponent : Opponent object
+        the opponent whose ships are placed
+    """
+    def __init__(self, opponent):
+        """
+        Build a strategy for an Opponent.
+
+        Parameters
+        ----------
+        opponent : Opponent object
+            the opponent to place ships for
+        """
+        self.opponent = opponent
+
+    def place(self, ship):
+        """Place a single ship on the opponent's field board."""
+        raise NotImplementedError
+
+
+class LegacyTargeting(TargetingStrategy):
+    """Seeks on a lattice and destroys around hits from a hit list."""
+    def guess(self):
+        """Return the next guess from the Opponent's lattice search."""
+        return self.opponent._legacy_guess()
+
+    def destroying(self):
+        """Return whether the Opponent is in destroy mode."""
+        return self.opponent._destroy_mode
+
+
+class LegacyPlacement(PlacementStrategy):
+    """Places every ship at a random spot, each free spot equally likely."""
+    def place(self, ship):
+        """Place a single ship, drawn from the board's free placements."""
+        self.opponent.place_ship(ship)
+
+
+class SpacedPlacement(PlacementStrategy):
+    """
+    Places ships at random, keeping them from touching when it can.
+
+    Ships lying side by side are easier to find, since hunting one
+    turns up the other.  Random spots are drawn one at a time, and a
+    spot that doesn't fit or lies next to a ship already placed is
+    rejected, up to ATTEMPTS times, after which the ship is placed like
+    'legacy' placement does.  Every rejected spot is reported to the
+    Opponent's stats.
+    """
+    ATTEMPTS = 200
+
+    def place(self, ship):
+        """Place a single ship on the board, away from the others."""
+        opponent = self.opponent
+        board = opponent.field_board
+        rng = opponent.rng
+        rejections = 0
+        for _ in range(self.ATTEMPTS):
+            row = rng.randint(0, board.height - 1)
+            column = rng.randint(0, board.width - 1)
+            if rng.randint(0, 1):
+                ship.rotate()
+            if (opponent.fits(row, column, ship)
+                    and not self._touches(row, column, ship)):
+                board.place(row, column, ship)
+                if opponent.stats is not None:
+                    opponent.stats.record_placement(rejections)
+                return
+            rejections += 1
+        opponent.place_ship(ship, rejections)
+
+    def _touches(self, row, column, ship):
+        """Return whether a ship at a spot would touch another ship."""
+        board = self.opponent.field_board
+        if ship.orientation == 'h':
+            rows = range(row - 1, row + 2)
+            columns = range(column - 1, column + len(ship) + 1)
+        else:
+            rows = range(row - 1, row + len(ship) + 1)
+            columns = range(column - 1, column + 2)
+        return any(board.segment_at(near_row, near_column)
+                   for near_row in rows if 0 <= near_row < board.height
+                   for near_column in columns
+                   if 0 <= near_column < board.width)
+
+
+# ------------Registry------------ #
+def _register(registry, name, strategy):
+    """Register a class, or the dotted path of one, under a name."""
+    if not isinstance(name, str) or not name:
+        raise TypeError("'name' must be a non-empty str.")
+    if not isinstance(strategy, (str, type)):
+        raise TypeError("'strategy' must be a class or a 'module:Class' "
+                        "str.")
+    registry[name] = strategy
+    _LOADED.pop((id(registry), name), None)
+
+
+def _load(registry, name, kind):
+    """Return the class registered under a name, importing it if needed."""
+    key = (id(registry), name)
+    if key not in _LOADED:
+        if name not in registry:
+            raise ValueError("No {} strategy is named '{}'.".format(kind,
+                                                                    name))
+        strategy = registry[name]
+        if isinstance(strategy, str):
+            module, _, attribute = strategy.partition(':')
+            strategy = getattr(importlib.import_module(module), attribute)
+        _LOADED[key] = strategy
+    return _LOADED[key]
+
+
+def register_targeting(name, strategy):
+    """
+    Register a targeting strategy under a name.
+
+    Parameters
+    ----------
+    name : str
+        the name Opponents are built with, replacing any strategy
+        already registered under it
+    strategy : class or str
+        a TargetingStrategy subclass, or its 'module:Class' path to be
+        imported when it's first used
+    """
+    _register(_TARGETING, name, strategy)
+
+
+def register_placement(name, strategy):
+    """
+    Register a placement strategy under a name.
+
+    Parameters
+    ----------
+    name : str
+        the name Opponents are built with, replacing any strategy
+        already registered under it
+    strategy : class or str
+        a PlacementStrategy subclass, or its 'module:Class' path to be
+        imported when it's first used
+    """
+    _register(_PLACEMENT, name, strategy)
+
+
+def targeting_names():
+    """Return the names of every registered targeting strategy."""
+    return sorted(_TARGETING)
+
+
+def placement_names():
+    """Return the names of every registered placement strategy."""
+    return sorted(_PLACEMENT)
+
+
+def targeting_strategy(name):
+    """Return the targeting strategy class registered under a name."""
+    return _load(_TARGETING, name, 'targeting')
+
+
+def placement_strategy(name):
+    """Return the placement strategy class registered under a name."""
+    return _load(_PLACEMENT, name, 'placement')
@@ -0,0 +1,49 @@
+"""Tests for the running hit and sunk counts of ships and fleets."""
+
+import pytest
+
+from fleet import Fleet
+
+
+def test_hits_sink_a_ship_on_the_last_segment():
+    fleet = Fleet()
+    ship = fleet[0]
+    for segment in ship.segments[:-1]:
+        segment.hit = True
+        assert not ship.sunk
+    assert ship in fleet.ships_remaining
+    ship.segments[-1].hit = True
+    assert ship.sunk
+    assert ship not in fleet.ships_remaining
+    assert fleet.ships_sunk == [ship]
+
+
+def test_undoing_a_hit_refloats_a_ship_in_fleet_order():
+    fleet = Fleet()
+    ship = fleet[1]
+    ship.sunk = True
+    ship.segments[0].hit = False
+    assert not ship.sunk
+    assert fleet.ships_sunk == []
+    assert fleet.ships_remaining == list(fleet)
+
+
+def test_ships_sunk_in_the_order_they_sank():
+    fleet = Fleet()
+    for ship in (fleet[3], fleet[0], fleet[4]):
+        ship.sunk = True
+    assert fleet.ships_sunk == [fleet[3], fleet[0], fleet[4]]
+    assert fleet.ships_remaining == [fleet[1], fleet[2]]
+    assert not fleet.defeated
+    for ship in fleet.ships_remaining:
+        ship.sunk = True
+    assert fleet.defeated
+
+
+def test_hitting_a_segment_twice_is_refused():
+    segment = Fleet()[0].segments[0]
+    segment.hit = True
+    with pytest.raises(TypeError):
+        segment.hit = True
+    with pytest.raises(ValueError):
+        Fleet()[0].sunk = False
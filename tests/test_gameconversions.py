@@ -0,0 +1,49 @@
+"""Round-trip tests for LocationTable and the bulk conversions."""
+
+import pytest
+
+from gameconversions import (format_locations, location_table,
+                             parse_locations)
+
+
+@pytest.mark.parametrize('width, height', [(10, 10), (1, 1), (7, 30),
+                                           (100, 100)])
+def test_every_space_round_trips(width, height):
+    table = location_table(width, height)
+    spaces = [(row, column) for row in range(height)
+              for column in range(width)]
+    labels = [table.format(row, column) for row, column in spaces]
+    assert len(set(labels)) == len(labels)
+    assert [table.parse(label) for label in labels] == spaces
+    assert [table.get(label.lower()) for label in labels] == spaces
+    assert parse_locations(format_locations(spaces, width=width,
+                                            height=height),
+                           width=width, height=height) == spaces
+
+
+def test_labels_past_z():
+    table = location_table(10, 30)
+    assert table.format(0, 0) == 'A1'
+    assert table.format(9, 9) == 'J10'
+    assert table.format(26, 0) == 'AA1'
+    assert table.parse(' aa1 ') == (26, 0)
+
+
+def test_loose_locations_only_parse():
+    table = location_table()
+    assert table.get(' j10') is None
+    assert table.get('K1', 'missing') == 'missing'
+    assert parse_locations('a1, J10; c3') == [(0, 0), (9, 9), (2, 2)]
+    assert parse_locations([' b2 ']) == [(1, 1)]
+
+
+def test_bad_locations_are_refused():
+    table = location_table()
+    with pytest.raises(ValueError):
+        table.parse('K1')
+    with pytest.raises(ValueError):
+        table.parse('A11')
+    with pytest.raises(TypeError):
+        table.parse(None)
+    with pytest.raises(ValueError):
+        table.format(10, 0)
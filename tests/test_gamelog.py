@@ -0,0 +1,75 @@
+"""Round-trip tests for the gamelog module."""
+
+import io
+
+from gamelog import GameLog, Shot, games, read_entries, replay
+from opponent import Opponent
+from simulator import answer_guess
+
+
+def state(opponent):
+    """Return everything a replay should rebuild about an Opponent."""
+    width = opponent.radar_board.width
+    height = opponent.radar_board.height
+    spaces = [(row, column) for row in range(height)
+              for column in range(width)]
+    return ([opponent.radar_board.hit_at(*space) for space in spaces],
+            [opponent.field_board.guessed_at(*space) for space in spaces],
+            list(opponent._lattice), list(opponent._off_lattice),
+            opponent.total_hits, opponent.spare_hits,
+            [ship.sunk for ship in opponent.radar_fleet],
+            [ship.sunk for ship in opponent.field_fleet])
+
+
+def log_game(path, opponent, target, turns):
+    """Log a game of turns computer guesses, returning the live states."""
+    states = {0: state(opponent)}
+    with GameLog(path) as log:
+        game = log.start(opponent)
+        for turn in range(turns):
+            row, column = opponent.make_guess()
+            won = answer_guess(opponent, target.field_board,
+                               target.field_fleet, row, column)
+            log.shot(game, 'computer', row, column,
+                     opponent.last_guess.hit)
+            if opponent.last_guess.sunk:
+                log.sunk(game, 'computer', list(opponent.radar_fleet).index(
+                    opponent.last_guess.sunk))
+            # the player shoots along the rows
+            row, column = divmod(turn, opponent.field_board.width)
+            segment = opponent.field_board.take_guess(row, column)
+            if segment:
+                segment.hit = True
+            log.shot(game, 'player', row, column, bool(segment))
+            states[2 * turn + 2] = state(opponent)
+            if won:
+                log.end(game, 'computer')
+                break
+        else:
+            log.end(game, None)
+    return states
+
+
+def test_log_then_replay(tmp_path):
+    path = str(tmp_path / 'games.log')
+    opponent = Opponent(seed=11)
+    target = Opponent(seed=12)
+    states = log_game(path, opponent, target, 30)
+    with open(path, 'rb') as log_file:
+        game, = games(read_entries(log_file))
+    assert game.start.seed == 11
+    assert sum(isinstance(entry, Shot) for entry in game.turns) == 60
+    for turn, live in states.items():
+        replayed = replay(game, turn)
+        assert state(replayed) == live
+        assert replayed.seed == opponent.seed
+
+
+def test_truncated_log_ends_quietly(tmp_path):
+    path = str(tmp_path / 'games.log')
+    log_game(path, Opponent(seed=3), Opponent(seed=4), 5)
+    with open(path, 'rb') as log_file:
+        data = log_file.read()
+    entries = list(read_entries(io.BytesIO(data[:-1])))
+    assert entries == list(read_entries(io.BytesIO(data)))[:-1]
+    assert list(games(iter(entries))) == []
@@ -0,0 +1,68 @@
+"""Round-trip tests for the layouts module."""
+
+import random
+
+import pytest
+
+from layouts import LayoutFile, fleet_lengths, random_layout, write_layouts
+
+
+def test_write_then_read(tmp_path):
+    path = tmp_path / 'layouts.bin'
+    seed = write_layouts(str(path), 25, seed=4, processes=1, chunk_size=10)
+    assert seed == 4
+    with LayoutFile(str(path)) as layouts:
+        assert len(layouts) == 25
+        assert layouts.seed == 4
+        assert layouts.lengths == fleet_lengths()
+        assert list(layouts) == [layouts[index] for index in range(25)]
+        assert layouts[-1] == layouts[24]
+        for index in range(25):
+            # ships never overlap, so every segment sets its own bit
+            assert (bin(layouts.mask(index)).count('1')
+                    == sum(layouts.lengths))
+        with pytest.raises(IndexError):
+            layouts[25]
+
+
+def test_same_seed_same_file(tmp_path):
+    first = tmp_path / 'first.bin'
+    second = tmp_path / 'second.bin'
+    write_layouts(str(first), 30, seed=8, processes=1, chunk_size=7)
+    write_layouts(str(second), 30, seed=8, processes=2, chunk_size=7)
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_truncated_layout_left_out(tmp_path):
+    path = tmp_path / 'layouts.bin'
+    write_layouts(str(path), 3, seed=1, processes=1)
+    path.write_bytes(path.read_bytes()[:-1])
+    with LayoutFile(str(path)) as layouts:
+        assert len(layouts) == 2
+
+
+def test_close_after_partial_iteration(tmp_path):
+    path = tmp_path / 'layouts.bin'
+    write_layouts(str(path), 5, seed=2, processes=1)
+    layouts = LayoutFile(str(path))
+    iterator = iter(layouts)
+    next(iterator)
+    layouts.close()
+
+
+def test_close_with_live_array(tmp_path):
+    numpy = pytest.importorskip('numpy')
+    path = tmp_path / 'layouts.bin'
+    write_layouts(str(path), 5, seed=3, processes=1)
+    with LayoutFile(str(path)) as layouts:
+        array = layouts.as_array()
+        first = layouts[0]
+    assert array.shape == (5, len(fleet_lengths()))
+    assert numpy.array_equal(
+        array[0], [(row * 10 + column) << 1 | (orientation == 'v')
+                   for row, column, orientation in first])
+
+
+def test_random_layout_fits_board():
+    layout = random_layout(random.Random(5), width=6, height=6)
+    assert len(layout) == len(fleet_lengths())
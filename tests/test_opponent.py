@@ -0,0 +1,74 @@
+"""Tests for the HitRunIndex and CandidateSet helpers of Opponent."""
+
+import random
+
+import pytest
+
+from bitboard import longest_run
+from opponent import CandidateSet, HitRunIndex
+
+
+def test_hits_join_runs_from_both_sides():
+    index = HitRunIndex()
+    for column in (0, 1, 3, 4):
+        index.add_hit(2, column)
+    assert index.longest == 2
+    index.add_hit(2, 2)
+    assert index.longest == 5
+    # a crossing column run doesn't add to the row's
+    index.add_hit(3, 2)
+    assert index.longest == 5
+
+
+def test_runs_stop_at_gaps_in_columns():
+    index = HitRunIndex()
+    for row in (0, 1, 2, 5, 6):
+        index.add_hit(row, 4)
+    assert index.longest == 3
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_from_mask_matches_adding_hits(seed):
+    rng = random.Random(seed)
+    width, height = rng.randint(1, 12), rng.randint(1, 12)
+    spaces = [(row, column) for row in range(height)
+              for column in range(width)]
+    hits = rng.sample(spaces, rng.randint(0, len(spaces) // 2))
+    added = HitRunIndex()
+    mask = 0
+    for row, column in hits:
+        added.add_hit(row, column)
+        mask |= 1 << (row * width + column)
+    rebuilt = HitRunIndex.from_mask(mask, width, height)
+    assert rebuilt.longest == added.longest == longest_run(mask, width,
+                                                           height)
+    # both go on the same way once more hits come in
+    for row, column in rng.sample(spaces, len(spaces) // 4):
+        if (row, column) not in hits:
+            added.add_hit(row, column)
+            rebuilt.add_hit(row, column)
+            assert rebuilt.longest == added.longest
+
+
+def test_candidates_are_drawn_from_the_end():
+    candidates = CandidateSet([(0, 0), (0, 1), (1, 0)])
+    assert candidates.next == (1, 0)
+    candidates.discard((1, 0))
+    assert candidates.next == (0, 1)
+    assert len(candidates) == 2
+
+
+def test_discarding_keeps_every_other_candidate():
+    spaces = [(row, column) for row in range(5) for column in range(5)]
+    candidates = CandidateSet(spaces)
+    for space in spaces[::3]:
+        candidates.discard(space)
+        assert space not in candidates
+    candidates.discard((9, 9))
+    left = [space for index, space in enumerate(spaces) if index % 3]
+    assert sorted(candidates) == left
+    assert len(candidates) == len(left)
+    assert all(space in candidates for space in left)
+    while candidates:
+        candidates.discard(candidates.next)
+    assert candidates.next is None
@@ -0,0 +1,60 @@
+"""Tests for the bitmask placements of PlacementIndex."""
+
+import random
+from collections import Counter
+
+import pytest
+
+from placementindex import placement_index
+
+
+def test_masks_and_fits_follow_the_board_edges():
+    index = placement_index(10, 10)
+    assert index.mask(0, 0, 3, 'h') == 0b111
+    assert index.mask(0, 0, 2, 'v') == 1 | 1 << 10
+    assert index.mask(0, 8, 3, 'h') is None
+    assert index.mask(8, 0, 3, 'v') is None
+    assert index.mask(-1, 0, 2, 'h') is None
+    assert index.fits(0, 0, 7, 3, 'h')
+    assert not index.fits(0, 0, 8, 3, 'h')
+    occupied = index.mask(4, 4, 5, 'v')
+    assert not index.fits(occupied, 6, 2, 3, 'h')
+    assert index.fits(occupied, 6, 5, 3, 'h')
+
+
+def test_every_placement_is_counted():
+    index = placement_index(6, 4)
+    # rows * spans along them plus columns * spans down them
+    assert len(index.entries(3)) == 4 * 4 + 6 * 2
+    assert len(index.free(index.mask(0, 0, 6, 'h'), 3)) == 3 * 4 + 6 * 1
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_choose_only_returns_free_placements(seed):
+    rng = random.Random(seed)
+    index = placement_index(10, 10)
+    occupied = 0
+    for length in (5, 4, 3, 3, 2) * 3:
+        row, column, orientation, rejections = index.choose(occupied,
+                                                            length, rng)
+        assert index.fits(occupied, row, column, length, orientation)
+        assert 0 <= rejections <= index.ATTEMPTS
+        occupied |= index.mask(row, column, length, orientation)
+
+
+def test_choose_is_uniform_over_free_placements():
+    rng = random.Random(1)
+    index = placement_index(4, 4)
+    # a full board but for one row leaves three placements of length 2
+    occupied = ((1 << 16) - 1) ^ 0b1111 << 4
+    draws = Counter(index.choose(occupied, 2, rng)[:3] for _ in range(4000))
+    assert set(draws) == {(1, column, 'h') for column in range(3)}
+    assert min(draws.values()) > 1200
+
+
+def test_choose_with_no_room_raises():
+    index = placement_index(4, 4)
+    with pytest.raises(RuntimeError):
+        index.choose((1 << 16) - 1, 2, random.Random(0))
+    with pytest.raises(RuntimeError):
+        index.choose(0, 5, random.Random(0))
@@ -0,0 +1,107 @@
+"""Round-trip tests for the snapshot module."""
+
+import time
+
+import pytest
+
+from bitboard import BitBoard
+from board import Board
+from opponent import Opponent
+from simulator import answer_guess
+from snapshot import SnapshotStore, record_size
+from strategies import LegacyTargeting, register_targeting
+
+
+def play(opponent, target, turns):
+    """Play up to turns guesses, returning whether the game was won."""
+    for _ in range(turns):
+        row, column = opponent.make_guess()
+        if answer_guess(opponent, target.field_board, target.field_fleet,
+                        row, column):
+            return True
+    return False
+
+
+@pytest.mark.parametrize('board_class', [Board, BitBoard])
+@pytest.mark.parametrize('targeting', ['lattice', 'density'])
+@pytest.mark.parametrize('turns', [0, 1, 17, 40])
+def test_dump_then_restore(board_class, targeting, turns):
+    opponent = Opponent(board_class=board_class, targeting=targeting,
+                        seed=turns)
+    target = Opponent(board_class=board_class, seed=turns + 100)
+    won = play(opponent, target, turns)
+    record = opponent.snapshot()
+    assert len(record) == record_size()
+    restored = Opponent.restore(record)
+    assert restored.snapshot() == record
+    assert restored.seed == opponent.seed
+    assert restored.total_hits == opponent.total_hits
+    assert restored.spare_hits == opponent.spare_hits
+    assert ([ship.sunk for ship in restored.radar_fleet]
+            == [ship.sunk for ship in opponent.radar_fleet])
+    if not won:
+        # the restored generator makes the same guesses from here on
+        for _ in range(10):
+            guess = opponent.make_guess()
+            assert restored.make_guess() == guess
+            won = answer_guess(opponent, target.field_board,
+                               target.field_fleet, *guess)
+            restored.take_guess_answer(*guess, opponent.last_guess.hit)
+            sunk = opponent.last_guess.sunk
+            if sunk:
+                ship = restored.radar_fleet[
+                    list(opponent.radar_fleet).index(sunk)]
+                ship.sunk = True
+                restored.take_sunk_answer(ship)
+            if won:
+                break
+
+
+def test_registered_strategy_round_trips():
+    register_targeting('snapshot-test', LegacyTargeting)
+    opponent = Opponent(targeting='snapshot-test', placement='spaced',
+                        time_budget=0.02, seed=5)
+    restored = Opponent.restore(opponent.snapshot())
+    assert restored.targeting == 'snapshot-test'
+    assert restored.placement == 'spaced'
+    assert restored.time_budget == 0.02
+
+
+def test_store_round_trip(tmp_path):
+    path = str(tmp_path / 'sessions.bin')
+    opponents = [Opponent(seed=seed) for seed in range(5)]
+    with SnapshotStore(path, slots=2) as store:
+        for index, opponent in enumerate(opponents):
+            store.put('s{}'.format(index), opponent)
+        store.discard('s1')
+    with SnapshotStore(path) as store:
+        assert len(store) == 4
+        assert 's1' not in store
+        assert store.get('s3').snapshot() == opponents[3].snapshot()
+
+
+def best_time(function, repeat=50):
+    """Return the quickest of repeat calls to function, in seconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def test_load_is_not_a_replay():
+    opponent = Opponent(board_class=BitBoard, seed=8)
+    target = Opponent(board_class=BitBoard, seed=9)
+    play(opponent, target, 40)
+    record = opponent.snapshot()
+
+    def replay():
+        # rebuilding the game by answering every guess again
+        replayed = Opponent(board_class=BitBoard, seed=8)
+        play(replayed, Opponent(board_class=BitBoard, seed=9), 40)
+
+    load = best_time(lambda: Opponent.restore(record))
+    assert load < best_time(replay) / 2
+    # and no more than a little over building a new Opponent
+    assert load < 2 * best_time(lambda: Opponent(board_class=BitBoard))
@@ -0,0 +1,63 @@
+"""Tests for the targeting and placement strategy registry."""
+
+import pytest
+
+from opponent import Opponent
+from strategies import (LegacyPlacement, LegacyTargeting, PlacementStrategy,
+                        SpacedPlacement, placement_names, placement_strategy,
+                        register_placement, register_targeting,
+                        targeting_names, targeting_strategy)
+
+
+class CornerPlacement(PlacementStrategy):
+    """Places each ship down the first column that it fits in."""
+    def place(self, ship):
+        opponent = self.opponent
+        if ship.orientation == 'h':
+            ship.rotate()
+        for column in range(opponent.field_board.width):
+            if opponent.fits(0, column, ship):
+                opponent.field_board.place(0, column, ship)
+                return
+        opponent.place_ship(ship)
+
+
+def test_built_in_strategies():
+    assert {'legacy', 'lattice', 'density', 'sample',
+            'solver'} <= set(targeting_names())
+    assert {'legacy', 'spaced'} <= set(placement_names())
+    assert targeting_strategy('lattice') is LegacyTargeting
+    assert targeting_strategy('legacy') is LegacyTargeting
+    assert placement_strategy('legacy') is LegacyPlacement
+    assert placement_strategy('spaced') is SpacedPlacement
+    # registered by path, so only imported here
+    assert targeting_strategy('density').__name__ == 'DensityTargeting'
+
+
+def test_registered_placement_places_the_fleet():
+    register_placement('registry-test-corner', CornerPlacement)
+    opponent = Opponent(placement='registry-test-corner', seed=1)
+    assert 'registry-test-corner' in placement_names()
+    for column, ship in enumerate(opponent.field_fleet):
+        assert ship.orientation == 'v'
+        assert opponent.field_board.segment_at(0, column).ship is ship
+
+
+def test_registering_again_replaces_the_strategy():
+    register_targeting('registry-test', LegacyTargeting)
+    assert targeting_strategy('registry-test') is LegacyTargeting
+    register_targeting('registry-test', 'density:DensityTargeting')
+    assert targeting_strategy('registry-test').__name__ == (
+        'DensityTargeting')
+    assert Opponent(targeting='registry-test').targeting == 'registry-test'
+
+
+def test_bad_registrations_and_names_are_refused():
+    with pytest.raises(ValueError):
+        targeting_strategy('registry-test-missing')
+    with pytest.raises(ValueError):
+        Opponent(placement='registry-test-missing')
+    with pytest.raises(TypeError):
+        register_targeting('', LegacyTargeting)
+    with pytest.raises(TypeError):
+        register_placement('registry-test-bad', LegacyPlacement())
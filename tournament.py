@@ -0,0 +1,341 @@
+"""
+A round-robin tournament between targeting strategies.
+
+Every strategy plays the same seeded games: game n of every strategy is
+played by simulator.play_game with seed + n, so every strategy shoots at
+the same fleet layout.  Two strategies are paired up game by game, and
+whichever took fewer shots to win a game wins that game of the pairing.
+Since both sides faced the same layout, the luck of the layout cancels
+out and far fewer games are needed to tell strategies apart.
+
+Games are played in rounds across a process pool.  After every round,
+each pairing still undecided takes a sequential probability ratio test
+on its wins and losses (ties are left out): the chance the first
+strategy wins a game is tested at 0.5 - delta against 0.5 + delta, and
+the pairing is decided as soon as either is accepted.  A strategy stops
+playing once all its pairings are decided, so a lopsided matchup only
+takes a round or two, and every pairing is called undecided once the
+games run out.
+
+Strategies are ranked by pairings won, then by mean shots-to-win, shown
+with a 95% confidence interval.  Each strategy's mean only covers the
+games it played, which can differ between strategies when some stop
+early.
+
+Usage: python -m tournament [--strategies NAME [NAME ...]] [--games N]
+                            [--round N] [--processes N] [--seed N]
+                            [--delta P] [--alpha P] [--engine ENGINE]
+                            [--output FILE]
+
+Functions
+---------
+play_round_robin
+    Play every pair of strategies against the same seeded games.
+ranking
+    Return the strategies in ranked order with their statistics.
+
+Classes
+-------
+Pairing
+    A sequential test between two strategies
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+from itertools import combinations
+from multiprocessing import Pool
+
+from simulator import play_game
+from strategies import targeting_names, targeting_strategy
+
+STRATEGIES = ('legacy', 'density', 'sample', 'solver')
+DELTA = 0.1
+ALPHA = 0.05
+ROUND_SIZE = 100
+# z score of a 95% confidence interval
+Z_95 = 1.96
+
+
+class Pairing:
+    """
+    A sequential test between two strategies.
+
+    Attributes
+    ----------
+    first : str
+        the name of the first strategy
+    second : str
+        the name of the second strategy
+    wins : int
+        games the first strategy won in fewer shots
+    losses : int
+        games the second strategy won in fewer shots
+    ties : int
+        games both won in the same number of shots, or both stalled
+    winner : str or None
+        the name of the better strategy once decided, None before then
+        or if the games ran out first
+    decided : boolean
+        indicates whether the test has finished
+    """
+    def __init__(self, first, second, delta=DELTA, alpha=ALPHA):
+        """
+        Build an undecided Pairing.
+
+        Parameters
+        ----------
+        first : str
+            the name of the first strategy
+        second : str
+            the name of the second strategy
+        delta : float, optional | default: DELTA
+            how far from even the chance of winning a game is tested
+        alpha : float, optional | default: ALPHA
+            the chance of calling the wrong strategy the winner
+        """
+        if not 0 < delta < 0.5:
+            raise ValueError("'delta' must be between 0 and 0.5.")
+        if not 0 < alpha < 0.5:
+            raise ValueError("'alpha' must be between 0 and 0.5.")
+        self.first = first
+        self.second = second
+        self.wins = 0
+        self.losses = 0
+        self.ties = 0
+        self.winner = None
+        self.decided = False
+        # log likelihood ratio of each win, and the bound to cross
+        self._step = math.log((0.5 + delta) / (0.5 - delta))
+        self._bound = math.log((1 - alpha) / alpha)
+
+    @property
+    def games(self):
+        """Return the number of games compared so far."""
+        return self.wins + self.losses + self.ties
+
+    @property
+    def log_likelihood_ratio(self):
+        """Return the evidence that the first strategy is the better."""
+        return (self.wins - self.losses) * self._step
+
+    def add_game(self, first_shots, second_shots):
+        """
+        Compare one game, unless the pairing is already decided.
+
+        Parameters
+        ----------
+        first_shots : int or None
+            shots the first strategy took to win, None if it stalled
+        second_shots : int or None
+            shots the second strategy took to win, None if it stalled
+        """
+        if self.decided:
+            return
+        first_shots = math.inf if first_shots is None else first_shots
+        second_shots = math.inf if second_shots is None else second_shots
+        if first_shots < second_shots:
+            self.wins += 1
+        elif second_shots < first_shots:
+            self.losses += 1
+        else:
+            self.ties += 1
+        if self.log_likelihood_ratio >= self._bound:
+            self.winner = self.first
+            self.decided = True
+        elif self.log_likelihood_ratio <= -self._bound:
+            self.winner = self.second
+            self.decided = True
+
+    def __str__(self):
+        """Return a line describing the pairing."""
+        if self.winner:
+            result = "{} wins".format(self.winner)
+        else:
+            result = "undecided"
+        return "{} vs {}: {}-{}-{} after {} games, {}".format(
+            self.first, self.second, self.wins, self.losses, self.ties,
+            self.games, result)
+
+
+def _play_games(job):
+    """Play seeded games with one strategy and return shots-to-win."""
+    strategy, seeds, options = job
+    return strategy, seeds, [play_game(seed, targeting=strategy, **options)
+                             for seed in seeds]
+
+
+def play_round_robin(strategies=STRATEGIES, *, games=2000,
+                     round_size=ROUND_SIZE, processes=None, seed=0,
+                     delta=DELTA, alpha=ALPHA, **options):
+    """
+    Play every pair of strategies against the same seeded games.
+
+    Parameters
+    ----------
+    strategies : iterable of str, optional | default: STRATEGIES
+        names of registered targeting strategies
+    games : int, optional, keyword-only | default: 2000
+        the most games any strategy plays
+    round_size : int, optional, keyword-only | default: ROUND_SIZE
+        games every strategy still playing plays between tests
+    processes : int or None, optional, keyword-only | default: None
+        size of the process pool, None uses every CPU
+    seed : int, optional, keyword-only | default: 0
+        seed of the first game
+    delta : float, optional, keyword-only | default: DELTA
+        how far from even the chance of winning a game is tested
+    alpha : float, optional, keyword-only | default: ALPHA
+        the chance of calling the wrong strategy the winner of a pairing
+    **options
+        engine, width and height keyword arguments passed to play_game
+
+    Returns
+    -------
+    tuple of dict and list - each strategy mapped to its shots-to-win in
+        game order (None for stalled games), and the Pairing objects
+    """
+    strategies = list(dict.fromkeys(strategies))
+    if len(strategies) < 2:
+        raise ValueError("A tournament needs at least two strategies.")
+    for strategy in strategies:
+        # unknown names fail here rather than in a worker
+        targeting_strategy(strategy)
+    pairings = [Pairing(first, second, delta, alpha)
+                for first, second in combinations(strategies, 2)]
+    shots = {strategy: [] for strategy in strategies}
+    with Pool(processes) as pool:
+        workers = processes or os.cpu_count() or 1
+        played = 0
+        while played < games:
+            playing = {name for pairing in pairings if not pairing.decided
+                       for name in (pairing.first, pairing.second)}
+            if not playing:
+                break
+            count = min(round_size, games - played)
+            seeds = range(seed + played, seed + played + count)
+            step = max(1, math.ceil(count / workers))
+            jobs = [(strategy, seeds[start:start + step], options)
+                    for strategy in strategies if strategy in playing
+                    for start in range(0, count, step)]
+            results = {}
+            for strategy, job_seeds, job_shots in pool.imap_unordered(
+                    _play_games, jobs):
+                results[(strategy, job_seeds.start)] = job_shots
+            for strategy in playing:
+                for start in range(0, count, step):
+                    shots[strategy].extend(
+                        results[(strategy, seeds[start])])
+            for pairing in pairings:
+                if not pairing.decided:
+                    first = shots[pairing.first]
+                    second = shots[pairing.second]
+                    for index in range(played, played + count):
+                        pairing.add_game(first[index], second[index])
+            played += count
+    return shots, pairings
+
+
+def ranking(shots, pairings):
+    """
+    Return the strategies in ranked order with their statistics.
+
+    Parameters
+    ----------
+    shots : dict
+        each strategy mapped to its shots-to-win, as from
+        play_round_robin
+    pairings : list of Pairing objects
+        the pairings played
+
+    Returns
+    -------
+    list of dict - one per strategy, best first, with 'strategy',
+        'games', 'stalled', 'mean', 'low' and 'high' bounds of the 95%
+        confidence interval, and pairings 'won', 'lost' and 'undecided'
+    """
+    rows = []
+    for strategy, strategy_shots in shots.items():
+        won = [count for count in strategy_shots if count is not None]
+        row = {'strategy': strategy, 'games': len(strategy_shots),
+               'stalled': len(strategy_shots) - len(won),
+               'mean': None, 'low': None, 'high': None,
+               'won': 0, 'lost': 0, 'undecided': 0}
+        if won:
+            mean = statistics.fmean(won)
+            error = (Z_95 * statistics.stdev(won) / math.sqrt(len(won))
+                     if len(won) > 1 else math.inf)
+            row.update(mean=mean, low=mean - error, high=mean + error)
+        for pairing in pairings:
+            if strategy not in (pairing.first, pairing.second):
+                continue
+            if pairing.winner is None:
+                row['undecided'] += 1
+            elif pairing.winner == strategy:
+                row['won'] += 1
+            else:
+                row['lost'] += 1
+        rows.append(row)
+    rows.sort(key=lambda row: (-row['won'], row['lost'],
+                               math.inf if row['mean'] is None
+                               else row['mean']))
+    return rows
+
+
+def main(argv=None):
+    """Run a tournament from the command line and print the ranking."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--strategies', nargs='+', default=STRATEGIES,
+                        choices=targeting_names(), metavar='NAME',
+                        help="targeting strategies to pair up "
+                        "(default: %(default)s)")
+    parser.add_argument('--games', type=int, default=2000,
+                        help="most games per strategy")
+    parser.add_argument('--round', type=int, default=ROUND_SIZE,
+                        help="games between tests")
+    parser.add_argument('--processes', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--delta', type=float, default=DELTA)
+    parser.add_argument('--alpha', type=float, default=ALPHA)
+    parser.add_argument('--engine', choices=('board', 'bitboard'),
+                        default='bitboard')
+    parser.add_argument('--output', help="write results as JSON to FILE")
+    args = parser.parse_args(argv)
+    shots, pairings = play_round_robin(
+        args.strategies, games=args.games, round_size=args.round,
+        processes=args.processes, seed=args.seed, delta=args.delta,
+        alpha=args.alpha, engine=args.engine)
+    rows = ranking(shots, pairings)
+    print("{:>4}  {:<10} {:>6} {:>8}  {:<17} {:>3} {:>4} {:>4}".format(
+        'rank', 'strategy', 'games', 'mean', '95% CI', 'won', 'lost',
+        'open'))
+    for rank, row in enumerate(rows, 1):
+        if row['mean'] is None:
+            mean = interval = '-'
+        else:
+            mean = '{:.2f}'.format(row['mean'])
+            interval = '{:.2f} - {:.2f}'.format(row['low'], row['high'])
+        print("{:>4}  {:<10} {:>6} {:>8}  {:<17} {:>3} {:>4} {:>4}".format(
+            rank, row['strategy'], row['games'], mean, interval, row['won'],
+            row['lost'], row['undecided']))
+    print()
+    for pairing in pairings:
+        print(pairing)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump({'ranking': rows,
+                       'pairings': [{'first': pairing.first,
+                                     'second': pairing.second,
+                                     'wins': pairing.wins,
+                                     'losses': pairing.losses,
+                                     'ties': pairing.ties,
+                                     'winner': pairing.winner}
+                                    for pairing in pairings]},
+                      output_file, indent=2)
+
+
+if __name__ == '__main__':
+    sys.exit(main())